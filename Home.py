@@ -1,6 +1,8 @@
 import streamlit as st
+from ligues_utils import ligue_de_session
 
 st.title("🏒 Application de formation d'équipes de hockey")
+ligue = ligue_de_session()
 
 st.markdown("""
 Bienvenue dans ton application **HockeyApp** !  
@@ -0,0 +1,101 @@
+"""
+Mémoire gardée par session Streamlit pour les équipes générées (pages 2 et 5).
+
+    python benchmarks/bench_memoire.py -o memoire.json
+
+Compare l'ancien état de session (DataFrames par trio / duo, copies du roster) à la
+représentation compacte (EquipeCompacte + listes d'ids). La mémoire est mesurée avec
+tracemalloc : octets encore alloués après avoir construit l'état de N sessions.
+Même format JSON que run_benchmarks.py.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import tracemalloc
+from datetime import datetime
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RACINE not in sys.path:
+    sys.path.insert(0, RACINE)
+
+from benchmarks.run_benchmarks import commit_courant  # noqa: E402
+from benchmarks.synthetique import generer_joueurs  # noqa: E402
+from formation_utils import (  # noqa: E402
+    generate_teams, generer_equipes_tournoi, EquipeCompacte, compacter_match,
+)
+
+
+def etat_avant(presents):
+    return {
+        "teams": generate_teams(presents),
+        "tournoi_equipes": generer_equipes_tournoi(presents),
+        "joueurs_pour_tournoi": presents.copy(),
+        "players_present": presents.copy(),
+    }
+
+
+def etat_apres(presents):
+    ids = [int(i) for i in presents["id"]]
+    return {
+        "teams": compacter_match(generate_teams(presents)),
+        "tournoi_equipes": {
+            nom: EquipeCompacte.depuis_equipe(eq) for nom, eq in generer_equipes_tournoi(presents).items()
+        },
+        "joueurs_pour_tournoi": ids,
+        "players_present": list(ids),
+    }
+
+
+def octets_par_session(fabrique, presents, nb_sessions):
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    sessions = [fabrique(presents) for _ in range(nb_sessions)]
+    gc.collect()
+    occupe = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    del sessions
+    return occupe / nb_sessions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mémoire de l'état de session par représentation.")
+    parser.add_argument("-o", "--output", help="Fichier JSON de sortie (défaut : stdout)")
+    parser.add_argument("--joueurs", type=int, nargs="+", default=[20, 40, 100])
+    parser.add_argument("--sessions", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    resultats = []
+    for nb_joueurs in args.joueurs:
+        presents = generer_joueurs(nb_joueurs, seed=nb_joueurs).assign(present=True)
+        avant = octets_par_session(etat_avant, presents, args.sessions)
+        apres = octets_par_session(etat_apres, presents, args.sessions)
+        for nom, octets in [("session_dataframes", avant), ("session_compacte", apres)]:
+            resultats.append({
+                "nom": nom,
+                "parametres": {"nb_joueurs": nb_joueurs, "sessions": args.sessions},
+                "octets_par_session": round(octets),
+            })
+        print(f"{nb_joueurs:>4} joueurs : {avant / 1024:8.1f} Kio -> {apres / 1024:6.1f} Kio par session "
+              f"(x{avant / apres:.0f})", file=sys.stderr)
+
+    rapport = {
+        "commit": commit_courant(),
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "resultats": resultats,
+    }
+    texte = json.dumps(rapport, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(texte)
+    else:
+        print(texte)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Mise à l'échelle de la recherche parallèle (recherche_parallele.py) selon le nombre de cœurs.
+
+    python benchmarks/bench_parallele.py -o parallele.json
+
+Pour chaque nombre de processus, mesure le nombre de formations évaluées par seconde
+sur un problème de la taille d'un tournoi (4 équipes) et l'accélération par rapport
+à un seul processus. Même format JSON que run_benchmarks.py.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RACINE not in sys.path:
+    sys.path.insert(0, RACINE)
+
+from benchmarks.run_benchmarks import commit_courant  # noqa: E402
+from benchmarks.synthetique import generer_joueurs  # noqa: E402
+from recherche_parallele import recherche_parallele  # noqa: E402
+
+
+def niveaux_workers(maximum):
+    niveaux, n = [], 1
+    while n < maximum:
+        niveaux.append(n)
+        n *= 2
+    return niveaux + [maximum]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mise à l'échelle de la recherche parallèle.")
+    parser.add_argument("-o", "--output", help="Fichier JSON de sortie (défaut : stdout)")
+    parser.add_argument("--budget", type=float, default=2.0, help="Secondes par mesure")
+    parser.add_argument("--joueurs", type=int, nargs="+", default=[44, 80])
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args(argv)
+
+    resultats = []
+    for nb_joueurs in args.joueurs:
+        joueurs = generer_joueurs(nb_joueurs, seed=nb_joueurs).assign(present=True)
+        debit_1 = None
+        for nb_workers in niveaux_workers(args.max_workers):
+            debut = time.perf_counter()
+            _, infos = recherche_parallele(joueurs, nb_equipes=4, budget_s=args.budget,
+                                           nb_workers=nb_workers, seed=0, arret_si_parfait=False)
+            duree = time.perf_counter() - debut
+            debit = infos["evalues"] / duree
+            debit_1 = debit_1 or debit
+            resultats.append({
+                "nom": "recherche_parallele",
+                "parametres": {"nb_joueurs": nb_joueurs, "nb_workers": nb_workers},
+                "repetitions": 1,
+                "min_s": round(duree, 6),
+                "mediane_s": round(duree, 6),
+                "candidats_par_s": round(debit),
+                "acceleration": round(debit / debit_1, 2),
+                "ecart": infos["ecart"],
+            })
+            print(f"{nb_joueurs} joueurs, {nb_workers} processus : {debit:,.0f} candidats/s "
+                  f"(x{debit / debit_1:.2f}), écart {infos['ecart']}", file=sys.stderr)
+
+    rapport = {
+        "commit": commit_courant(),
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpu": os.cpu_count(),
+        "resultats": resultats,
+    }
+    texte = json.dumps(rapport, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(texte)
+    else:
+        print(texte)
+
+
+if __name__ == "__main__":
+    main()
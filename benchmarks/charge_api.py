@@ -0,0 +1,117 @@
+"""
+Test de charge du service HTTP (hockey_api.serveur) : requêtes par seconde et latences.
+
+    python benchmarks/charge_api.py --clients 8 --duree 5 -o charge.json
+
+Le serveur est lancé dans ce processus sur un port libre, avec les données du dépôt
+(ou de --donnees) ; les clients sont des fils qui enchaînent les requêtes.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import threading
+import time
+import urllib.request
+from datetime import datetime
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RACINE not in sys.path:
+    sys.path.insert(0, RACINE)
+
+from benchmarks.run_benchmarks import commit_courant  # noqa: E402
+from hockey_api.serveur import creer_serveur  # noqa: E402
+
+SCENARIOS = {
+    "equipes": ("POST", "/equipes", {}),
+    "tournoi_equipes": ("POST", "/tournoi/equipes", {}),
+    "horaire": ("POST", "/tournoi/horaire", {}),
+    "joueurs": ("GET", "/joueurs?presents=1", None),
+    "flux": ("GET", "/tournoi/flux?depuis=0", None),
+}
+
+
+def client(url, methode, corps, fin, latences, erreurs):
+    donnees = json.dumps(corps).encode() if corps is not None else None
+    while time.perf_counter() < fin:
+        requete = urllib.request.Request(url, data=donnees, method=methode,
+                                         headers={"Content-Type": "application/json"})
+        debut = time.perf_counter()
+        try:
+            with urllib.request.urlopen(requete) as r:
+                r.read()
+            latences.append(time.perf_counter() - debut)
+        except Exception:
+            erreurs.append(1)
+
+
+def mesurer(port, scenario, nb_clients, duree):
+    methode, chemin, corps = SCENARIOS[scenario]
+    url = f"http://127.0.0.1:{port}{chemin}"
+    latences, erreurs = [], []
+    fin = time.perf_counter() + duree
+    fils = [threading.Thread(target=client, args=(url, methode, corps, fin, latences, erreurs))
+            for _ in range(nb_clients)]
+    debut = time.perf_counter()
+    for f in fils:
+        f.start()
+    for f in fils:
+        f.join()
+    total = time.perf_counter() - debut
+    latences.sort()
+    return {
+        "nom": f"api_{scenario}",
+        "parametres": {"clients": nb_clients},
+        "repetitions": len(latences),
+        "min_s": round(latences[0], 6) if latences else None,
+        "mediane_s": round(statistics.median(latences), 6) if latences else None,
+        "p95_s": round(latences[int(len(latences) * 0.95)], 6) if latences else None,
+        "requetes_par_s": round(len(latences) / total, 1),
+        "erreurs": len(erreurs),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Test de charge du service HTTP.")
+    parser.add_argument("-o", "--output")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--duree", type=float, default=3.0)
+    parser.add_argument("--scenarios", nargs="+", default=["equipes", "joueurs"], choices=list(SCENARIOS))
+    parser.add_argument("--donnees", default=RACINE)
+    args = parser.parse_args(argv)
+
+    os.chdir(args.donnees)
+    serveur = creer_serveur(port=0, silencieux=True)
+    port = serveur.server_address[1]
+    threading.Thread(target=serveur.serve_forever, daemon=True).start()
+    resultats = []
+    try:
+        for scenario in args.scenarios:
+            for nb_clients in args.clients:
+                r = mesurer(port, scenario, nb_clients, args.duree)
+                resultats.append(r)
+                print(f"{scenario:<16} {nb_clients:>3} clients : {r['requetes_par_s']:>8} req/s, "
+                      f"médiane {r['mediane_s']}s, p95 {r['p95_s']}s, erreurs {r['erreurs']}", file=sys.stderr)
+    finally:
+        serveur.shutdown()
+        serveur.server_close()
+
+    rapport = {
+        "commit": commit_courant(),
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "resultats": resultats,
+    }
+    texte = json.dumps(rapport, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(texte)
+    else:
+        print(texte)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Compare deux rapports JSON produits par run_benchmarks.py.
+
+    python benchmarks/comparer.py avant.json apres.json
+"""
+import argparse
+import json
+
+
+def cle(resultat):
+    return resultat["nom"], tuple(sorted(resultat["parametres"].items()))
+
+
+def comparer(avant, apres, seuil=0.10):
+    """Retourne les lignes (cas, avant, après, ratio, verdict) pour les cas communs."""
+    index_avant = {cle(r): r for r in avant["resultats"]}
+    lignes = []
+    for r in apres["resultats"]:
+        ancien = index_avant.get(cle(r))
+        if not ancien:
+            continue
+        ratio = r["min_s"] / ancien["min_s"] if ancien["min_s"] else float("inf")
+        if ratio < 1 - seuil:
+            verdict = "plus rapide"
+        elif ratio > 1 + seuil:
+            verdict = "plus lent"
+        else:
+            verdict = "="
+        parametres = ", ".join(f"{k}={v}" for k, v in r["parametres"].items())
+        lignes.append((f"{r['nom']} ({parametres})", ancien["min_s"], r["min_s"], ratio, verdict))
+    return lignes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare deux rapports de benchmarks.")
+    parser.add_argument("avant")
+    parser.add_argument("apres")
+    parser.add_argument("--seuil", type=float, default=0.10, help="Variation tolérée (défaut 10 %%)")
+    args = parser.parse_args(argv)
+
+    with open(args.avant, encoding="utf-8") as f:
+        avant = json.load(f)
+    with open(args.apres, encoding="utf-8") as f:
+        apres = json.load(f)
+
+    print(f"{avant.get('commit')} -> {apres.get('commit')}")
+    for nom, t_avant, t_apres, ratio, verdict in comparer(avant, apres, args.seuil):
+        print(f"{nom:<50} {t_avant:>10.4f}s {t_apres:>10.4f}s  x{ratio:<6.2f} {verdict}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Démarrage à froid : hydratation de data/ contre un faux GitHub local (arbre + archive).
+
+    python benchmarks/hydratation_github.py                       # data/ du dépôt
+    python benchmarks/hydratation_github.py --fichiers 500 -o hydratation.json
+
+Le faux serveur répond aux deux routes utilisées par hydratation_utils
+(/repos/<dépôt>/git/trees/<branche> et /repos/<dépôt>/tarball/<branche>) à partir d'un
+dossier source, et compte les requêtes reçues. On mesure trois démarrages : à froid
+(dossier vide), à chaud (rien n'a changé) et après un changement d'un seul fichier.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import tarfile
+import tempfile
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RACINE not in sys.path:
+    sys.path.insert(0, RACINE)
+
+from benchmarks.run_benchmarks import commit_courant  # noqa: E402
+from hydratation_utils import hydrater, sha_blob  # noqa: E402
+
+DEPOT = "club/equipes-hockey"
+BRANCHE = "main"
+
+
+class FauxGitHub:
+    """Dépôt en mémoire (chemin -> contenu) servi comme l'API GitHub."""
+
+    def __init__(self, fichiers):
+        self.fichiers = dict(fichiers)
+        self.requetes = []
+
+    def arbre(self):
+        return {
+            "sha": "0" * 40, "truncated": False,
+            "tree": [{"path": p, "type": "blob", "sha": sha_blob(c), "size": len(c)} for p, c in self.fichiers.items()],
+        }
+
+    def archive(self):
+        tampon = io.BytesIO()
+        with tarfile.open(fileobj=tampon, mode="w:gz") as tar:
+            for chemin, contenu in self.fichiers.items():
+                info = tarfile.TarInfo(f"club-equipes-hockey-abc1234/{chemin}")
+                info.size = len(contenu)
+                tar.addfile(info, io.BytesIO(contenu))
+        return tampon.getvalue()
+
+    def demarrer(self):
+        faux = self
+
+        class Gestionnaire(BaseHTTPRequestHandler):
+            def do_GET(self):
+                chemin = self.path.split("?")[0]
+                faux.requetes.append(chemin)
+                if chemin == f"/repos/{DEPOT}/git/trees/{BRANCHE}":
+                    corps, type_contenu = json.dumps(faux.arbre()).encode(), "application/json"
+                elif chemin == f"/repos/{DEPOT}/tarball/{BRANCHE}":
+                    corps, type_contenu = faux.archive(), "application/x-gzip"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", type_contenu)
+                self.send_header("Content-Length", str(len(corps)))
+                self.end_headers()
+                self.wfile.write(corps)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.serveur = ThreadingHTTPServer(("127.0.0.1", 0), Gestionnaire)
+        self.serveur.daemon_threads = True
+        threading.Thread(target=self.serveur.serve_forever, daemon=True).start()
+        return f"http://127.0.0.1:{self.serveur.server_address[1]}"
+
+    def arreter(self):
+        self.serveur.shutdown()
+        self.serveur.server_close()
+
+
+def fichiers_source(dossier, nb_fichiers=None):
+    """Fichiers de data/ du dépôt, ou nb_fichiers CSV synthétiques de ~20 Ko."""
+    if nb_fichiers:
+        ligne = b"1,JOUEUR,5.5,4.25,True\n"
+        return {f"data/historique/saison_{i:04d}.csv": ligne * (1000 + i) for i in range(nb_fichiers)}
+    fichiers = {}
+    for base, _, noms in os.walk(os.path.join(dossier, "data")):
+        for nom in noms:
+            chemin = os.path.join(base, nom)
+            with open(chemin, "rb") as f:
+                fichiers[os.path.relpath(chemin, dossier).replace(os.sep, "/")] = f.read()
+    return fichiers
+
+
+def demarrage(faux, api, racine):
+    avant = len(faux.requetes)
+    debut = time.perf_counter()
+    resultat = hydrater(DEPOT, BRANCHE, racine=racine, api=api, token="")
+    duree = time.perf_counter() - debut
+    return {
+        "duree_s": round(duree, 4),
+        "requetes": len(faux.requetes) - avant,
+        "ecrits": len(resultat.ecrits),
+        "inchanges": len(resultat.inchanges),
+        "erreurs": resultat.erreurs,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mesure de l'hydratation de data/ contre un faux GitHub.")
+    parser.add_argument("--fichiers", type=int, help="Nombre de fichiers synthétiques (défaut : data/ du dépôt)")
+    parser.add_argument("-o", "--output", help="Fichier JSON de sortie (défaut : stdout)")
+    args = parser.parse_args(argv)
+
+    faux = FauxGitHub(fichiers_source(RACINE, args.fichiers))
+    api = faux.demarrer()
+    racine = tempfile.mkdtemp(prefix="hydratation_")
+    try:
+        froid = demarrage(faux, api, racine)
+        chaud = demarrage(faux, api, racine)
+        premier = next(iter(faux.fichiers))
+        faux.fichiers[premier] += b"2,AUTRE JOUEUR,6.0,5.0,False\n"
+        un_fichier = demarrage(faux, api, racine)
+    finally:
+        faux.arreter()
+        shutil.rmtree(racine, ignore_errors=True)
+
+    rapport = {
+        "commit": commit_courant(),
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "resultats": {
+            "nb_fichiers": len(faux.fichiers),
+            "octets": sum(len(c) for c in faux.fichiers.values()),
+            "froid": froid, "chaud": chaud, "un_fichier_modifie": un_fichier,
+        },
+    }
+    for nom in ["froid", "chaud", "un_fichier_modifie"]:
+        r = rapport["resultats"][nom]
+        print(f"{nom:<20} {r['duree_s']:.4f}s  requêtes={r['requetes']}  écrits={r['ecrits']}  "
+              f"inchangés={r['inchanges']}", file=sys.stderr)
+    texte = json.dumps(rapport, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(texte)
+    else:
+        print(texte)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+"""
+Banc d'essai des chemins critiques (formation, historique, statistiques, tournoi).
+
+Utilisation :
+    python benchmarks/run_benchmarks.py                  # grille complète
+    python benchmarks/run_benchmarks.py --rapide         # petites tailles seulement
+    python benchmarks/run_benchmarks.py -o resultats.json
+
+Les résultats sont écrits en JSON (un enregistrement par cas) pour être comparés
+entre deux commits avec benchmarks/comparer.py.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, time as dtime
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RACINE not in sys.path:
+    sys.path.insert(0, RACINE)
+
+from benchmarks.synthetique import generer_joueurs, generer_historique, generer_resultats_ronde  # noqa: E402
+from formation_utils import generate_teams, generer_equipes_tournoi  # noqa: E402
+from contraintes_utils import generer_equipes_contraintes  # noqa: E402
+from tournoi_utils import generer_matchs_equilibres, classement_from_results, recaler_horaire  # noqa: E402
+from utils import save_history, stats_joueurs  # noqa: E402
+from historique_utils import ecrire_historique, ajouter_match, HISTORIQUE_DIR  # noqa: E402
+from versions_utils import enregistrer_version  # noqa: E402
+from simulation_utils import simuler_tournoi  # noqa: E402
+from rotation_utils import planifier_journee  # noqa: E402
+from equite_utils import audit  # noqa: E402
+from bracket_utils import propager, recalculer_bracket, TAILLES_ELIMINATION  # noqa: E402
+import presences_utils  # noqa: E402
+
+TAILLES_JOUEURS = [20, 100, 1000, 10000]
+TAILLES_HISTORIQUE = [10, 1000, 10000, 100000]
+TAILLES_EQUIPES = [4, 16, 64]
+TAILLES_CONTRAINTES = [20, 40, 100, 400]
+TAILLES_SIMULATIONS = [10_000, 100_000, 1_000_000]
+TAILLES_SEANCES = [10, 100, 1000]
+
+
+def mesurer(fonction, repetitions, preparation=None):
+    """Exécute `fonction` plusieurs fois et retourne les durées en secondes."""
+    durees = []
+    for _ in range(repetitions):
+        args = preparation() if preparation else ()
+        debut = time.perf_counter()
+        fonction(*args)
+        durees.append(time.perf_counter() - debut)
+    return durees
+
+
+def commit_courant():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=RACINE, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except Exception:
+        return "inconnu"
+
+
+def dans_dossier(dossier, fonction, *args, **kwargs):
+    """Appelle fonction depuis `dossier` (chemins de données relatifs : data/...)."""
+    ancien = os.getcwd()
+    os.chdir(dossier)
+    try:
+        return fonction(*args, **kwargs)
+    finally:
+        os.chdir(ancien)
+
+
+# --- Cas mesurés ---
+def bench_generate_teams(n):
+    joueurs = generer_joueurs(n, seed=n)
+    present = joueurs[joueurs["present"]].reset_index(drop=True)
+    return lambda: generate_teams(present, graine=n)
+
+
+def bench_generer_equipes_tournoi(n):
+    joueurs = generer_joueurs(n, seed=n)
+    present = joueurs[joueurs["present"]].reset_index(drop=True)
+    return lambda: generer_equipes_tournoi(present, graine=n)
+
+
+def bench_contraintes(n):
+    joueurs = generer_joueurs(n, seed=n)
+    ids = joueurs["id"].tolist()
+    # familles fictives : 2 à garder ensemble, 2 à séparer, 1 duo imposé
+    regles = dict(
+        meme_equipe=[ids[0:2], ids[5:7]],
+        separes=[ids[2:4], ids[8:10]],
+        meme_ligne=[ids[11:13]],
+        postes={ids[11]: "Défenseur"},
+    )
+    return lambda: generer_equipes_contraintes(joueurs, budget_s=0.5, **regles)
+
+
+def bench_save_history(n):
+    joueurs = generer_joueurs(200, seed=1)
+    hist = generer_historique(n, joueurs, seed=n)
+    teams = generate_teams(joueurs.head(24), graine=n)
+    equipeB = [p for t in (teams["equipeB_trios"] + teams["equipeB_duos"]) for p in t["nom"].tolist()]
+    equipeN = [p for t in (teams["equipeN_trios"] + teams["equipeN_duos"]) for p in t["nom"].tolist()]
+    dossier = tempfile.mkdtemp(prefix="bench_hist_")
+
+    def preparation():
+        ecrire_historique(hist, os.path.join(dossier, HISTORIQUE_DIR))
+        # état de départ déjà versionné, comme après le match précédent
+        dans_dossier(dossier, enregistrer_version, "historique")
+        return ()
+
+    def executer():
+        dans_dossier(
+            dossier, save_history,
+            equipeB, equipeN, teams["moyB"], teams["moyN"], "2024-10-01",
+            triosB=teams["equipeB_trios"], duosB=teams["equipeB_duos"],
+            triosN=teams["equipeN_trios"], duosN=teams["equipeN_duos"]
+        )
+
+    return executer, preparation
+
+
+def bench_version_historique(n):
+    # un match ajouté à un historique de n matchs déjà versionné : seuls la partition de la
+    # saison et le manifeste sont relus, et seuls leurs morceaux modifiés sont écrits
+    joueurs = generer_joueurs(200, seed=1)
+    hist = generer_historique(n, joueurs, seed=n)
+    ligne = hist.iloc[-1].drop(labels=["ID_Match"], errors="ignore").to_dict()
+    dossier = tempfile.mkdtemp(prefix="bench_versions_")
+
+    def preparation():
+        ecrire_historique(hist, os.path.join(dossier, HISTORIQUE_DIR))
+        dans_dossier(dossier, enregistrer_version, "historique")
+        dans_dossier(dossier, ajouter_match, ligne)
+        return ()
+
+    return lambda: dans_dossier(dossier, enregistrer_version, "historique", "Match"), preparation
+
+
+def bench_stats_joueurs(n):
+    joueurs = generer_joueurs(200, seed=2)
+    hist = generer_historique(n, joueurs, seed=n)
+    return lambda: stats_joueurs(hist, joueurs)
+
+
+def bench_audit_equite(n):
+    joueurs = generer_joueurs(200, seed=3)
+    hist = generer_historique(n, joueurs, seed=n)
+    return lambda: audit(hist, joueurs)
+
+
+def bench_classement(nb_equipes):
+    matchs = generer_resultats_ronde(nb_equipes, seed=nb_equipes)
+    return lambda: classement_from_results(matchs)
+
+
+def bench_horaire(nb_equipes):
+    equipes = {f"ÉQUIPE {i + 1}": {} for i in range(nb_equipes)}
+    return lambda: generer_matchs_equilibres(equipes, dtime(18, 0), 25, 30, 35, 5, 10)
+
+
+def bench_recalage(nb_equipes):
+    # le match du milieu de la journée finit avec 7 minutes de retard
+    equipes = {f"ÉQUIPE {i + 1}": {} for i in range(nb_equipes)}
+    matchs = generer_matchs_equilibres(equipes, dtime(18, 0), 25, 30, 35, 5, 10)
+    milieu = matchs.index[len(matchs) // 2]
+    fin = datetime.strptime(matchs.at[milieu, "Début"], "%Y-%m-%dT%H:%M") + timedelta(minutes=25 + 7)
+    return lambda: recaler_horaire(matchs.copy(), milieu, fin, fin=True)
+
+
+def bench_simulation(nb_simulations):
+    moyennes = {"BLANCS": 6.2, "NOIRS": 6.0, "ROUGES": 5.8, "VERTS": 5.4}
+    return lambda: simuler_tournoi(moyennes, nb_simulations=nb_simulations)
+
+
+def bench_rotation(nb_equipes):
+    # journée complète : une ronde entre nb_equipes équipes (lignes des 4 équipes de tournoi réutilisées)
+    joueurs = generer_joueurs(60, seed=nb_equipes)
+    present = joueurs[joueurs["present"]].reset_index(drop=True)
+    modeles = list(generer_equipes_tournoi(present, graine=nb_equipes).values())
+    equipes = {f"ÉQUIPE {i + 1}": modeles[i % len(modeles)] for i in range(nb_equipes)}
+    matchs = generer_matchs_equilibres(equipes, dtime(18, 0), 25, 30, 35, 5, 10)
+    return lambda: planifier_journee(equipes, matchs, 90)
+
+
+def bench_propagation(nb_equipes):
+    # élimination directe déjà jouée jusqu'à la finale ; on change le score du premier match
+    # et on mesure la propagation jusqu'à la finale
+    equipes = {f"ÉQUIPE {i + 1}": {} for i in range(nb_equipes)}
+    matchs = generer_matchs_equilibres(equipes, dtime(18, 0), 25, 30, 35, 5, 10, format="elimination")
+    matchs[["Score A", "Score B", "Gagnant", "Prolongation"]] = [0, 0, "", False]
+    for i in matchs.index[matchs["Noeud"] != ""]:
+        recalculer_bracket(matchs)
+        matchs.loc[i, ["Score A", "Score B", "Gagnant"]] = [2, 1, matchs.at[i, "Équipe A"]]
+    premier = matchs.index[matchs["Noeud"] != ""][0]
+
+    def executer():
+        copie = matchs.copy()
+        copie.loc[premier, ["Score A", "Score B", "Gagnant"]] = [1, 2, copie.at[premier, "Équipe B"]]
+        propager(copie, [premier])
+
+    return executer
+
+
+def bench_presences(nb_seances):
+    # journal de nb_seances séances sur 200 joueurs ; on mesure la lecture complète (cache vidé)
+    # et la relecture après une seule ligne ajoutée
+    joueurs = generer_joueurs(200, seed=nb_seances)
+    chemin = os.path.join(tempfile.mkdtemp(prefix="bench_presences_"), "presences.log")
+    ids = joueurs["id"].astype(int).tolist()
+    debut = datetime(2024, 9, 2).date()
+    for s in range(nb_seances):
+        presents = joueurs.sample(frac=0.6, random_state=s)["id"].astype(int).tolist()
+        presences_utils.journaliser_presences(presents, debut + timedelta(days=7 * s), chemin)
+        presences_utils.journaliser_remise_a_zero(debut + timedelta(days=7 * s + 1), chemin)
+
+    def executer():
+        presences_utils._etats.pop(os.path.abspath(chemin), None)
+        presences_utils._agregats(chemin)
+        presences_utils.journaliser_presences(ids[:20], debut + timedelta(days=7 * nb_seances), chemin)
+        presences_utils._agregats(chemin)
+
+    return executer
+
+
+CAS = [
+    ("generate_teams", "nb_joueurs", TAILLES_JOUEURS, bench_generate_teams),
+    ("generer_equipes_tournoi", "nb_joueurs", TAILLES_JOUEURS, bench_generer_equipes_tournoi),
+    ("generer_equipes_contraintes", "nb_joueurs", TAILLES_CONTRAINTES, bench_contraintes),
+    ("save_history", "nb_matchs", TAILLES_HISTORIQUE, bench_save_history),
+    ("enregistrer_version", "nb_matchs", TAILLES_HISTORIQUE, bench_version_historique),
+    ("stats_joueurs", "nb_matchs", TAILLES_HISTORIQUE, bench_stats_joueurs),
+    ("audit_equite", "nb_matchs", TAILLES_HISTORIQUE, bench_audit_equite),
+    ("classement_from_results", "nb_equipes", TAILLES_EQUIPES, bench_classement),
+    ("generer_matchs_equilibres", "nb_equipes", TAILLES_EQUIPES, bench_horaire),
+    ("recaler_horaire", "nb_equipes", TAILLES_EQUIPES, bench_recalage),
+    ("simuler_tournoi", "nb_simulations", TAILLES_SIMULATIONS, bench_simulation),
+    ("planifier_journee", "nb_equipes", TAILLES_EQUIPES, bench_rotation),
+    ("propager_bracket", "nb_equipes", list(TAILLES_ELIMINATION), bench_propagation),
+    ("agregats_presences", "nb_seances", TAILLES_SEANCES, bench_presences),
+]
+
+
+def executer_benchmarks(repetitions=5, rapide=False, filtre=None):
+    """Exécute tous les cas et retourne le rapport (dict sérialisable en JSON)."""
+    resultats = []
+    for nom, parametre, tailles, fabrique in CAS:
+        if filtre and filtre not in nom:
+            continue
+        for taille in (tailles[:2] if rapide else tailles):
+            cas = fabrique(taille)
+            fonction, preparation = cas if isinstance(cas, tuple) else (cas, None)
+            # grosses tailles : moins de répétitions
+            rep = repetitions if taille <= 1000 else max(1, repetitions // 3)
+            durees = mesurer(fonction, rep, preparation)
+            resultats.append({
+                "nom": nom,
+                "parametres": {parametre: taille},
+                "repetitions": rep,
+                "min_s": round(min(durees), 6),
+                "mediane_s": round(statistics.median(durees), 6),
+            })
+            print(f"{nom:<28} {parametre}={taille:<7} min={min(durees):.4f}s "
+                  f"médiane={statistics.median(durees):.4f}s", file=sys.stderr)
+    return {
+        "commit": commit_courant(),
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "resultats": resultats,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Banc d'essai de l'application de hockey.")
+    parser.add_argument("-o", "--output", help="Fichier JSON de sortie (défaut : stdout)")
+    parser.add_argument("-r", "--repetitions", type=int, default=5)
+    parser.add_argument("--rapide", action="store_true", help="Petites tailles seulement")
+    parser.add_argument("-k", "--filtre", help="Ne garder que les cas dont le nom contient ce texte")
+    args = parser.parse_args(argv)
+
+    rapport = executer_benchmarks(args.repetitions, args.rapide, args.filtre)
+    texte = json.dumps(rapport, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(texte)
+    else:
+        print(texte)
+
+
+if __name__ == "__main__":
+    main()
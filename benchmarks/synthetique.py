@@ -0,0 +1,78 @@
+"""Génération de données synthétiques aux formats de data/joueurs.csv et data/historique.csv."""
+import itertools
+import numpy as np
+import pandas as pd
+from datetime import date, timedelta
+
+from utils import saison_from_date
+
+PRENOMS = ["ALEX", "SAM", "NOAH", "LEA", "JULES", "EMMA", "LOUIS", "ZOE", "FELIX", "ROSE",
+           "THEO", "MIA", "LIAM", "CHLOE", "HUGO", "ALICE", "NATHAN", "JADE", "LEO", "CLARA"]
+NOMS = ["TREMBLAY", "GAGNON", "ROY", "COTE", "BOUCHARD", "GAUTHIER", "MORIN", "LAVOIE",
+        "FORTIN", "GAGNE", "OUELLET", "PELLETIER", "BELANGER", "LEVESQUE", "BERGERON",
+        "LEBLANC", "PAQUETTE", "GIRARD", "SIMARD", "BOUCHER", "GUERARD", "LAPOINTE", "DORVAL"]
+
+
+def generer_joueurs(nb_joueurs, seed=0, taux_presence=0.7):
+    """Retourne un roster synthétique (id, nom, talent_attaque, talent_defense, present)."""
+    rng = np.random.default_rng(seed)
+    noms = []
+    for i in range(nb_joueurs):
+        prenom = PRENOMS[i % len(PRENOMS)]
+        nom = NOMS[(i // len(PRENOMS)) % len(NOMS)]
+        suffixe = i // (len(PRENOMS) * len(NOMS))
+        noms.append(f"{prenom} {nom}" + (f" {suffixe}" if suffixe else ""))
+    return pd.DataFrame({
+        "id": np.arange(1, nb_joueurs + 1),
+        "nom": noms,
+        "talent_attaque": rng.integers(1, 11, nb_joueurs).astype(float),
+        "talent_defense": rng.integers(1, 11, nb_joueurs).astype(float),
+        "present": rng.random(nb_joueurs) < taux_presence,
+    })
+
+
+def generer_historique(nb_matchs, joueurs, seed=0, joueurs_par_match=20):
+    """Retourne un historique synthétique au format de save_history."""
+    rng = np.random.default_rng(seed)
+    noms = joueurs["nom"].to_numpy()
+    ids = joueurs["id"].to_numpy()
+    debut = date(2015, 9, 1)
+    par_equipe = min(joueurs_par_match, len(noms)) // 2
+    rows = []
+    for i in range(nb_matchs):
+        d = (debut + timedelta(days=int(i * 3650 / max(nb_matchs, 1)))).strftime("%Y-%m-%d")
+        positions = rng.choice(len(noms), size=par_equipe * 2, replace=False)
+        choisis = noms[positions]
+        blancs, noirs = choisis[:par_equipe], choisis[par_equipe:]
+        rows.append({
+            "Date": d,
+            "Saison": saison_from_date(d),
+            "Moyenne_BLANCS": round(float(rng.uniform(4, 7)), 2),
+            "Moyenne_NOIRS": round(float(rng.uniform(4, 7)), 2),
+            "Trios_BLANCS": "; ".join(", ".join(blancs[j:j + 3]) for j in range(0, 6, 3)),
+            "Duos_BLANCS": "; ".join(", ".join(blancs[j:j + 2]) for j in range(6, par_equipe, 2)),
+            "Trios_NOIRS": "; ".join(", ".join(noirs[j:j + 3]) for j in range(0, 6, 3)),
+            "Duos_NOIRS": "; ".join(", ".join(noirs[j:j + 2]) for j in range(6, par_equipe, 2)),
+            "Équipe_BLANCS": ", ".join(blancs),
+            "Équipe_NOIRS": ", ".join(noirs),
+            "Ids_BLANCS": ",".join(str(i) for i in ids[positions[:par_equipe]]),
+            "Ids_NOIRS": ",".join(str(i) for i in ids[positions[par_equipe:]]),
+        })
+    return pd.DataFrame(rows)
+
+
+def generer_resultats_ronde(nb_equipes, seed=0):
+    """Retourne un horaire de ronde complet (toutes les paires) avec des scores aléatoires."""
+    rng = np.random.default_rng(seed)
+    paires = list(itertools.combinations([f"ÉQUIPE {i + 1}" for i in range(nb_equipes)], 2))
+    score_a = rng.integers(0, 8, len(paires))
+    score_b = rng.integers(0, 8, len(paires))
+    matchs = pd.DataFrame(paires, columns=["Équipe A", "Équipe B"])
+    matchs["Phase"] = "Ronde"
+    matchs["Type"] = "Match"
+    matchs["Score A"] = score_a
+    matchs["Score B"] = score_b
+    matchs["Gagnant"] = np.where(score_a > score_b, matchs["Équipe A"],
+                                 np.where(score_b > score_a, matchs["Équipe B"], ""))
+    matchs["Prolongation"] = rng.random(len(paires)) < 0.2
+    return matchs
@@ -0,0 +1,205 @@
+"""
+Moteur du bracket : chaque match d'élimination est un nœud qui dépend du classement de
+la ronde ou du gagnant de matchs précédents.
+
+Les matchs d'élimination portent trois colonnes : « Noeud » (DF1, F...), « Source A » et
+« Source B ». Une source est « rang:k » (k-ième de la ronde, connu quand la ronde est
+terminée), « gagnant:<nœud> » ou directement le nom d'une équipe (tête de série d'une
+élimination directe, ou équipe exemptée d'un tour). Quand un score change, propager()
+ne recalcule que les nœuds en aval : ceux qui lisent le classement si c'est un match de
+ronde, puis, de proche en proche, ceux qui lisent le gagnant d'un nœud modifié.
+
+Formats : la ronde complète suivie des demi-finales 1er vs 4e / 2e vs 3e et de la finale
+(format historique), ou l'élimination directe à 4, 8 ou 16 places, avec des exemptions
+quand il y a moins d'équipes que de places.
+"""
+import functools
+import heapq
+
+import pandas as pd
+
+from tournoi_utils import classement_from_results
+
+TAILLES_ELIMINATION = (4, 8, 16)
+COLONNES_BRACKET = ["Noeud", "Source A", "Source B"]
+# phase et préfixe de nœud selon le nombre de places du tour
+TOURS = {16: ("Huitième de finale", "HF"), 8: ("Quart de finale", "QF"), 4: ("Demi-finale", "DF"), 2: ("Finale", "F")}
+
+
+# --- Construction ---
+def ordre_tetes_de_serie(taille):
+    """Têtes de série dans l'ordre du tableau : 4 -> [1, 4, 2, 3], 8 -> [1, 8, 4, 5, 2, 7, 3, 6]..."""
+    ordre = [1, 2]
+    while len(ordre) < taille:
+        n = 2 * len(ordre)
+        ordre = [s for t in ordre for s in (t, n + 1 - t)]
+    return ordre
+
+
+def noeuds_elimination(graines):
+    """Nœuds (dicts Noeud / Phase / Source A / Source B) d'une élimination directe, tour par tour.
+
+    `graines` : source de chaque tête de série, de la 1re à la dernière (« rang:k » ou nom
+    d'équipe). Le tableau a 4, 8 ou 16 places ; les places en trop sont des exemptions :
+    l'adversaire de la tête de série n'existe pas et elle passe directement au tour suivant.
+    """
+    n = len(graines)
+    taille = next((t for t in TAILLES_ELIMINATION if t >= n), None)
+    if n < 2 or taille is None:
+        raise ValueError(f"L'élimination directe accepte de 2 à {TAILLES_ELIMINATION[-1]} équipes ({n} reçues).")
+    places = [graines[s - 1] if s <= n else None for s in ordre_tetes_de_serie(taille)]
+    noeuds = []
+    while len(places) > 1:
+        phase, prefixe = TOURS[len(places)]
+        suivants, numero = [], 0
+        for a, b in zip(places[::2], places[1::2]):
+            if a is None or b is None:
+                suivants.append(a if b is None else b)  # exemption
+                continue
+            numero += 1
+            nom = prefixe if len(places) == 2 else f"{prefixe}{numero}"
+            noeuds.append({"Noeud": nom, "Phase": phase, "Source A": a, "Source B": b})
+            suivants.append(f"gagnant:{nom}")
+        places = suivants
+    return noeuds
+
+
+def libelle_source(source):
+    """Texte affiché tant que la source n'est pas connue."""
+    if source.startswith("rang:"):
+        k = int(source[5:])
+        return f"{k}{'er' if k == 1 else 'e'} de la ronde"
+    if source.startswith("gagnant:"):
+        return f"Gagnant {source[8:]}"
+    return source
+
+
+def _source_fixe(source):
+    return bool(source) and not source.startswith(("rang:", "gagnant:"))
+
+
+# --- Colonnes ---
+def completer_sources(matchs):
+    """Ajoute les colonnes du bracket ; un ancien tournoi (textes « Demi-finale 1 - 1er vs 4e »)
+    reçoit les nœuds du format historique, dans l'ordre de ses matchs d'élimination."""
+    if all(c in matchs.columns for c in COLONNES_BRACKET):
+        for c in COLONNES_BRACKET:
+            matchs[c] = matchs[c].fillna("").astype(str)
+        return matchs
+    for c in COLONNES_BRACKET:
+        matchs[c] = ""
+    anciens = iter(noeuds_elimination([f"rang:{k}" for k in range(1, 5)]))
+    for i in matchs.index[(matchs["Type"] == "Match") & matchs["Phase"].isin(["Demi-finale", "Finale"])]:
+        noeud = next(anciens, None)
+        if noeud is None or noeud["Phase"] != matchs.at[i, "Phase"]:
+            break
+        for c in COLONNES_BRACKET:
+            matchs.at[i, c] = noeud[c]
+    return matchs
+
+
+# --- Graphe des dépendances ---
+@functools.lru_cache(maxsize=16)
+def _graphe(noeuds):
+    """(index par nœud, dépendants) ; dépendants : « ronde » ou nœud -> index des matchs qui le lisent."""
+    index, dependants = {}, {}
+    for i, nom, source_a, source_b in noeuds:
+        index[nom] = i
+        for source in (source_a, source_b):
+            cle = "ronde" if source.startswith("rang:") else source[8:] if source.startswith("gagnant:") else None
+            if cle is not None:
+                dependants.setdefault(cle, []).append(i)
+    return index, dependants
+
+
+def graphe(matchs):
+    noeuds = tuple(
+        (int(i), r["Noeud"], r["Source A"], r["Source B"])
+        for i, r in matchs.loc[matchs["Noeud"] != "", COLONNES_BRACKET].iterrows()
+    )
+    return _graphe(noeuds)
+
+
+def ronde_terminee(matchs):
+    ronde = matchs[(matchs["Phase"] == "Ronde") & (matchs["Type"] == "Match")]
+    return bool((ronde["Gagnant"].fillna("").astype(str).str.strip() != "").all())
+
+
+def equipes_reelles(matchs):
+    """Noms d'équipes (par opposition aux libellés d'attente)."""
+    ronde = matchs[matchs["Phase"] == "Ronde"]
+    reelles = set(ronde["Équipe A"]) | set(ronde["Équipe B"])
+    for c in ["Source A", "Source B"]:
+        reelles |= {s for s in matchs[c] if _source_fixe(s)}
+    return reelles
+
+
+def en_attente(matchs, i, reelles=None):
+    """Vrai si une des deux équipes du match n'est pas encore connue."""
+    reelles = equipes_reelles(matchs) if reelles is None else reelles
+    return matchs.at[i, "Équipe A"] not in reelles or matchs.at[i, "Équipe B"] not in reelles
+
+
+# --- Propagation ---
+def propager(matchs, modifies, noeuds=()):
+    """Met à jour les nœuds en aval des matchs `modifies` (index), plus les `noeuds` donnés ;
+    modifie `matchs` et retourne les index des matchs dont les équipes ont changé.
+
+    Un nœud dont les équipes changent perd son résultat (il opposait d'autres équipes),
+    ce qui se propage à son tour à ses dépendants.
+    """
+    index, dependants = graphe(matchs)
+    reelles = equipes_reelles(matchs)
+    a_voir = [int(i) for i in noeuds]
+    for i in modifies:
+        cle = "ronde" if matchs.at[i, "Phase"] == "Ronde" else matchs.at[i, "Noeud"]
+        a_voir.extend(dependants.get(cle, []))
+    heapq.heapify(a_voir)  # les sources précèdent toujours leurs dépendants dans l'horaire
+    classement, vus, recalcules = None, set(), []
+
+    def resoudre(source):
+        nonlocal classement
+        if source.startswith("rang:"):
+            if not ronde_terminee(matchs):
+                return None
+            if classement is None:
+                classement = classement_from_results(matchs)["Équipe"].tolist()
+            k = int(source[5:])
+            return classement[k - 1] if k <= len(classement) else None
+        if source.startswith("gagnant:"):
+            j = index.get(source[8:])
+            if j is None:
+                return None
+            gagnant = str(matchs.at[j, "Gagnant"] or "")
+            return gagnant if gagnant in reelles and not en_attente(matchs, j, reelles) else None
+        return source
+
+    while a_voir:
+        i = heapq.heappop(a_voir)
+        if i in vus:
+            continue
+        vus.add(i)
+        equipes = [resoudre(matchs.at[i, c]) or libelle_source(matchs.at[i, c]) for c in ["Source A", "Source B"]]
+        if equipes == [matchs.at[i, "Équipe A"], matchs.at[i, "Équipe B"]]:
+            continue
+        matchs.loc[i, ["Équipe A", "Équipe B"]] = equipes
+        matchs.loc[i, ["Score A", "Score B", "Gagnant", "Prolongation"]] = [0, 0, "", False]
+        recalcules.append(i)
+        for j in dependants.get(matchs.at[i, "Noeud"], []):
+            heapq.heappush(a_voir, j)
+    return recalcules
+
+
+def recalculer_bracket(matchs):
+    """Propagation complète (création du tournoi, ancien tournoi relu)."""
+    return propager(matchs, [], noeuds=matchs.index[matchs["Noeud"] != ""])
+
+
+def matchs_modifies(avant, apres):
+    """Index des matchs dont le résultat a changé entre deux états du bracket."""
+    colonnes = [c for c in ["Score A", "Score B", "Gagnant", "Prolongation"] if c in apres.columns]
+    return [
+        i for i in apres.index
+        if i in avant.index and apres.at[i, "Type"] == "Match"
+        and any(str(avant.at[i, c]) != str(apres.at[i, c]) for c in colonnes)
+    ]
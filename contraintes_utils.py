@@ -0,0 +1,318 @@
+import random
+import time
+import pandas as pd
+
+MAX_JOUEURS = 400  # profondeur de la recherche (une unité = un appel récursif)
+BUDGET_S = 1.0     # temps de recherche par défaut (page de formation : réponse interactive)
+# Les moyennes s'affichent au centième : un écart plus petit que PRECISION ne se voit pas,
+# on ne cherche donc que des formations qui réduisent l'écart d'au moins PRECISION.
+PRECISION = 0.005
+
+
+# --- Contraintes de formation ---
+# meme_equipe : groupes de joueurs (ids) à garder dans la même équipe
+# separes     : groupes de joueurs dont aucun ne doit jouer avec un autre du groupe
+# meme_ligne  : groupes de joueurs à mettre dans le même trio / duo
+# postes      : dict id -> "Attaquant" / "Défenseur" (poste imposé)
+
+class _UnionFind:
+    def __init__(self, elements):
+        self.parent = {e: e for e in elements}
+
+    def find(self, x):
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+    def union(self, a, b):
+        self.parent[self.find(a)] = self.find(b)
+
+    def groupes(self):
+        res = {}
+        for e in self.parent:
+            res.setdefault(self.find(e), []).append(e)
+        return list(res.values())
+
+
+def _capacites(nb_joueurs, nb_lignes, nb_equipes):
+    """Taille de chaque ligne ; la ligne l appartient à l'équipe l % nb_equipes."""
+    base, reste = divmod(nb_joueurs, nb_lignes)
+    return [base + (1 if l < reste else 0) for l in range(nb_lignes)]
+
+
+def _verifier_ids(groupes, ids_connus, libelle):
+    for g in groupes:
+        inconnus = [i for i in g if i not in ids_connus]
+        if inconnus:
+            raise ValueError(f"{libelle} : joueurs absents ou non présents ({', '.join(map(str, inconnus))}).")
+
+
+def generer_equipes_contraintes(players_present, meme_equipe=(), separes=(), meme_ligne=(), postes=None,
+                                nb_equipes=2, trios_par_equipe=2, duos_par_equipe=2,
+                                budget_s=BUDGET_S, rng=None):
+    """
+    Forme des équipes équilibrées qui respectent les contraintes (même équipe, séparés,
+    même ligne, poste imposé).
+
+    Les contraintes sont d'abord propagées (regroupements, conflits de postes, tailles)
+    pour détecter tout de suite les cas impossibles, puis une recherche en profondeur
+    avec élagage place les groupes ligne par ligne en gardant la meilleure solution
+    trouvée dans `budget_s` secondes. La recherche s'arrête plus tôt dès que la borne
+    d'élagage montre qu'aucune formation ne ferait mieux (à PRECISION près).
+
+    Retourne une liste d'équipes {"trios": [DataFrame], "duos": [DataFrame], "moyenne"}.
+    Lève ValueError si aucune formation valide n'existe (ou n'est trouvée à temps).
+    """
+    rng = rng or random.Random()
+    postes = dict(postes or {})
+    joueurs = players_present.set_index("id", drop=False)
+    ids = [int(i) for i in joueurs["id"]]
+    if not ids:
+        raise ValueError("Aucun joueur présent.")
+    if len(ids) > MAX_JOUEURS:
+        raise ValueError(f"Trop de joueurs pour le solveur de contraintes (max {MAX_JOUEURS}).")
+    ids_connus = set(ids)
+    meme_equipe = [list(map(int, g)) for g in meme_equipe if len(g) > 1]
+    separes = [list(map(int, g)) for g in separes if len(g) > 1]
+    meme_ligne = [list(map(int, g)) for g in meme_ligne if len(g) > 1]
+    _verifier_ids(meme_equipe, ids_connus, "Même équipe")
+    _verifier_ids(separes, ids_connus, "Séparés")
+    _verifier_ids(meme_ligne, ids_connus, "Même ligne")
+    _verifier_ids([list(postes)], ids_connus, "Poste imposé")
+
+    att = dict(zip(ids, joueurs["talent_attaque"].astype(float)))
+    dfn = dict(zip(ids, joueurs["talent_defense"].astype(float)))
+
+    # --- 1. Unités = joueurs d'une même ligne ---
+    uf_ligne = _UnionFind(ids)
+    for g in meme_ligne:
+        for a in g[1:]:
+            uf_ligne.union(g[0], a)
+    unites = uf_ligne.groupes()
+
+    poste_unite = []
+    for u in unites:
+        imposes = {postes[i] for i in u if i in postes}
+        if len(imposes) > 1:
+            raise ValueError(f"Même ligne impossible : postes imposés différents ({', '.join(map(str, u))}).")
+        if imposes:
+            poste_unite.append((imposes.pop(), True))
+        else:
+            poste = "Attaquant" if sum(att[i] for i in u) >= sum(dfn[i] for i in u) else "Défenseur"
+            poste_unite.append((poste, False))
+
+    # --- 2. Équilibrage attaquants / défenseurs (comme generate_teams), sans toucher aux postes imposés ---
+    nb_trios, nb_duos = nb_equipes * trios_par_equipe, nb_equipes * duos_par_equipe
+    besoin_def, besoin_att = 2 * nb_duos, 3 * nb_trios
+
+    def nb(poste):
+        return sum(len(u) for u, (p, _) in zip(unites, poste_unite) if p == poste)
+
+    for poste_cible, besoin, cle in [("Défenseur", besoin_def, dfn), ("Attaquant", besoin_att, att)]:
+        autre = "Attaquant" if poste_cible == "Défenseur" else "Défenseur"
+        mobiles = sorted(
+            [k for k, (p, impose) in enumerate(poste_unite) if p == autre and not impose],
+            key=lambda k: -sum(cle[i] for i in unites[k]) / len(unites[k]),
+        )
+        for k in mobiles:
+            if nb(poste_cible) >= besoin or nb(autre) - len(unites[k]) < (besoin_att if autre == "Attaquant" else 0):
+                break
+            poste_unite[k] = (poste_cible, False)
+
+    # --- 3. Lignes et capacités ---
+    lignes = []  # (poste, équipe, capacité)
+    for poste, nb_lignes, par_equipe in [("Attaquant", nb_trios, trios_par_equipe), ("Défenseur", nb_duos, duos_par_equipe)]:
+        for l, cap in enumerate(_capacites(nb(poste), nb_lignes, nb_equipes)):
+            lignes.append((poste, l % nb_equipes, cap))
+    nb_lignes_equipe = [sum(1 for _, e, c in lignes if e == t and c > 0) for t in range(nb_equipes)]
+    poids_ligne = [1.0 / (c * nb_lignes_equipe[e]) if c else 0.0 for _, e, c in lignes]
+
+    for u, (poste, _) in zip(unites, poste_unite):
+        cap_max = max([c for p, _, c in lignes if p == poste] or [0])
+        if len(u) > cap_max:
+            raise ValueError(f"Même ligne impossible : {len(u)} joueurs pour des lignes de {cap_max} ({', '.join(map(str, u))}).")
+
+    # --- 4. Blocs = unités liées par « même équipe » ---
+    uf_equipe = _UnionFind(range(len(unites)))
+    unite_de = {i: k for k, u in enumerate(unites) for i in u}
+    for g in meme_equipe:
+        for a in g[1:]:
+            uf_equipe.union(unite_de[g[0]], unite_de[a])
+    bloc_de = {k: uf_equipe.find(k) for k in range(len(unites))}
+
+    interdits = {}  # bloc -> blocs qui ne peuvent pas être dans la même équipe
+    for g in separes:
+        blocs = [bloc_de[unite_de[i]] for i in g]
+        if len(set(blocs)) < len(blocs):
+            raise ValueError(f"Contraintes contradictoires : des joueurs à séparer doivent jouer ensemble ({', '.join(map(str, g))}).")
+        for a in blocs:
+            interdits.setdefault(a, set()).update(b for b in blocs if b != a)
+
+    cap_equipe = {(t, p): sum(c for pp, e, c in lignes if e == t and pp == p)
+                  for t in range(nb_equipes) for p in ["Attaquant", "Défenseur"]}
+    besoin_bloc = {}
+    for k, (poste, _) in enumerate(poste_unite):
+        cle = (bloc_de[k], poste)
+        besoin_bloc[cle] = besoin_bloc.get(cle, 0) + len(unites[k])
+    for (b, poste), taille in besoin_bloc.items():
+        if taille > max(cap_equipe[(t, poste)] for t in range(nb_equipes)):
+            raise ValueError("Même équipe impossible : le groupe dépasse la taille d'une équipe.")
+    for g in separes:
+        if len(g) > nb_equipes:
+            raise ValueError(f"Séparation impossible : plus de {nb_equipes} joueurs à séparer dans un groupe.")
+
+    # --- 5. Recherche en profondeur avec élagage ---
+    talent_unite = [sum((att if p == "Attaquant" else dfn)[i] for i in u) for u, (p, _) in zip(unites, poste_unite)]
+    ordre = list(range(len(unites)))
+    rng.shuffle(ordre)
+    taille_bloc = {}
+    for (b, _), n in besoin_bloc.items():
+        taille_bloc[b] = taille_bloc.get(b, 0) + n
+    # les groupes les plus contraints d'abord, puis les meilleurs joueurs (comme un snake draft)
+    ordre.sort(key=lambda k: (-taille_bloc[bloc_de[k]], -len(unites[k]), -talent_unite[k] / len(unites[k])))
+    talent_max_restant = [0.0] * (len(ordre) + 1)
+    for pos in range(len(ordre) - 1, -1, -1):
+        talent_max_restant[pos] = talent_max_restant[pos + 1] + talent_unite[ordre[pos]] * max(poids_ligne or [0])
+    # talent moyen par joueur le plus haut / le plus bas parmi les unités restantes de chaque poste
+    haut_restant = {p: [0.0] * (len(ordre) + 1) for p in ["Attaquant", "Défenseur"]}
+    bas_restant = {p: [0.0] * (len(ordre) + 1) for p in ["Attaquant", "Défenseur"]}
+    for p in haut_restant:
+        haut, bas = 0.0, float("inf")
+        for pos in range(len(ordre) - 1, -1, -1):
+            k = ordre[pos]
+            if poste_unite[k][0] == p:
+                haut = max(haut, talent_unite[k] / len(unites[k]))
+                bas = min(bas, talent_unite[k] / len(unites[k]))
+            haut_restant[p][pos], bas_restant[p][pos] = haut, (0.0 if bas == float("inf") else bas)
+    poids_equipe = {}  # (équipe, poste) -> (poids le plus bas, poids le plus haut) de ses lignes
+    for (p, e, c), w in zip(lignes, poids_ligne):
+        if c:
+            bas, haut = poids_equipe.get((e, p), (w, w))
+            poids_equipe[(e, p)] = (min(bas, w), max(haut, w))
+
+    reste_ligne = [c for _, _, c in lignes]
+    reste_equipe = dict(cap_equipe)
+    score = [0.0] * nb_equipes
+    equipe_bloc = {}
+    affectation = {}
+    meilleur = {"ecart": float("inf"), "affectation": None}
+    deadline = time.monotonic() + budget_s
+    etat = {"noeuds": 0, "expire": False, "fini": False}
+
+    def blocs_placables(pos):
+        # propagation : chaque bloc non placé doit encore avoir une équipe possible
+        vus = set()
+        for k in ordre[pos:]:
+            b = bloc_de[k]
+            if b in vus or b in equipe_bloc:
+                continue
+            vus.add(b)
+            ok = False
+            for t in range(nb_equipes):
+                if any(equipe_bloc.get(x) == t for x in interdits.get(b, ())):
+                    continue
+                if all(reste_equipe[(t, p)] >= besoin_bloc.get((b, p), 0) for p in ["Attaquant", "Défenseur"]):
+                    ok = True
+                    break
+            if not ok:
+                return False
+        return True
+
+    def borne(pos):
+        # écart final minimal : chaque équipe reçoit encore exactement reste_equipe joueurs par poste
+        bas, haut = [], []
+        for t in range(nb_equipes):
+            ajout_bas = ajout_haut = 0.0
+            for p in ["Attaquant", "Défenseur"]:
+                if reste_equipe[(t, p)]:
+                    w_bas, w_haut = poids_equipe[(t, p)]
+                    ajout_bas += reste_equipe[(t, p)] * bas_restant[p][pos] * w_bas
+                    ajout_haut += reste_equipe[(t, p)] * haut_restant[p][pos] * w_haut
+            bas.append(score[t] + ajout_bas)
+            haut.append(score[t] + ajout_haut)
+        return max(max(bas) - min(haut), max(score) - min(score) - talent_max_restant[pos], 0.0)
+
+    borne_racine = borne(0)
+
+    def dfs(pos):
+        etat["noeuds"] += 1
+        if etat["noeuds"] % 256 == 0 and time.monotonic() > deadline:
+            etat["expire"] = True
+        if etat["expire"] or etat["fini"]:
+            return
+        if borne(pos) > meilleur["ecart"] - PRECISION:
+            return  # élagage : impossible de faire visiblement mieux
+        if pos == len(ordre):
+            ecart = max(score) - min(score)
+            if ecart < meilleur["ecart"]:
+                meilleur["ecart"], meilleur["affectation"] = ecart, dict(affectation)
+                if ecart - PRECISION <= borne_racine:
+                    etat["fini"] = True  # la borne prouve qu'aucune formation ne fait mieux
+            return
+        k = ordre[pos]
+        poste, b, taille = poste_unite[k][0], bloc_de[k], len(unites[k])
+        equipe_imposee = equipe_bloc.get(b)
+        candidats = []
+        for l, (p, t, _) in enumerate(lignes):
+            if p != poste or reste_ligne[l] < taille:
+                continue
+            if equipe_imposee is not None and t != equipe_imposee:
+                continue
+            if equipe_imposee is None:
+                if any(equipe_bloc.get(x) == t for x in interdits.get(b, ())):
+                    continue
+                if any(reste_equipe[(t, pp)] < besoin_bloc.get((b, pp), 0) for pp in ["Attaquant", "Défenseur"]):
+                    continue
+            candidats.append(l)
+        # d'abord l'équipe la plus faible (comme un snake draft), lignes les moins remplies ensuite
+        candidats.sort(key=lambda l: (score[lignes[l][1]], -reste_ligne[l]))
+        deja = set()
+        for l in candidats:
+            t = lignes[l][1]
+            signature = (t, reste_ligne[l], lignes[l][2])  # lignes équivalentes : une seule branche
+            if signature in deja:
+                continue
+            deja.add(signature)
+            gain = talent_unite[k] * poids_ligne[l]
+            reste_ligne[l] -= taille
+            reste_equipe[(t, poste)] -= taille
+            score[t] += gain
+            nouveau_bloc = equipe_imposee is None
+            if nouveau_bloc:
+                equipe_bloc[b] = t
+            affectation[k] = l
+            if blocs_placables(pos + 1):
+                dfs(pos + 1)
+            del affectation[k]
+            if nouveau_bloc:
+                del equipe_bloc[b]
+            score[t] -= gain
+            reste_equipe[(t, poste)] += taille
+            reste_ligne[l] += taille
+            if etat["expire"] or etat["fini"]:
+                return
+
+    dfs(0)
+
+    if meilleur["affectation"] is None:
+        if time.monotonic() > deadline:
+            raise ValueError(f"Aucune formation trouvée en {budget_s} s. Assouplissez les contraintes.")
+        raise ValueError("Aucune formation ne respecte toutes les contraintes.")
+
+    # --- 6. Construction des équipes ---
+    membres = [[] for _ in lignes]
+    for k, l in meilleur["affectation"].items():
+        membres[l].extend(unites[k])
+    equipes = []
+    for t in range(nb_equipes):
+        trios = [joueurs.loc[membres[l]].assign(poste="Attaquant").reset_index(drop=True)
+                 for l, (p, e, _) in enumerate(lignes) if e == t and p == "Attaquant"]
+        duos = [joueurs.loc[membres[l]].assign(poste="Défenseur").reset_index(drop=True)
+                for l, (p, e, _) in enumerate(lignes) if e == t and p == "Défenseur"]
+        trios = [g if len(g) else pd.DataFrame() for g in trios]
+        duos = [g if len(g) else pd.DataFrame() for g in duos]
+        moy = [g["talent_attaque"].mean() for g in trios if not g.empty] + \
+              [g["talent_defense"].mean() for g in duos if not g.empty]
+        equipes.append({"trios": trios, "duos": duos, "moyenne": round(float(sum(moy) / len(moy)), 2) if moy else 0})
+    return equipes
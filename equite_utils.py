@@ -0,0 +1,248 @@
+"""
+Audit d'équité des matchs enregistrés : les équipes formées sont-elles vraiment égales ?
+
+Tout est calculé sur des tableaux NumPy couvrant l'historique entier (pas de boucle par
+match) : distribution de l'écart Moyenne_BLANCS − Moyenne_NOIRS, dérive par saison, et
+fréquence de chaque joueur dans l'équipe la plus forte. L'écart observé est comparé à
+celui que produit generate_teams sur des groupes de joueurs tirés au hasard dans le
+roster (ce que donnerait l'algorithme seul, sans échanges ni formation manuelle).
+
+En ligne de commande (rapport JSON, sans Streamlit) :
+    python equite_utils.py --saison 2025-2026 --simulations 200 -o equite.json
+"""
+import argparse
+import json
+import sys
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from utils import load_players, index_joueurs
+from formation_utils import generate_teams
+
+BORNES_HISTOGRAMME = np.round(np.arange(-3.0, 3.01, 0.25), 2)
+SEUILS_ECART = [0.1, 0.25, 0.5, 1.0]
+NB_SIMULATIONS = 200
+MIN_MATCHS_JOUEUR = 10  # en dessous, la fréquence côté fort n'est pas affichée
+
+Comparaison = namedtuple("Comparaison", ["observe", "simule", "ks", "ecarts_simules"])
+
+
+# --- Écarts ---
+def ecarts(hist):
+    """Moyenne_BLANCS − Moyenne_NOIRS de chaque match (NaN si une moyenne manque)."""
+    blancs = pd.to_numeric(hist["Moyenne_BLANCS"], errors="coerce").to_numpy(dtype=float)
+    noirs = pd.to_numeric(hist["Moyenne_NOIRS"], errors="coerce").to_numpy(dtype=float)
+    return blancs - noirs
+
+
+def resume_ecarts(ecart):
+    """Statistiques d'une série d'écarts : centre, dispersion, quantiles de |écart|, parts sous les seuils."""
+    ecart = ecart[~np.isnan(ecart)]
+    if len(ecart) == 0:
+        return {"nb_matchs": 0}
+    absolu = np.abs(ecart)
+    q50, q90, q95, q99 = np.quantile(absolu, [0.5, 0.9, 0.95, 0.99])
+    resume = {
+        "nb_matchs": int(len(ecart)),
+        "moyenne": round(float(ecart.mean()), 4),
+        "ecart_type": round(float(ecart.std()), 4),
+        "moyenne_abs": round(float(absolu.mean()), 4),
+        "mediane_abs": round(float(q50), 4),
+        "p90_abs": round(float(q90), 4),
+        "p95_abs": round(float(q95), 4),
+        "p99_abs": round(float(q99), 4),
+        "max_abs": round(float(absolu.max()), 4),
+        "blancs_plus_forts": round(float((ecart > 0).mean()), 4),
+    }
+    for seuil in SEUILS_ECART:
+        resume[f"part_sous_{seuil}"] = round(float((absolu <= seuil).mean()), 4)
+    return resume
+
+
+def histogramme_ecarts(ecart, bornes=BORNES_HISTOGRAMME):
+    """DataFrame Borne (début de l'intervalle) / Matchs ; les écarts hors bornes vont aux extrémités."""
+    ecart = np.clip(ecart[~np.isnan(ecart)], bornes[0], bornes[-1])
+    comptes, _ = np.histogram(ecart, bins=bornes)
+    return pd.DataFrame({"Borne": bornes[:-1], "Matchs": comptes})
+
+
+def derive_saisons(hist, ecart=None):
+    """Par saison : matchs, écart moyen (signe = côté favorisé), |écart| moyen et p95."""
+    ecart = ecarts(hist) if ecart is None else ecart
+    df = pd.DataFrame({"Saison": hist["Saison"].astype(str).to_numpy(), "Écart": ecart}).dropna()
+    df["|Écart|"] = df["Écart"].abs()
+    groupes = df.groupby("Saison", sort=True)
+    derive = pd.DataFrame({
+        "Matchs": groupes.size(),
+        "Écart moyen": groupes["Écart"].mean(),
+        "|Écart| moyen": groupes["|Écart|"].mean(),
+        "|Écart| p95": groupes["|Écart|"].quantile(0.95),
+        "BLANCS plus forts": groupes["Écart"].agg(lambda e: (e > 0).mean()),
+    })
+    return derive.round(4).reset_index()
+
+
+# --- Joueurs côté fort ---
+def _texte_par_match(hist, colonne):
+    """Colonne en texte nettoyé ("" si absente ou vide), indexée par la position du match."""
+    valeurs = hist[colonne].to_numpy() if colonne in hist.columns else [None] * len(hist)
+    textes = pd.Series(valeurs, index=pd.RangeIndex(len(hist)), dtype=object)
+    return textes.where(textes.notna(), "").astype(str).str.strip()
+
+
+def _ids_plats(hist, couleur):
+    """(ids, indice du match) de tous les joueurs d'une couleur, en deux tableaux.
+
+    Les lignes sans `Ids_*` (tout l'historique enregistré avant les ids) sont reliées
+    par le nom, via l'index des joueurs.
+    """
+    textes = _texte_par_match(hist, f"Ids_{couleur}")
+    avec_ids = textes != ""
+    # un élément par joueur, l'index (position du match) suit chaque id
+    ids = pd.to_numeric(textes[avec_ids].str.split(",").explode().str.strip(), errors="coerce")
+    noms = _texte_par_match(hist, f"Équipe_{couleur}")[~avec_ids].str.split(",").explode().str.strip()
+    noms = noms[noms != ""]
+    anciens = noms.map(index_joueurs().nom_vers_id) if len(noms) else noms
+    tous = pd.to_numeric(pd.concat([ids, anciens]), errors="coerce").dropna()
+    return tous.to_numpy(dtype=np.int64), tous.index.to_numpy(dtype=np.int64)
+
+
+def cote_fort_joueurs(hist, players=None, ecart=None, min_matchs=MIN_MATCHS_JOUEUR):
+    """Par joueur : matchs (hors égalités), matchs dans l'équipe la plus forte, fréquence et écart-réduit z.
+
+    z = (côté fort − n/2) / √(n/4) : au-delà de ±2 environ, le joueur tombe plus (ou moins)
+    souvent qu'au hasard du côté favorisé.
+    """
+    ecart = ecarts(hist) if ecart is None else ecart
+    blancs_forts = ecart > 0
+    decide = ~np.isnan(ecart) & (ecart != 0)
+    ids_b, matchs_b = _ids_plats(hist, "BLANCS")
+    ids_n, matchs_n = _ids_plats(hist, "NOIRS")
+    ids = np.concatenate([ids_b, ids_n])
+    matchs = np.concatenate([matchs_b, matchs_n])
+    fort = np.concatenate([blancs_forts[matchs_b], ~blancs_forts[matchs_n]])
+    garde = decide[matchs] & (ids >= 0)
+    ids, fort = ids[garde], fort[garde]
+    if len(ids) == 0:
+        return pd.DataFrame(columns=["id", "Joueur", "Matchs", "Côté fort", "Fréquence", "z"])
+    n = np.bincount(ids)
+    k = np.bincount(ids[fort], minlength=len(n))
+    presents = np.flatnonzero(n >= max(min_matchs, 1))
+    n, k = n[presents], k[presents]
+    resultat = pd.DataFrame({
+        "id": presents,
+        "Matchs": n,
+        "Côté fort": k,
+        "Fréquence": np.round(k / n, 4),
+        "z": np.round((k - n / 2) / np.sqrt(n / 4), 2),
+    })
+    if players is not None and "id" in players.columns:
+        noms = dict(zip(players["id"].astype(int), players["nom"]))
+        resultat.insert(1, "Joueur", [noms.get(int(i), str(i)) for i in presents])
+    else:
+        resultat.insert(1, "Joueur", presents.astype(str))
+    return resultat.sort_values("z", ascending=False, key=np.abs).reset_index(drop=True)
+
+
+# --- Comparaison avec l'algorithme ---
+def taille_groupes(hist):
+    """Nombre médian de joueurs par match (BLANCS + NOIRS), 20 si l'historique ne le dit pas."""
+    tailles = []
+    for couleur in ["BLANCS", "NOIRS"]:
+        colonne = f"Ids_{couleur}"
+        if colonne in hist.columns:
+            textes = hist[colonne].dropna().astype(str)
+            textes = textes[textes.str.strip() != ""]
+            tailles.append(textes.str.count(",").to_numpy() + 1)
+    if not tailles or min(len(t) for t in tailles) == 0:
+        return 20
+    n = min(len(t) for t in tailles)
+    return int(np.median(tailles[0][:n] + tailles[1][:n]))
+
+
+def ecarts_simules(players, nb_joueurs=20, nb_simulations=NB_SIMULATIONS, graine=None):
+    """Écarts moyB − moyN de generate_teams sur nb_simulations groupes tirés dans le roster."""
+    rng = np.random.default_rng(graine)
+    players = players.reset_index(drop=True)
+    nb_joueurs = min(nb_joueurs, len(players))
+    resultats = np.full(nb_simulations, np.nan)
+    for s in range(nb_simulations):
+        groupe = players.iloc[rng.choice(len(players), size=nb_joueurs, replace=False)].reset_index(drop=True)
+        teams = generate_teams(groupe, graine=int(rng.integers(2 ** 32)))
+        if teams is not None:
+            resultats[s] = teams["moyB"] - teams["moyN"]
+    return resultats[~np.isnan(resultats)]
+
+
+def ks_2echantillons(a, b):
+    """Statistique de Kolmogorov-Smirnov (écart max entre les deux fonctions de répartition)."""
+    a, b = np.sort(a), np.sort(b)
+    if len(a) == 0 or len(b) == 0:
+        return float("nan")
+    valeurs = np.concatenate([a, b])
+    fa = np.searchsorted(a, valeurs, side="right") / len(a)
+    fb = np.searchsorted(b, valeurs, side="right") / len(b)
+    return round(float(np.max(np.abs(fa - fb))), 4)
+
+
+def comparer_algorithme(hist, players, nb_simulations=NB_SIMULATIONS, graine=None, ecart=None):
+    """|écart| observé vs |écart| de generate_teams seul, avec la statistique KS entre les deux."""
+    ecart = ecarts(hist) if ecart is None else ecart
+    simules = ecarts_simules(players, taille_groupes(hist), nb_simulations, graine)
+    observe = np.abs(ecart[~np.isnan(ecart)])
+    return Comparaison(
+        observe=resume_ecarts(ecart),
+        simule=resume_ecarts(simules),
+        ks=ks_2echantillons(observe, np.abs(simules)),
+        ecarts_simules=simules,
+    )
+
+
+# --- Rapport ---
+def audit(hist, players=None, nb_simulations=0, graine=None):
+    """Rapport complet (dict sérialisable en JSON) ; nb_simulations=0 saute la comparaison."""
+    ecart = ecarts(hist)
+    rapport = {
+        "ecarts": resume_ecarts(ecart),
+        "histogramme": histogramme_ecarts(ecart).to_dict("records"),
+        "saisons": derive_saisons(hist, ecart).to_dict("records"),
+        "joueurs": cote_fort_joueurs(hist, players, ecart).to_dict("records"),
+    }
+    if nb_simulations and players is not None and not players.empty:
+        comparaison = comparer_algorithme(hist, players, nb_simulations, graine, ecart)
+        rapport["algorithme"] = {"simule": comparaison.simule, "ks": comparaison.ks}
+    return rapport
+
+
+def _json(valeur):
+    if hasattr(valeur, "item"):
+        return valeur.item()
+    raise TypeError(f"{type(valeur).__name__} non sérialisable")
+
+
+def main(argv=None):
+    from historique_utils import charger_historique
+
+    parser = argparse.ArgumentParser(description="Audit d'équité des matchs enregistrés.")
+    parser.add_argument("-o", "--output", help="Fichier JSON de sortie (défaut : stdout)")
+    parser.add_argument("--saison", action="append", help="Saison à auditer (répétable ; défaut : toutes)")
+    parser.add_argument("--simulations", type=int, default=NB_SIMULATIONS,
+                        help="Formations simulées avec generate_teams (0 = sans comparaison)")
+    parser.add_argument("--graine", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    hist = charger_historique(args.saison)
+    rapport = audit(hist, load_players(), args.simulations, args.graine)
+    texte = json.dumps(rapport, indent=2, ensure_ascii=False, default=_json)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(texte)
+        print(f"Rapport écrit dans {args.output}", file=sys.stderr)
+    else:
+        print(texte)
+
+
+if __name__ == "__main__":
+    main()
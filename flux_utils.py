@@ -0,0 +1,322 @@
+"""
+Journal du tournoi en cours (data/tournoi_flux.jsonl) : source de vérité de son état.
+
+La première ligne est un instantané complet (matchs + infos du tournoi), écrit d'un bloc
+à la création puis à chaque compaction. Chaque enregistrement de score ou équipe placée
+dans le bracket (bracket_utils.propager) ajoute ensuite un événement par match modifié (valeurs absolues,
+donc rejouables) : une écriture de quelques octets, synchronisée sur disque, au lieu de
+réécrire le bracket. Au chargement, l'état est l'instantané + les événements qui suivent ;
+une dernière ligne tronquée par un arrêt brutal est ignorée puis réparée. Un recalage de
+l'horaire (tournoi_utils.recaler_horaire) est un seul événement « horaire » qui porte les
+nouveaux débuts des lignes décalées.
+
+La version du flux est le nombre d'événements depuis la création du tournoi (la
+compaction la conserve) : un spectateur qui connaît la version v ne reçoit que les
+événements suivants, et l'état du tableau est calculé une seule fois par version pour
+toutes les sessions du serveur. tournoi_bracket.csv et tournoi_info.json n'en sont plus
+que des copies, réécrites de façon atomique à la création et à la compaction.
+"""
+import functools
+import io
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from ligues_utils import CheminLigue
+from utils import version_fichier, ecrire_csv_atomique
+from tournoi_utils import classement_from_results, completer_debuts, dessiner_horaire
+from bracket_utils import completer_sources
+
+BRACKET_FILE = CheminLigue("tournoi_bracket.csv")
+INFO_FILE = CheminLigue("tournoi_info.json")
+FLUX_FILE = CheminLigue("tournoi_flux.jsonl")
+
+CHAMPS_SCORE = ["Score A", "Score B", "Gagnant", "Prolongation"]
+CHAMPS_EQUIPES = ["Équipe A", "Équipe B"]
+CHAMPS_HORAIRE = ["Début", "Heure", "Durée (min)"]
+COMPACTER_APRES = 200  # événements après l'instantané avant d'en écrire un nouveau
+
+_verrou = threading.RLock()
+
+
+# --- Écriture ---
+def _valeur_json(v):
+    if isinstance(v, bool) or v is None:
+        return v
+    if hasattr(v, "item"):  # types NumPy
+        v = v.item()
+    if isinstance(v, float) and pd.isna(v):
+        return None
+    return v
+
+
+def _ligne(enregistrement):
+    return json.dumps(enregistrement, ensure_ascii=False) + "\n"
+
+
+def _instantane(type_, tournoi, base, matchs, info):
+    return {
+        "t": datetime.now().isoformat(timespec="seconds"), "type": type_, "tournoi": tournoi, "base": base,
+        "info": info,
+        "matchs": [{k: _valeur_json(v) for k, v in r.items()} for r in matchs.to_dict("records")],
+    }
+
+
+def _ecrire_atomique(path, contenu):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        f.write(contenu)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(f"{path}.tmp", path)
+
+
+def _copies(matchs, info, bracket, info_path):
+    # copies lisibles du dernier instantané (exports, synchronisation GitHub)
+    ecrire_csv_atomique(matchs, bracket)
+    _ecrire_atomique(info_path, json.dumps(info, ensure_ascii=False))
+
+
+def creer_tournoi(matchs, info, path=FLUX_FILE, bracket=BRACKET_FILE, info_path=INFO_FILE):
+    """Nouveau tournoi : le journal repart d'un instantané (les spectateurs se resynchronisent)."""
+    horodatage = datetime.now().isoformat(timespec="seconds")
+    with _verrou:
+        _ecrire_atomique(path, _ligne(_instantane("nouveau_tournoi", horodatage, 0, matchs, info)))
+        _copies(matchs, info, bracket, info_path)
+
+
+def _reparer_fin(f):
+    # arrêt brutal pendant un ajout : on coupe la ligne incomplète avant d'écrire
+    f.seek(0, os.SEEK_END)
+    taille = f.tell()
+    if taille == 0:
+        return
+    f.seek(taille - 1)
+    if f.read(1) == b"\n":
+        return
+    f.seek(0)
+    contenu = f.read()
+    f.truncate(contenu.rfind(b"\n") + 1)
+
+
+def publier(evenements, path=FLUX_FILE):
+    """Ajoute des événements au journal en une seule écriture synchronisée ; retourne la nouvelle version."""
+    if not evenements:
+        return version_flux(path)
+    horodatage = datetime.now().isoformat(timespec="seconds")
+    lignes = "".join(_ligne({"t": horodatage, **{k: _valeur_json(v) for k, v in e.items()}}) for e in evenements)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with _verrou:
+        with open(path, "a+b") as f:
+            _reparer_fin(f)
+            f.write(lignes.encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+        if len(_journal(os.path.abspath(path), version_fichier(path))[1]) > COMPACTER_APRES:
+            compacter(path)
+    return version_flux(path)
+
+
+def compacter(path=FLUX_FILE, bracket=BRACKET_FILE, info_path=INFO_FILE):
+    """Réécrit le journal en un seul instantané de l'état courant (même version, même tournoi)."""
+    with _verrou:
+        instantane, evenements = _journal(os.path.abspath(path), version_fichier(path))
+        if instantane is None:
+            return
+        matchs, info = etat_tournoi(path)
+        base = instantane.get("base", 0) + len(evenements)
+        _ecrire_atomique(path, _ligne(_instantane("instantane", _id_tournoi(instantane), base, matchs, info)))
+        _copies(matchs, info, bracket, info_path)
+
+
+def differences(avant, apres):
+    """Événements pour les matchs dont le score ou les équipes ont changé entre deux brackets."""
+    evenements = []
+    for i in apres.index:
+        if i not in avant.index or apres.at[i, "Type"] != "Match":
+            continue
+        if any(str(avant.at[i, c]) != str(apres.at[i, c]) for c in CHAMPS_EQUIPES):
+            evenements.append({"type": "equipes", "match": int(i), **{c: apres.at[i, c] for c in CHAMPS_EQUIPES}})
+        champs = [c for c in CHAMPS_SCORE if c in apres.columns]
+        if any(c not in avant.columns or str(avant.at[i, c]) != str(apres.at[i, c]) for c in champs):
+            evenements.append({"type": "score", "match": int(i), **{c: apres.at[i, c] for c in champs}})
+    # horaire recalé : un seul événement pour toutes les lignes décalées (pauses comprises)
+    horaire = {
+        str(i): {c: _valeur_json(apres.at[i, c]) for c in CHAMPS_HORAIRE}
+        for i in apres.index
+        if i in avant.index and all(c in avant.columns and c in apres.columns for c in CHAMPS_HORAIRE)
+        and any(str(avant.at[i, c]) != str(apres.at[i, c]) for c in CHAMPS_HORAIRE)
+    }
+    if horaire:
+        evenements.append({"type": "horaire", "lignes": horaire})
+    return evenements
+
+
+def importer_ancien_tournoi(path=FLUX_FILE, bracket=BRACKET_FILE, info_path=INFO_FILE):
+    """Tournoi créé avant le journal : le bracket et les infos deviennent l'instantané.
+
+    Le nombre d'événements déjà publiés est conservé pour ne pas resynchroniser les spectateurs.
+    """
+    with _verrou:
+        instantane, evenements = _journal(os.path.abspath(path), version_fichier(path))
+        if instantane is not None or not os.path.exists(bracket):
+            return
+        info = {}
+        if os.path.exists(info_path):
+            with open(info_path, encoding="utf-8") as f:
+                info = json.load(f)
+        ancien = evenements[0] if evenements else {}
+        tournoi = ancien.get("t") or datetime.now().isoformat(timespec="seconds")
+        base = max(len(evenements) - 1, 0)
+        matchs = completer_colonnes(pd.read_csv(bracket))
+        _ecrire_atomique(path, _ligne(_instantane("instantane", tournoi, base, matchs, info)))
+
+
+# --- Lecture ---
+@functools.lru_cache(maxsize=8)
+def _journal(path, version):
+    """(instantané ou None, événements qui suivent) ; les lignes illisibles sont ignorées."""
+    if not os.path.exists(path):
+        return None, ()
+    enregistrements = []
+    with open(path, encoding="utf-8") as f:
+        for l in f:
+            try:
+                enregistrements.append(json.loads(l))
+            except json.JSONDecodeError:
+                continue  # ligne tronquée par un arrêt pendant l'écriture
+    if enregistrements and "matchs" in enregistrements[0]:
+        return enregistrements[0], tuple(enregistrements[1:])
+    return None, tuple(enregistrements)
+
+
+def _id_tournoi(premier):
+    return premier.get("tournoi") or premier.get("t")
+
+
+def _lignes_flux(path):
+    # (version de la première ligne du fichier, lignes) ; l'instantané compte pour une ligne
+    instantane, evenements = _journal(os.path.abspath(path), version_fichier(path))
+    if instantane is None:
+        return 0, evenements
+    return instantane.get("base", 0), (instantane,) + evenements
+
+
+def version_flux(path=FLUX_FILE):
+    """Nombre d'événements publiés depuis la création du tournoi (un simple stat si rien n'a changé)."""
+    base, lignes = _lignes_flux(path)
+    return base + len(lignes)
+
+
+def evenements_depuis(version, tournoi=None, path=FLUX_FILE, attendre_s=0.0, intervalle_s=0.5):
+    """Événements publiés après `version` ; attend au plus attendre_s qu'il y en ait.
+
+    `tournoi` identifie le flux (horodatage de sa création) : si le client en connaît un
+    autre, une version plus grande que l'actuelle ou une version déjà compactée dans
+    l'instantané, tout est renvoyé à partir de l'instantané avec reinitialise=True pour
+    qu'il reparte de zéro.
+    """
+    limite = time.monotonic() + attendre_s
+    while True:
+        base, lignes = _lignes_flux(path)
+        actuel = _id_tournoi(lignes[0]) if lignes else None
+        change = base + len(lignes) != version or (tournoi is not None and tournoi != actuel)
+        if change or time.monotonic() >= limite:
+            break
+        time.sleep(intervalle_s)
+    total = base + len(lignes)
+    reinitialise = version > total or version < base or (tournoi is not None and tournoi != actuel)
+    return {
+        "version": total,
+        "tournoi": actuel,
+        "evenements": list(lignes if reinitialise else lignes[version - base:]),
+        "reinitialise": reinitialise,
+    }
+
+
+def appliquer_evenements(matchs, evenements):
+    """Rejoue des événements sur un bracket (copie) ; les valeurs sont absolues."""
+    matchs = matchs.copy()
+    for e in evenements:
+        if e.get("type") == "horaire":
+            for i, valeurs in e.get("lignes", {}).items():
+                if int(i) in matchs.index:
+                    for c, v in valeurs.items():
+                        matchs.at[int(i), c] = v
+            continue
+        i = e.get("match")
+        if i is None or i not in matchs.index:
+            continue
+        champs = CHAMPS_SCORE if e["type"] == "score" else CHAMPS_EQUIPES if e["type"] == "equipes" else []
+        for c in champs:
+            if c in e:
+                if c not in matchs.columns:
+                    matchs[c] = None
+                matchs.at[i, c] = e[c] if e[c] is not None else ""
+    return matchs
+
+
+def completer_colonnes(matchs):
+    """Colonnes de résultats (et du bracket) absentes d'un bracket fraîchement créé ou ancien."""
+    for col, defaut in [("Score A", 0), ("Score B", 0), ("Gagnant", ""), ("Prolongation", False)]:
+        if col not in matchs.columns:
+            matchs[col] = defaut
+    matchs["Gagnant"] = matchs["Gagnant"].fillna("").astype(object)
+    return completer_sources(matchs)
+
+
+@functools.lru_cache(maxsize=4)
+def _etat(path, version):
+    instantane, evenements = _journal(path, version)
+    info = instantane.get("info") or {}
+    matchs = completer_debuts(completer_colonnes(pd.DataFrame(instantane["matchs"])), info.get("date"))
+    matchs = appliquer_evenements(matchs, evenements)
+    return matchs, info, classement_from_results(matchs)
+
+
+def etat_tournoi(path=FLUX_FILE):
+    """(matchs, infos) du tournoi en cours, rejoués depuis le journal, ou (None, None).
+
+    Calculé une fois par version du journal et partagé : copier avant de modifier.
+    """
+    if _journal(os.path.abspath(path), version_fichier(path))[0] is None:
+        importer_ancien_tournoi(path)
+        if _journal(os.path.abspath(path), version_fichier(path))[0] is None:
+            return None, None
+    matchs, info, _ = _etat(os.path.abspath(path), version_fichier(path))
+    return matchs, info
+
+
+@functools.lru_cache(maxsize=4)
+def _pdf_horaire(path, version, titre):
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+
+    matchs, _, _ = _etat(path, version)
+    tampon = io.BytesIO()
+    pdf = canvas.Canvas(tampon, pagesize=letter)
+    dessiner_horaire(pdf, matchs, titre)
+    pdf.save()
+    return tampon.getvalue()
+
+
+def pdf_horaire(titre, path=FLUX_FILE):
+    """PDF de l'horaire du tournoi en cours, refait seulement quand le journal change (score, recalage)."""
+    if etat_tournoi(path)[0] is None:
+        return None
+    return _pdf_horaire(os.path.abspath(path), version_fichier(path), titre)
+
+
+def etat_tableau(path=FLUX_FILE):
+    """(matchs, classement) du tournoi en cours, ou (None, None) s'il n'y en a pas.
+
+    Calculé une fois par version du journal et partagé : ne pas modifier les DataFrames.
+    """
+    if etat_tournoi(path)[0] is None:
+        return None, None
+    matchs, _, classement = _etat(os.path.abspath(path), version_fichier(path))
+    return matchs, classement
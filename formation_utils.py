@@ -0,0 +1,392 @@
+import functools
+import hashlib
+import secrets
+import numpy as np
+import pandas as pd
+
+# Version de l'algorithme de formation : à incrémenter dès qu'un changement modifie les
+# équipes produites pour une même graine (l'historique ne peut alors plus être rejoué).
+VERSION_ALGO = 1
+
+
+def nouvelle_graine():
+    """Graine aléatoire (entier de 32 bits) pour une nouvelle formation."""
+    return secrets.randbits(32)
+
+
+# --- Répartition snake draft ---
+def snake_draft(df, nb_groupes, colonne, rng=None):
+    """Répartit les joueurs en `nb_groupes` groupes équilibrés (ordre serpentin).
+
+    `rng` (numpy Generator) départage les talents égaux ; sans lui, le tirage n'est pas reproductible.
+    """
+    if df.empty:
+        return [pd.DataFrame() for _ in range(nb_groupes)]
+    rng = rng if rng is not None else np.random.default_rng()
+    df = df.sample(frac=1, random_state=rng).sort_values(colonne, ascending=False, kind="stable").reset_index(drop=True)
+    groupes = [[] for _ in range(nb_groupes)]
+    sens, idx = 1, 0
+    for _, joueur in df.iterrows():
+        groupes[idx].append(joueur)
+        idx += sens
+        if idx == nb_groupes:
+            sens, idx = -1, nb_groupes - 1
+        elif idx < 0:
+            sens, idx = 1, 0
+    return [pd.DataFrame(g) for g in groupes]
+
+
+def attribuer_postes(players_present):
+    """Ajoute la colonne `poste` (Attaquant / Défenseur) selon le meilleur talent."""
+    players_present = players_present.copy()
+    players_present["poste"] = np.where(
+        players_present["talent_attaque"] >= players_present["talent_defense"], "Attaquant", "Défenseur"
+    )
+    return players_present
+
+
+# --- Candidats par poste (cache par contenu du groupe) ---
+COLONNES_CANDIDATS = ["id", "nom", "talent_attaque", "talent_defense"]
+
+
+class _Groupe:
+    """Clé de cache : ids (dans l'ordre) et empreinte de leurs talents.
+
+    Les talents voyagent avec la clé pour le calcul mais n'entrent ni dans le hash ni
+    dans la comparaison.
+    """
+    __slots__ = ("ids", "empreinte", "talents")
+
+    def __init__(self, players_present):
+        self.talents = players_present[["talent_attaque", "talent_defense"]].reset_index(drop=True)
+        ids = players_present["id"].to_numpy(dtype=np.int64)
+        self.ids = tuple(ids.tolist())
+        lignes = np.column_stack([ids.astype(float), self.talents.to_numpy(dtype=float)])
+        self.empreinte = hashlib.sha256(np.ascontiguousarray(lignes).tobytes()).hexdigest()
+
+    def __hash__(self):
+        return hash((self.ids, self.empreinte))
+
+    def __eq__(self, autre):
+        return isinstance(autre, _Groupe) and (self.ids, self.empreinte) == (autre.ids, autre.empreinte)
+
+
+def _partager(talents, equilibrer):
+    """Positions (0..n-1) des attaquants et des défenseurs, et poste de chaque joueur."""
+    joueurs = attribuer_postes(talents)
+    attaquants = joueurs[joueurs["poste"] == "Attaquant"]
+    defenseurs = joueurs[joueurs["poste"] == "Défenseur"]
+
+    if equilibrer:
+        if len(defenseurs) < 8:
+            supl = attaquants.nlargest(8 - len(defenseurs), "talent_defense")
+            defenseurs = pd.concat([defenseurs, supl])
+            attaquants = attaquants.drop(supl.index)
+
+        if len(attaquants) < 12:
+            supl = defenseurs.nlargest(12 - len(attaquants), "talent_attaque")
+            attaquants = pd.concat([attaquants, supl])
+            defenseurs = defenseurs.drop(supl.index)
+
+    return tuple(attaquants.index), tuple(defenseurs.index), tuple(joueurs["poste"])
+
+
+@functools.lru_cache(maxsize=32)
+def _candidats(groupe, equilibrer):
+    return _partager(groupe.talents, equilibrer)
+
+
+def candidats_postes(players_present, equilibrer=True):
+    """(attaquants, défenseurs) du groupe, postes attribués ; avec `equilibrer`, complétés
+    à 12 attaquants et 8 défenseurs comme pour deux équipes.
+
+    Le partage est mis en cache par (ids présents, empreinte de leurs talents) : cocher les
+    présences et sauvegarder joueurs.csv ne l'invalide pas, retoucher un talent si.
+    presences_utils.prechauffer_formation le calcule d'avance pour le roster probable.
+    """
+    ids_att, ids_def, postes = _candidats(_Groupe(players_present), equilibrer)
+    joueurs = players_present.reset_index(drop=True).assign(poste=list(postes))
+    return joueurs.loc[list(ids_att)].copy(), joueurs.loc[list(ids_def)].copy()
+
+
+# --- Deux équipes équilibrées (BLANCS / NOIRS) ---
+def _melanger(groupes, rng):
+    return [groupes[k] for k in rng.permutation(len(groupes))]
+
+
+def generate_teams(players_present: pd.DataFrame, graine=None):
+    """Forme deux équipes équilibrées de 2 trios et 2 duos chacune.
+
+    Tout le hasard vient d'un générateur initialisé par `graine` (tirée au hasard si absente
+    et retournée sous la clé "graine") : la même graine, le même groupe de joueurs dans le
+    même ordre et la même VERSION_ALGO redonnent exactement les mêmes équipes.
+    """
+    if players_present.empty:
+        return None
+
+    graine = nouvelle_graine() if graine is None else int(graine)
+    rng = np.random.default_rng(graine)
+    attaquants, defenseurs = candidats_postes(players_present)
+
+    trios = _melanger(snake_draft(attaquants, 4, "talent_attaque", rng), rng)
+    duos = _melanger(snake_draft(defenseurs, 4, "talent_defense", rng), rng)
+
+    equipeB_trios = trios[::2]
+    equipeN_trios = trios[1::2]
+    equipeB_duos = duos[::2]
+    equipeN_duos = duos[1::2]
+
+    def moyenne(unites, colonne):
+        valeurs = [u[colonne].mean() for u in unites if not u.empty]
+        return round(sum(valeurs) / len(valeurs), 2) if valeurs else 0
+
+    moyB = round((moyenne(equipeB_trios, "talent_attaque") + moyenne(equipeB_duos, "talent_defense")) / 2, 2)
+    moyN = round((moyenne(equipeN_trios, "talent_attaque") + moyenne(equipeN_duos, "talent_defense")) / 2, 2)
+
+    # compter les joueurs
+    nb_joueurs_B = sum(len(t) for t in (equipeB_trios + equipeB_duos))
+    nb_joueurs_N = sum(len(t) for t in (equipeN_trios + equipeN_duos))
+
+    return dict(
+        equipeB_trios=equipeB_trios,
+        equipeN_trios=equipeN_trios,
+        equipeB_duos=equipeB_duos,
+        equipeN_duos=equipeN_duos,
+        moyB=moyB,
+        moyN=moyN,
+        nbB=nb_joueurs_B,
+        nbN=nb_joueurs_N,
+        graine=graine,
+    )
+
+
+# --- Quatre équipes pour le tournoi ---
+NOMS_EQUIPES_TOURNOI = ["BLANCS ⚪", "NOIRS ⚫", "ROUGES 🔴", "VERTS 🟢"]
+
+
+def generer_equipes_tournoi(players_present, graine=None):
+    """Forme les 4 équipes du tournoi (2 trios et 2 duos chacune) avec leur moyenne.
+
+    Même graine et même groupe de joueurs -> mêmes équipes (voir generate_teams).
+    """
+    rng = np.random.default_rng(graine)
+    attaquants, defenseeurs = candidats_postes(players_present, equilibrer=False)
+
+    trios = _melanger(snake_draft(attaquants, 8, "talent_attaque", rng), rng)
+    duos = _melanger(snake_draft(defenseeurs, 8, "talent_defense", rng), rng)
+
+    equipes = {
+        nom: {"trios": trios[2 * k:2 * k + 2], "duos": duos[2 * k:2 * k + 2]}
+        for k, nom in enumerate(NOMS_EQUIPES_TOURNOI)
+    }
+
+    for nom, eq in equipes.items():
+        moy_trios = [t["talent_attaque"].mean() for t in eq["trios"] if not t.empty]
+        moy_duos = [d["talent_defense"].mean() for d in eq["duos"] if not d.empty]
+        eq["moyenne"] = round(sum(moy_trios + moy_duos) / len(moy_trios + moy_duos), 2)
+    return equipes
+
+
+# --- Suggestions d'échanges entre équipes existantes ---
+def _positions_joueurs(equipes, talents):
+    """Aplatit les équipes : une entrée par joueur (équipe, type de ligne, ligne, talent, poids)."""
+    joueurs = []
+    for e, eq in enumerate(equipes):
+        for type_ligne in ["trios", "duos"]:
+            # poids d'un joueur dans la moyenne de l'équipe (voir moyennes_equipes)
+            nb_lignes = sum(1 for l in eq.get(type_ligne, []) if len(l))
+            for li, ligne in enumerate(eq.get(type_ligne, [])):
+                for pos, id_ in enumerate(ligne):
+                    att, dfn = talents[id_]
+                    joueurs.append((e, 0 if type_ligne == "trios" else 1, li, pos, id_,
+                                    att if type_ligne == "trios" else dfn,
+                                    1.0 / (2 * len(ligne) * nb_lignes)))
+    return joueurs
+
+
+def moyennes_equipes(equipes, talents):
+    """Moyenne de chaque équipe, comme generate_teams : (moyenne des trios + moyenne des duos) / 2,
+    chacune étant la moyenne des moyennes des lignes non vides (0 sans ligne)."""
+    moyennes = []
+    for eq in equipes:
+        trios = [np.mean([talents[i][0] for i in t]) for t in eq.get("trios", []) if len(t)]
+        duos = [np.mean([talents[i][1] for i in d]) for d in eq.get("duos", []) if len(d)]
+        moyennes.append(((float(np.mean(trios)) if trios else 0.0) + (float(np.mean(duos)) if duos else 0.0)) / 2)
+    return np.array(moyennes)
+
+
+def _ecart(moyennes):
+    """Écart d'un ensemble d'équipes (dernier axe) : plus forte moins plus faible."""
+    return moyennes.max(axis=-1) - moyennes.min(axis=-1)
+
+
+def meilleurs_echanges(equipes, talents, n=5, deux_pour_deux=True):
+    """
+    Cherche les échanges de joueurs qui réduisent le plus l'écart entre les équipes.
+
+    `equipes` : liste d'équipes {"trios": [[id, ...], ...], "duos": [[id, ...], ...]}
+    `talents` : dict id -> (talent_attaque, talent_defense)
+
+    Tous les échanges 1 pour 1 (et 2 pour 2) entre deux équipes sont évalués d'un coup
+    avec une matrice de variations ; un attaquant ne s'échange qu'avec un attaquant
+    (trio) et un défenseur qu'avec un défenseur (duo). Retourne au plus `n` échanges
+    qui améliorent l'écart, du meilleur au moins bon.
+    """
+    joueurs = _positions_joueurs(equipes, talents)
+    if len(equipes) < 2 or not joueurs:
+        return []
+    moy = moyennes_equipes(equipes, talents)
+    ecart_avant = float(_ecart(moy))
+    nb_equipes = len(equipes)
+
+    equipe = np.array([j[0] for j in joueurs])
+    genre = np.array([j[1] for j in joueurs])
+    talent = np.array([j[5] for j in joueurs], dtype=float)
+    poids = np.array([j[6] for j in joueurs], dtype=float)
+
+    candidats = []
+
+    def evaluer(sortants, entrants, equipe_a, equipe_b, delta_a, delta_b, valide, taille):
+        # nouvelles moyennes : (nb_paires, nb_equipes)
+        nouvelles = np.broadcast_to(moy, valide.shape + (nb_equipes,)).copy()
+        ia, ib = np.nonzero(valide)
+        if not len(ia):
+            return
+        nouvelles = nouvelles[ia, ib]
+        lignes = np.arange(len(ia))
+        nouvelles[lignes, equipe_a[ia, ib]] += delta_a[ia, ib]
+        nouvelles[lignes, equipe_b[ia, ib]] += delta_b[ia, ib]
+        ecarts = _ecart(nouvelles)
+        ameliore = ecarts < ecart_avant - 1e-9
+        meilleurs = np.argsort(ecarts[ameliore], kind="stable")[:n]
+        for k in np.flatnonzero(ameliore)[meilleurs]:
+            candidats.append({
+                "type": taille,
+                "equipe_1": int(equipe_a[ia[k], ib[k]]),
+                "sortants": [joueurs[p][4] for p in sortants[ia[k]]],
+                "equipe_2": int(equipe_b[ia[k], ib[k]]),
+                "entrants": [joueurs[p][4] for p in entrants[ib[k]]],
+                "ecart_avant": round(ecart_avant, 3),
+                "ecart_apres": round(float(ecarts[k]), 3),
+            })
+
+    # --- 1 pour 1 : matrice (joueur i, joueur j) ---
+    diff = talent[None, :] - talent[:, None]          # talent(j) - talent(i)
+    valide = (equipe[:, None] < equipe[None, :]) & (genre[:, None] == genre[None, :])
+    indices = np.arange(len(joueurs))[:, None]
+    evaluer(
+        indices, indices,
+        np.broadcast_to(equipe[:, None], valide.shape), np.broadcast_to(equipe[None, :], valide.shape),
+        diff * poids[:, None], -diff * poids[None, :], valide, "1 pour 1",
+    )
+
+    # --- 2 pour 2 : paires d'une même équipe et d'un même type de ligne ---
+    if deux_pour_deux:
+        paires = [(a, b) for a in range(len(joueurs)) for b in range(a + 1, len(joueurs))
+                  if equipe[a] == equipe[b] and genre[a] == genre[b]]
+        if paires:
+            u = np.array(paires)                                  # non ordonnées (sortants)
+            v = np.concatenate([u, u[:, ::-1]])                   # ordonnées (entrants)
+            p1, p2 = u[:, 0][:, None], u[:, 1][:, None]
+            q1, q2 = v[:, 0][None, :], v[:, 1][None, :]
+            delta_a = (talent[q1] - talent[p1]) * poids[p1] + (talent[q2] - talent[p2]) * poids[p2]
+            delta_b = (talent[p1] - talent[q1]) * poids[q1] + (talent[p2] - talent[q2]) * poids[q2]
+            eq_a = np.broadcast_to(equipe[p1], delta_a.shape)
+            eq_b = np.broadcast_to(equipe[q1], delta_a.shape)
+            valide = (eq_a < eq_b) & (genre[p1] == genre[q1])
+            evaluer(u, v, eq_a, eq_b, delta_a, delta_b, valide, "2 pour 2")
+
+    candidats.sort(key=lambda c: (c["ecart_apres"], c["type"]))
+    return candidats[:n]
+
+
+def appliquer_echange(equipes, echange):
+    """Retourne une copie des équipes (listes d'ids) avec l'échange appliqué."""
+    remplacement = dict(zip(echange["sortants"], echange["entrants"]))
+    remplacement.update(zip(echange["entrants"], echange["sortants"]))
+    return [
+        {type_ligne: [[remplacement.get(i, i) for i in ligne] for ligne in eq.get(type_ligne, [])]
+         for type_ligne in ["trios", "duos"]}
+        for eq in equipes
+    ]
+
+
+def ids_des_groupes(groupes):
+    """Liste d'ids par groupe (trio / duo) à partir des DataFrames générés."""
+    return [g["id"].tolist() if not g.empty else [] for g in groupes]
+
+
+def groupes_depuis_ids(players, groupes_ids):
+    """Reconstruit les DataFrames de trios / duos à partir des ids."""
+    par_id = players.set_index("id", drop=False)
+    return [par_id.loc[ids].reset_index(drop=True) if ids else pd.DataFrame() for ids in groupes_ids]
+
+
+def talents_des_groupes(groupes):
+    """dict id -> (talent_attaque, talent_defense) pour les joueurs de ces groupes."""
+    return {
+        int(i): (float(a), float(d))
+        for g in groupes if not g.empty
+        for i, a, d in zip(g["id"], g["talent_attaque"], g["talent_defense"])
+    }
+
+
+# --- Représentation compacte (état de session) ---
+class EquipeCompacte:
+    """Équipe réduite aux ids de ses trios / duos et à sa moyenne.
+
+    C'est ce qui est gardé dans st.session_state : les DataFrames ne sont reconstruits
+    qu'à l'affichage, à partir du roster en cache partagé par toutes les sessions.
+    """
+    __slots__ = ("trios", "duos", "moyenne")
+
+    def __init__(self, trios, duos, moyenne):
+        self.trios = tuple(tuple(int(i) for i in g) for g in trios)
+        self.duos = tuple(tuple(int(i) for i in g) for g in duos)
+        self.moyenne = float(moyenne)
+
+    @classmethod
+    def depuis_equipe(cls, equipe):
+        """À partir d'un dict trios / duos (DataFrames) / moyenne."""
+        return cls(ids_des_groupes(equipe["trios"]), ids_des_groupes(equipe["duos"]), equipe["moyenne"])
+
+    @property
+    def ids(self):
+        return [i for g in self.trios + self.duos for i in g]
+
+    def vers_ids(self):
+        """Format attendu par meilleurs_echanges / appliquer_echange."""
+        return {"trios": [list(g) for g in self.trios], "duos": [list(g) for g in self.duos]}
+
+    def deplier(self, roster):
+        """dict trios / duos (DataFrames) / moyenne ; roster = utils.roster_par_id()."""
+        return {
+            "trios": _groupes_roster(roster, self.trios),
+            "duos": _groupes_roster(roster, self.duos),
+            "moyenne": self.moyenne,
+        }
+
+
+def _groupes_roster(roster, groupes):
+    # un joueur supprimé du roster depuis la génération disparaît simplement de l'affichage
+    groupes = [[i for i in g if i in roster.index] for g in groupes]
+    return [roster.loc[g].reset_index(drop=True) if g else pd.DataFrame() for g in groupes]
+
+
+def compacter_match(teams):
+    """Résultat de generate_teams -> [BLANCS, NOIRS] en EquipeCompacte."""
+    return [
+        EquipeCompacte(ids_des_groupes(teams[f"equipe{c}_trios"]), ids_des_groupes(teams[f"equipe{c}_duos"]), teams[f"moy{c}"])
+        for c in "BN"
+    ]
+
+
+def deplier_match(equipes, roster):
+    """[BLANCS, NOIRS] compacts -> dict au format de generate_teams (pour l'affichage)."""
+    teams = {}
+    for c, equipe in zip("BN", equipes):
+        eq = equipe.deplier(roster)
+        teams[f"equipe{c}_trios"], teams[f"equipe{c}_duos"] = eq["trios"], eq["duos"]
+        teams[f"moy{c}"] = equipe.moyenne
+        teams[f"nb{c}"] = sum(len(g) for g in eq["trios"] + eq["duos"])
+    return teams
@@ -3,14 +3,30 @@ import base64
 import requests
 from datetime import datetime
 import streamlit as st
+from ligues_utils import ligue_active, valider_ligue, dans_ligue, LIGUE_PRINCIPALE
 
-def save_to_github(filepath: str, message: str):
+def cible_github(ligue=None):
+    """(dépôt, branche) où synchroniser les fichiers d'une ligue (ligue active par défaut).
+
+    GITHUB_REPO_<LIGUE> / GITHUB_BRANCH_<LIGUE> (ex. GITHUB_REPO_LUNDI_SOIR) priment sur
+    GITHUB_REPO / GITHUB_BRANCH ; sans variable propre, une ligue garde le dépôt commun,
+    où ses fichiers sont déjà séparés (data/ligues/<ligue>/...).
+    """
+    ligue = valider_ligue(ligue) if ligue else ligue_active()
+    suffixe = "" if ligue == LIGUE_PRINCIPALE else "_" + ligue.upper().replace("-", "_")
+    repo = os.environ.get(f"GITHUB_REPO{suffixe}") or os.environ.get("GITHUB_REPO")
+    branche = os.environ.get(f"GITHUB_BRANCH{suffixe}") or os.environ.get("GITHUB_BRANCH") or "main"
+    return repo, branche
+
+def save_to_github(filepath, message: str, ligue=None):
     """
     Enregistre un fichier local (ex: data/joueurs.csv ou data/historique.csv)
     directement dans le dépôt GitHub via l'API REST.
     """
+    with dans_ligue(ligue or ligue_active()):
+        filepath = os.fspath(filepath)  # un CheminLigue se résout dans le dossier de la ligue
     token = os.environ.get("GITHUB_TOKEN")
-    repo = os.environ.get("GITHUB_REPO")
+    repo, branche = cible_github(ligue)
     user = os.environ.get("GITHUB_USER")
 
     if not token or not repo or not user:
@@ -18,7 +34,7 @@ def save_to_github(filepath: str, message: str):
         return False
 
     # Exemple : guerard18/equipes-hockey
-    url = f"https://api.github.com/repos/{repo}/contents/{filepath}"
+    url = f"https://api.github.com/repos/{repo}/contents/{filepath.replace(os.sep, '/')}"
     headers = {"Authorization": f"Bearer {token}"}
     now = datetime.now().strftime("%Y-%m-%d %H:%M")
 
@@ -37,7 +53,7 @@ def save_to_github(filepath: str, message: str):
     data = {
         "message": f"{message} – {now}",
         "content": content,
-        "branch": "main"
+        "branch": branche
     }
     if sha:
         data["sha"] = sha
@@ -0,0 +1,142 @@
+"""
+Graphiques de la page Statistiques, rendus une fois par version des données.
+
+Les images (PNG ou SVG) sont gardées en cache sous la clé (graphique, saisons, chemins
+absolus et versions des fichiers) : une nouvelle exécution de la page ne redessine rien
+tant que l'historique ou la liste des joueurs de la ligue n'a pas changé. Le rendu passe par le moteur Agg, sans pyplot, et
+réutilise une seule Figure par graphique (protégée par un verrou, car Streamlit exécute
+les sessions dans des fils différents).
+"""
+import functools
+import io
+import os
+import threading
+
+import matplotlib
+matplotlib.use("Agg")
+from matplotlib.figure import Figure  # noqa: E402
+from matplotlib.backends.backend_agg import FigureCanvasAgg  # noqa: E402
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from utils import JOUEURS_PATH, load_players, version_fichier, stats_depuis_comptes  # noqa: E402
+from historique_utils import HISTORIQUE_DIR, charger_manifeste, charger_historique, resume_historique  # noqa: E402
+
+TAILLE_FIGURE = (7, 3.5)
+DPI = 100
+MAX_JOUEURS_BARRES = 30
+
+_figures = {}
+_verrou = threading.Lock()
+
+
+def _figure(nom):
+    """Figure réutilisée pour un graphique (vidée avant chaque rendu)."""
+    fig = _figures.get(nom)
+    if fig is None:
+        fig = Figure(figsize=TAILLE_FIGURE, dpi=DPI)
+        FigureCanvasAgg(fig)
+        _figures[nom] = fig
+    fig.clear()
+    return fig
+
+
+def _octets(fig, format):
+    tampon = io.BytesIO()
+    fig.tight_layout()
+    fig.savefig(tampon, format=format)
+    return tampon.getvalue()
+
+
+# --- Dessins ---
+def _dessiner_talents(joueurs, format):
+    with _verrou:
+        fig = _figure("talents")
+        ax = fig.add_subplot()
+        bornes = np.arange(0, 11) + 0.5
+        ax.hist([joueurs["talent_attaque"], joueurs["talent_defense"]], bins=bornes,
+                label=["Attaque", "Défense"], color=["#1f77b4", "#ff7f0e"])
+        ax.set_xlabel("Talent")
+        ax.set_ylabel("Joueurs")
+        ax.set_title(f"Talents des {len(joueurs)} joueurs présents")
+        ax.legend()
+        return _octets(fig, format)
+
+
+def _dessiner_matchs_par_joueur(stats, format):
+    with _verrou:
+        fig = _figure("matchs_joueurs")
+        ax = fig.add_subplot()
+        haut = stats.sort_values("Matchs joués", ascending=False).head(MAX_JOUEURS_BARRES)
+        ax.bar(haut["Joueur"].astype(str), haut["Matchs joués"], color="#2ca02c")
+        ax.set_ylabel("Matchs joués")
+        titre = "Matchs joués par joueur"
+        if len(stats) > MAX_JOUEURS_BARRES:
+            titre += f" ({MAX_JOUEURS_BARRES} plus assidus)"
+        ax.set_title(titre)
+        ax.tick_params(axis="x", labelrotation=70, labelsize=7)
+        for etiquette in ax.get_xticklabels():
+            etiquette.set_horizontalalignment("right")
+        return _octets(fig, format)
+
+
+def _dessiner_ecart(hist, format):
+    with _verrou:
+        fig = _figure("ecart")
+        ax = fig.add_subplot()
+        dates = pd.to_datetime(hist["Date"], errors="coerce")
+        ecart = pd.to_numeric(hist["Moyenne_BLANCS"], errors="coerce") - pd.to_numeric(hist["Moyenne_NOIRS"], errors="coerce")
+        serie = pd.Series(ecart.values, index=dates).dropna().sort_index()
+        serie = serie[serie.index.notna()].groupby(level=0).mean()
+        ax.axhline(0, color="grey", linewidth=0.8)
+        ax.plot(serie.index, serie.values, marker="o" if len(serie) <= 100 else None, markersize=3,
+                linewidth=1, alpha=0.6, label="Écart du match")
+        if len(serie) >= 5:
+            ax.plot(serie.index, serie.rolling(5, min_periods=1).mean().values, color="#d62728",
+                    linewidth=2, label="Moyenne mobile (5)")
+        ax.set_ylabel("BLANCS − NOIRS")
+        ax.set_title("Écart de moyenne entre les équipes")
+        ax.legend()
+        fig.autofmt_xdate()
+        return _octets(fig, format)
+
+
+# --- Cache (une image par version des données) ---
+@functools.lru_cache(maxsize=16)
+def _image_talents(path, version_joueurs, format):
+    joueurs = load_players()
+    return _dessiner_talents(joueurs[joueurs["present"] == True], format)
+
+
+@functools.lru_cache(maxsize=32)
+def _image_matchs_par_joueur(saisons, dossier, versions, version_joueurs, format):
+    resume = resume_historique(list(saisons) if saisons else None, dossier)
+    return _dessiner_matchs_par_joueur(stats_depuis_comptes(resume.matchs_par_joueur, load_players()), format)
+
+
+@functools.lru_cache(maxsize=32)
+def _image_ecart(saisons, dossier, versions, format):
+    return _dessiner_ecart(charger_historique(list(saisons) if saisons else None, dossier), format)
+
+
+def _versions_saisons(saisons, dossier):
+    manifeste = charger_manifeste(dossier)
+    choisies = sorted(manifeste["saisons"]) if not saisons else [s for s in saisons if s in manifeste["saisons"]]
+    return tuple((s, manifeste["saisons"][s]["version"]) for s in choisies)
+
+
+def graphique_talents(format="png", path=JOUEURS_PATH):
+    """Histogramme des talents (attaque, défense) des joueurs présents."""
+    return _image_talents(os.path.abspath(path), version_fichier(path), format)
+
+
+def graphique_matchs_par_joueur(saisons=None, format="png", dossier=HISTORIQUE_DIR, path=JOUEURS_PATH):
+    """Barres du nombre de matchs joués par joueur pour les saisons demandées (toutes si None)."""
+    saisons = tuple(saisons) if saisons else ()
+    return _image_matchs_par_joueur(saisons, os.path.abspath(dossier), _versions_saisons(saisons, dossier), version_fichier(path), format)
+
+
+def graphique_ecart(saisons=None, format="png", dossier=HISTORIQUE_DIR):
+    """Écart Moyenne_BLANCS − Moyenne_NOIRS au fil des dates (toutes les saisons si None)."""
+    saisons = tuple(saisons) if saisons else ()
+    return _image_ecart(saisons, os.path.abspath(dossier), _versions_saisons(saisons, dossier), format)
@@ -0,0 +1,490 @@
+"""
+Historique des matchs partitionné par saison, lecture paginée et export en continu.
+
+    data/historique/
+        manifest.json        résumé de chaque saison (matchs, dates, moyennes, matchs par joueur)
+        2025-2026.csv        saison en cours : ajout d'une ligne par match
+        2024-2025.csv.gz     saisons terminées : CSV compressé
+
+Chaque match a un identifiant unique (colonne ID_Match). Les vues ne lisent que les
+partitions demandées ; « Toutes » et les filtres se calculent à partir du manifeste.
+L'ancien fichier unique data/historique.csv est importé automatiquement (puis gardé en .bak).
+"""
+import base64
+import copy
+import functools
+import glob
+import gzip
+import json
+import os
+import threading
+from collections import namedtuple
+from datetime import date
+
+import pandas as pd
+
+from ligues_utils import CheminLigue
+from utils import HISTORIQUE_PATH, version_fichier, index_joueurs, ids_par_match, saison_from_date
+
+HISTORIQUE_DIR = CheminLigue("historique")
+NOM_MANIFESTE = "manifest.json"
+
+TAILLE_BLOC = 5000
+LIMITE_MAX = 500
+COLONNES_RESUME = ["Date", "Saison", "Moyenne_BLANCS", "Moyenne_NOIRS", "Équipe_BLANCS", "Équipe_NOIRS"]
+
+# une écriture = lire le manifeste, le modifier, le réécrire : deux sauvegardes simultanées
+# (fils Streamlit, API) prendraient sinon le même ID_Match
+_verrou = threading.RLock()
+
+PageHistorique = namedtuple("PageHistorique", ["matchs", "curseur_suivant"])
+ResumeHistorique = namedtuple("ResumeHistorique", ["nb_matchs", "nb_dates", "moyenne_blancs", "moyenne_noirs", "matchs_par_joueur"])
+
+
+def _ecrire_json_atomique(donnees, path, indent=None):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(donnees, f, ensure_ascii=False, indent=indent)
+    os.replace(tmp, path)
+
+
+def saison_courante():
+    return saison_from_date(date.today().strftime("%Y-%m-%d"))
+
+
+def _saison_fermee(saison):
+    # « 2023-2024 » < « 2025-2026 » ; « Inconnue » reste ouverte
+    return saison[:1].isdigit() and saison < saison_courante()
+
+
+def _nom_fichier(saison, compresse):
+    nom = str(saison).replace(os.sep, "_").replace("/", "_") or "Inconnue"
+    return f"{nom}.csv.gz" if compresse else f"{nom}.csv"
+
+
+# --- Résumés par saison ---
+# joueurs : liste de paires [id ou ancien nom, nb de matchs] (les clés JSON ne sont que des textes)
+def _resume_vide():
+    return {"fichier": None, "version": "absent", "nb_matchs": 0, "ids": [], "dates": {},
+            "somme_BLANCS": 0.0, "somme_NOIRS": 0.0, "joueurs": []}
+
+
+def _cumuler(resume, df):
+    """Ajoute les matchs de df au résumé d'une saison."""
+    if df.empty:
+        return
+    resume["nb_matchs"] += len(df)
+    resume["ids"].extend(int(i) for i in df["ID_Match"])
+    for d, i in zip(df["Date"].astype(str) if "Date" in df.columns else [""] * len(df), df["ID_Match"]):
+        resume["dates"].setdefault(d, []).append(int(i))
+    for couleur in ["BLANCS", "NOIRS"]:
+        if f"Moyenne_{couleur}" in df.columns:
+            resume[f"somme_{couleur}"] += float(pd.to_numeric(df[f"Moyenne_{couleur}"], errors="coerce").fillna(0).sum())
+    comptes = dict((k, n) for k, n in resume["joueurs"])
+    if "Équipe_BLANCS" in df.columns:
+        for couleur in ["BLANCS", "NOIRS"]:
+            for ids in ids_par_match(df, couleur):
+                for id_ in ids:
+                    comptes[id_] = comptes.get(id_, 0) + 1
+    resume["joueurs"] = [[k, n] for k, n in comptes.items()]
+
+
+def _resumer_partition(dossier, saison, fichier):
+    resume = _resume_vide()
+    resume["fichier"] = fichier
+    chemin = os.path.join(dossier, fichier)
+    for bloc in pd.read_csv(chemin, chunksize=TAILLE_BLOC):
+        _cumuler(resume, bloc)
+    resume["version"] = version_fichier(chemin)
+    return resume
+
+
+# --- Manifeste ---
+@functools.lru_cache(maxsize=4)
+def _manifeste_cache(path, version):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _ecrire_manifeste(manifeste, dossier):
+    # une valeur par ligne : une version de l'historique ne stocke que les morceaux
+    # du manifeste qui ont changé (voir versions_utils.decouper)
+    _ecrire_json_atomique(manifeste, os.path.join(dossier, NOM_MANIFESTE), indent=1)
+
+
+def _lire_manifeste(dossier):
+    path = os.path.join(dossier, NOM_MANIFESTE)
+    if not os.path.exists(path):
+        return {"prochain_id": 1, "saisons": {}}
+    return copy.deepcopy(_manifeste_cache(os.path.abspath(path), version_fichier(path)))
+
+
+def charger_manifeste(dossier=HISTORIQUE_DIR, ancien_path=HISTORIQUE_PATH):
+    """Manifeste à jour : importe l'ancien CSV unique, puis vérifie chaque partition.
+
+    Une partition modifiée hors de l'application (version différente) est résumée de nouveau.
+    Retourne une copie : l'appelant peut la modifier sans toucher au cache.
+    """
+    if ancien_path and os.path.exists(ancien_path):
+        with _verrou:
+            # un autre fil a pu faire l'import pendant l'attente du verrou
+            if os.path.exists(ancien_path):
+                manifeste = _lire_manifeste(dossier)
+                os.makedirs(dossier, exist_ok=True)
+                importer_csv(ancien_path, dossier, manifeste)
+                os.replace(ancien_path, f"{ancien_path}.bak")
+                return manifeste
+
+    manifeste = _lire_manifeste(dossier)
+    change = False
+    fichiers = set()
+    if os.path.isdir(dossier):
+        fichiers = {os.path.basename(p) for p in glob.glob(os.path.join(dossier, "*.csv*")) if not p.endswith(".tmp")}
+    for saison, resume in list(manifeste["saisons"].items()):
+        if resume["fichier"] not in fichiers:
+            del manifeste["saisons"][saison]
+            change = True
+        elif version_fichier(os.path.join(dossier, resume["fichier"])) != resume["version"]:
+            manifeste["saisons"][saison] = _resumer_partition(dossier, saison, resume["fichier"])
+            change = True
+    connus = {r["fichier"] for r in manifeste["saisons"].values()}
+    for fichier in sorted(fichiers - connus):
+        saison = fichier.split(".csv")[0]
+        manifeste["saisons"][saison] = _resumer_partition(dossier, saison, fichier)
+        change = True
+    if change:
+        tous = [i for r in manifeste["saisons"].values() for i in r["ids"]]
+        manifeste["prochain_id"] = max([manifeste["prochain_id"]] + [i + 1 for i in tous])
+        with _verrou:
+            _ecrire_manifeste(manifeste, dossier)
+    return manifeste
+
+
+@functools.lru_cache(maxsize=4)
+def _saisons_des_matchs(path, version):
+    manifeste = _manifeste_cache(path, version)
+    return {i: s for s, r in manifeste["saisons"].items() for i in r["ids"]}
+
+
+# --- Partitions ---
+@functools.lru_cache(maxsize=16)
+def _partition_cache(path, version):
+    return pd.read_csv(path)
+
+
+def charger_partition(saison, dossier=HISTORIQUE_DIR):
+    """Matchs d'une saison (DataFrame vide si la saison n'existe pas)."""
+    resume = charger_manifeste(dossier)["saisons"].get(str(saison))
+    if resume is None:
+        return pd.DataFrame(columns=["ID_Match"] + COLONNES_RESUME)
+    chemin = os.path.join(dossier, resume["fichier"])
+    return _partition_cache(os.path.abspath(chemin), version_fichier(chemin)).copy()
+
+
+def charger_historique(saisons=None, dossier=HISTORIQUE_DIR):
+    """Matchs des saisons demandées (toutes si None) ; seules ces partitions sont lues."""
+    manifeste = charger_manifeste(dossier)
+    saisons = sorted(manifeste["saisons"]) if saisons is None else [str(s) for s in saisons]
+    parties = [charger_partition(s, dossier) for s in saisons if s in manifeste["saisons"]]
+    if not parties:
+        return pd.DataFrame(columns=["ID_Match"] + COLONNES_RESUME)
+    return pd.concat(parties, ignore_index=True)
+
+
+def _ajouter_lignes(manifeste, saison, df, dossier):
+    """Ajoute des lignes à la partition d'une saison (créée au besoin) et à son résumé."""
+    resume = manifeste["saisons"].get(saison)
+    if resume is None:
+        resume = manifeste["saisons"][saison] = _resume_vide()
+        resume["fichier"] = _nom_fichier(saison, _saison_fermee(saison))
+    chemin = os.path.join(dossier, resume["fichier"])
+    compresse = chemin.endswith(".gz")
+    ouvrir = gzip.open if compresse else open
+
+    if os.path.exists(chemin):
+        colonnes = list(pd.read_csv(chemin, nrows=0).columns)
+        if set(df.columns) <= set(colonnes):
+            # gzip accepte plusieurs membres à la suite : pas besoin de recompresser la saison
+            with ouvrir(chemin, "ab") as f:
+                f.write(df.reindex(columns=colonnes).to_csv(index=False, header=False).encode("utf-8"))
+        else:
+            complet = pd.concat([pd.read_csv(chemin), df], ignore_index=True)
+            with ouvrir(f"{chemin}.tmp", "wb") as f:
+                f.write(complet.to_csv(index=False).encode("utf-8"))
+            os.replace(f"{chemin}.tmp", chemin)
+    else:
+        with ouvrir(f"{chemin}.tmp", "wb") as f:
+            f.write(df.to_csv(index=False).encode("utf-8"))
+        os.replace(f"{chemin}.tmp", chemin)
+
+    _cumuler(resume, df)
+    resume["version"] = version_fichier(chemin)
+    manifeste["prochain_id"] = max(manifeste["prochain_id"], int(df["ID_Match"].max()) + 1)
+
+
+def fermer_saisons(manifeste, dossier=HISTORIQUE_DIR):
+    """Compresse les partitions des saisons terminées encore en CSV simple."""
+    for saison, resume in manifeste["saisons"].items():
+        if resume["fichier"].endswith(".csv") and _saison_fermee(saison):
+            source = os.path.join(dossier, resume["fichier"])
+            fichier = _nom_fichier(saison, True)
+            cible = os.path.join(dossier, fichier)
+            with open(source, "rb") as f, gzip.open(f"{cible}.tmp", "wb") as g:
+                g.write(f.read())
+            os.replace(f"{cible}.tmp", cible)
+            os.remove(source)
+            resume["fichier"] = fichier
+            resume["version"] = version_fichier(cible)
+
+
+def importer_csv(path, dossier=HISTORIQUE_DIR, manifeste=None):
+    """Répartit un CSV d'historique (ancien format unique) dans les partitions, bloc par bloc."""
+    manifeste = manifeste if manifeste is not None else charger_manifeste(dossier)
+    os.makedirs(dossier, exist_ok=True)
+    for bloc in pd.read_csv(path, chunksize=TAILLE_BLOC, encoding="utf-8-sig"):
+        if "ID_Match" not in bloc.columns or bloc["ID_Match"].isna().any():
+            debut = manifeste["prochain_id"]
+            bloc["ID_Match"] = range(debut, debut + len(bloc))
+        bloc = bloc[["ID_Match"] + [c for c in bloc.columns if c != "ID_Match"]]
+        bloc["ID_Match"] = bloc["ID_Match"].astype(int)
+        saisons = bloc["Saison"].fillna("Inconnue").astype(str) if "Saison" in bloc.columns else pd.Series("Inconnue", index=bloc.index)
+        for saison, lignes in bloc.groupby(saisons, sort=False):
+            _ajouter_lignes(manifeste, saison, lignes, dossier)
+    fermer_saisons(manifeste, dossier)
+    _ecrire_manifeste(manifeste, dossier)
+    return manifeste
+
+
+def ecrire_historique(df, dossier=HISTORIQUE_DIR):
+    """Remplace tout l'historique par df (restauration, jeux d'essai)."""
+    with _verrou:
+        supprimer_historique(dossier)
+        os.makedirs(dossier, exist_ok=True)
+        tmp = os.path.join(dossier, "import.csv.tmp")
+        df.to_csv(tmp, index=False)
+        try:
+            importer_csv(tmp, dossier, {"prochain_id": 1, "saisons": {}})
+        finally:
+            os.remove(tmp)
+
+
+# --- Écriture / suppression ---
+def ajouter_match(ligne_match, dossier=HISTORIQUE_DIR):
+    """Ajoute un match (dict) à la partition de sa saison ; retourne son ID_Match."""
+    os.makedirs(dossier, exist_ok=True)
+    with _verrou:
+        manifeste = charger_manifeste(dossier)
+        id_match = manifeste["prochain_id"]
+        saison = str(ligne_match.get("Saison") or "Inconnue")
+        _ajouter_lignes(manifeste, saison, pd.DataFrame([{"ID_Match": id_match, **ligne_match}]), dossier)
+        fermer_saisons(manifeste, dossier)
+        _ecrire_manifeste(manifeste, dossier)
+    return id_match
+
+
+def supprimer_saison(saison, dossier=HISTORIQUE_DIR):
+    """Supprime la partition d'une saison ; retourne le nombre de matchs supprimés."""
+    with _verrou:
+        manifeste = charger_manifeste(dossier)
+        resume = manifeste["saisons"].pop(str(saison), None)
+        if resume is None:
+            return 0
+        os.remove(os.path.join(dossier, resume["fichier"]))
+        _ecrire_manifeste(manifeste, dossier)
+    return resume["nb_matchs"]
+
+
+def supprimer_historique(dossier=HISTORIQUE_DIR):
+    path = os.path.join(dossier, NOM_MANIFESTE)
+    if os.path.exists(path):
+        for resume in _manifeste_cache(os.path.abspath(path), version_fichier(path))["saisons"].values():
+            chemin = os.path.join(dossier, resume["fichier"])
+            if os.path.exists(chemin):
+                os.remove(chemin)
+        os.remove(path)
+
+
+# --- Consultation ---
+def lire_match(id_match, dossier=HISTORIQUE_DIR):
+    """Ligne d'un match (pd.Series) par son ID_Match ; KeyError s'il n'existe pas."""
+    charger_manifeste(dossier)
+    path = os.path.join(dossier, NOM_MANIFESTE)
+    saison = _saisons_des_matchs(os.path.abspath(path), version_fichier(path)).get(int(id_match)) if os.path.exists(path) else None
+    if saison is None:
+        raise KeyError(f"Match introuvable : {id_match}")
+    partition = charger_partition(saison, dossier)
+    return partition[partition["ID_Match"] == int(id_match)].iloc[0]
+
+
+def saisons_historique(dossier=HISTORIQUE_DIR):
+    """Nombre de matchs par saison (plus récente d'abord), lu dans le manifeste."""
+    saisons = charger_manifeste(dossier)["saisons"]
+    comptes = pd.Series({s: r["nb_matchs"] for s, r in saisons.items() if r["nb_matchs"]}, dtype=int)
+    return comptes.sort_index(ascending=False)
+
+
+def resume_historique(saisons=None, dossier=HISTORIQUE_DIR):
+    """Totaux de plusieurs saisons (toutes si None) sans lire les partitions."""
+    manifeste = charger_manifeste(dossier)
+    choisies = [r for s, r in manifeste["saisons"].items() if saisons is None or s in saisons]
+    nb = sum(r["nb_matchs"] for r in choisies)
+    comptes = {}
+    for r in choisies:
+        for k, n in r["joueurs"]:
+            comptes[k] = comptes.get(k, 0) + n
+    return ResumeHistorique(
+        nb_matchs=nb,
+        nb_dates=len({d for r in choisies for d in r["dates"]}),
+        moyenne_blancs=sum(r["somme_BLANCS"] for r in choisies) / nb if nb else 0.0,
+        moyenne_noirs=sum(r["somme_NOIRS"] for r in choisies) / nb if nb else 0.0,
+        matchs_par_joueur=comptes,
+    )
+
+
+# --- Curseurs ---
+# Un curseur encode la saison et la ligne où reprendre, avec le nombre de matchs de
+# cette saison à ce moment : si la saison a rapetissé ou disparu, on recommence.
+def encoder_curseur(saison, ligne, nb_matchs):
+    brut = json.dumps({"s": saison, "l": int(ligne), "n": int(nb_matchs)}).encode()
+    return base64.urlsafe_b64encode(brut).decode().rstrip("=")
+
+
+def decoder_curseur(curseur, dossier=HISTORIQUE_DIR):
+    if not curseur:
+        return None, 0
+    try:
+        brut = base64.urlsafe_b64decode(curseur + "=" * (-len(curseur) % 4))
+        donnees = json.loads(brut)
+        saison, ligne, nb = str(donnees["s"]), int(donnees["l"]), int(donnees["n"])
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("Curseur invalide.")
+    resume = charger_manifeste(dossier)["saisons"].get(saison)
+    if ligne < 0 or resume is None or resume["nb_matchs"] < nb:
+        raise ValueError("L'historique a été modifié ; recommencez à la première page.")
+    return saison, ligne
+
+
+# --- Filtres ---
+def resoudre_joueur(joueur):
+    """Id de joueur depuis un id (int ou texte) ou un nom ; None si aucun filtre."""
+    if joueur is None or joueur == "":
+        return None
+    if isinstance(joueur, int) or str(joueur).strip().isdigit():
+        return int(joueur)
+    nom = str(joueur).strip()
+    # un nom inconnu de l'index peut encore figurer dans de vieilles lignes
+    return index_joueurs().nom_vers_id.get(nom, nom)
+
+
+def filtrer_bloc(bloc, saison=None, joueur=None, date_debut=None, date_fin=None):
+    """Lignes du bloc qui respectent les filtres (saison, joueur, intervalle de dates inclus)."""
+    masque = pd.Series(True, index=bloc.index)
+    if saison:
+        if "Saison" not in bloc.columns:
+            return bloc.iloc[0:0]
+        masque &= bloc["Saison"].astype(str) == str(saison)
+    if date_debut or date_fin:
+        if "Date" not in bloc.columns:
+            return bloc.iloc[0:0]
+        dates = pd.to_datetime(bloc["Date"], errors="coerce")
+        if date_debut:
+            masque &= dates >= pd.Timestamp(date_debut)
+        if date_fin:
+            masque &= dates <= pd.Timestamp(date_fin)
+    bloc = bloc[masque]
+    if joueur is not None and not bloc.empty:
+        joue = [
+            joueur in b or joueur in n
+            for b, n in zip(ids_par_match(bloc, "BLANCS"), ids_par_match(bloc, "NOIRS"))
+        ]
+        bloc = bloc[joue]
+    return bloc
+
+
+def _saisons_candidates(manifeste, saison, joueur, date_debut, date_fin):
+    """Saisons (dans l'ordre) qui peuvent contenir des matchs filtrés, d'après le manifeste."""
+    debut = pd.Timestamp(date_debut) if date_debut else None
+    fin = pd.Timestamp(date_fin) if date_fin else None
+    for s in sorted(manifeste["saisons"]):
+        resume = manifeste["saisons"][s]
+        if saison and s != str(saison):
+            continue
+        if joueur is not None and joueur not in {k for k, _ in resume["joueurs"]}:
+            continue
+        if debut is not None or fin is not None:
+            dates = pd.to_datetime(pd.Series(list(resume["dates"]), dtype=object), errors="coerce").dropna()
+            if dates.empty or (debut is not None and dates.max() < debut) or (fin is not None and dates.min() > fin):
+                continue
+        yield s
+
+
+def requete_historique(saison=None, joueur=None, date_debut=None, date_fin=None,
+                       curseur=None, limite=50, dossier=HISTORIQUE_DIR):
+    """Une page de matchs filtrés, saison par saison, dans l'ordre d'enregistrement.
+
+    Retourne PageHistorique(matchs, curseur_suivant) ; curseur_suivant vaut None à la fin.
+    """
+    limite = int(limite)
+    if not 1 <= limite <= LIMITE_MAX:
+        raise ValueError(f"La limite doit être entre 1 et {LIMITE_MAX}.")
+    saison_depart, ligne_depart = decoder_curseur(curseur, dossier)
+    joueur = resoudre_joueur(joueur)
+    manifeste = charger_manifeste(dossier)
+
+    morceaux, positions = [], []
+    for s in _saisons_candidates(manifeste, saison, joueur, date_debut, date_fin):
+        if saison_depart is not None and s < saison_depart:
+            continue
+        bloc = charger_partition(s, dossier)
+        if s == saison_depart:
+            bloc = bloc.iloc[ligne_depart:]
+        bloc = filtrer_bloc(bloc, saison, joueur, date_debut, date_fin)
+        morceaux.append(bloc)
+        positions.extend((s, i) for i in bloc.index)
+        # une ligne de plus que la limite suffit à savoir s'il reste une page
+        if len(positions) > limite:
+            break
+    if not morceaux:
+        return PageHistorique(pd.DataFrame(columns=["ID_Match"] + COLONNES_RESUME), None)
+
+    matchs = pd.concat(morceaux, ignore_index=True)
+    suivant = None
+    if len(matchs) > limite:
+        s, ligne = positions[limite]
+        suivant = encoder_curseur(s, ligne, manifeste["saisons"][s]["nb_matchs"])
+        matchs = matchs.iloc[:limite]
+    return PageHistorique(matchs, suivant)
+
+
+def exporter_historique(format="ndjson", saison=None, joueur=None, date_debut=None, date_fin=None,
+                        dossier=HISTORIQUE_DIR, taille_bloc=TAILLE_BLOC):
+    """Générateur de morceaux de texte (NDJSON ou CSV) couvrant les matchs filtrés.
+
+    Chaque partition est lue par blocs : l'historique n'est jamais chargé en entier.
+    """
+    if format not in ("ndjson", "csv"):
+        raise ValueError("Format d'export inconnu (ndjson ou csv).")
+    joueur = resoudre_joueur(joueur)
+    manifeste = charger_manifeste(dossier)
+    chemins = [os.path.join(dossier, manifeste["saisons"][s]["fichier"])
+               for s in _saisons_candidates(manifeste, saison, joueur, date_debut, date_fin)]
+    if format == "csv":
+        # les partitions anciennes n'ont pas toutes les colonnes (Seed, Ids_*...) :
+        # un seul en-tête, union des colonnes de toutes les partitions lues
+        colonnes = []
+        for chemin in chemins:
+            colonnes += [c for c in pd.read_csv(chemin, nrows=0).columns if c not in colonnes]
+    entete = True
+    for chemin in chemins:
+        for bloc in pd.read_csv(chemin, chunksize=taille_bloc):
+            bloc = filtrer_bloc(bloc, saison, joueur, date_debut, date_fin)
+            if bloc.empty:
+                continue
+            if format == "csv":
+                yield bloc.reindex(columns=colonnes).to_csv(index=False, header=entete)
+                entete = False
+            else:
+                texte = bloc.to_json(orient="records", lines=True, force_ascii=False)
+                yield texte if texte.endswith("\n") else texte + "\n"
+    if format == "csv" and entete:
+        yield pd.DataFrame(columns=["ID_Match"] + COLONNES_RESUME).to_csv(index=False)
@@ -0,0 +1,25 @@
+"""
+Logique de l'application utilisable sans Streamlit (scripts, service HTTP, tableau d'affichage).
+
+    from hockey_api import generate_teams, load_players
+    equipes = generate_teams(load_players().query("present"))
+
+Le service HTTP JSON se lance avec : python -m hockey_api.serveur --port 8502
+"""
+from utils import load_players, index_joueurs, table_talents, saison_from_date, stats_joueurs
+from formation_utils import (
+    generate_teams, generer_equipes_tournoi, NOMS_EQUIPES_TOURNOI,
+    meilleurs_echanges, appliquer_echange,
+)
+from contraintes_utils import generer_equipes_contraintes
+from recherche_parallele import recherche_parallele
+from tournoi_utils import generer_matchs_equilibres, classement_from_results
+from hockey_api.gestionnaires import traiter, ROUTES
+
+__all__ = [
+    "load_players", "index_joueurs", "table_talents", "saison_from_date", "stats_joueurs",
+    "generate_teams", "generer_equipes_tournoi", "NOMS_EQUIPES_TOURNOI",
+    "meilleurs_echanges", "appliquer_echange", "generer_equipes_contraintes",
+    "recherche_parallele", "generer_matchs_equilibres", "classement_from_results",
+    "traiter", "ROUTES",
+]
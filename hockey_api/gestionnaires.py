@@ -0,0 +1,292 @@
+"""
+Gestionnaires sans état du service HTTP : (paramètres, corps JSON) -> dict JSON.
+
+Chaque requête relit les données via la couche en cache de utils (clé = version des
+fichiers), donc plusieurs processus ou fils peuvent servir les mêmes données.
+Le paramètre `ligue` (ligue principale par défaut) choisit le dossier de données.
+"""
+import json
+from collections import namedtuple
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from utils import load_players
+from formation_utils import generate_teams, generer_equipes_tournoi, NOMS_EQUIPES_TOURNOI
+from tournoi_utils import generer_matchs_equilibres, classement_from_results
+from historique_utils import requete_historique, exporter_historique, lire_match
+from ligues_utils import dans_ligue, ligue_active, lister_ligues, LIGUE_PRINCIPALE
+from flux_utils import evenements_depuis, etat_tableau, etat_tournoi as etat_journal
+from simulation_utils import simuler_tournoi, NB_SIMULATIONS
+
+
+# Réponse envoyée morceau par morceau par le serveur
+Flux = namedtuple("Flux", ["type_contenu", "morceaux"])
+
+
+# --- Conversions JSON ---
+def df_vers_json(df):
+    """DataFrame -> liste de dicts (types NumPy convertis, NaN -> null)."""
+    if df is None or df.empty:
+        return []
+    return json.loads(df.to_json(orient="records", force_ascii=False))
+
+
+def groupe_json(groupe, colonne):
+    if groupe.empty:
+        return {"joueurs": [], "moyenne": 0}
+    return {
+        "joueurs": [{"id": int(i), "nom": n} for i, n in zip(groupe["id"], groupe["nom"])],
+        "moyenne": round(float(groupe[colonne].mean()), 2),
+    }
+
+
+def equipe_json(trios, duos, moyenne):
+    return {
+        "trios": [groupe_json(t, "talent_attaque") for t in trios],
+        "duos": [groupe_json(d, "talent_defense") for d in duos],
+        "moyenne": float(moyenne),
+    }
+
+
+def _joueurs_demandes(corps):
+    players = load_players()
+    if corps.get("ids"):
+        try:
+            ids = {int(i) for i in corps["ids"]}
+        except (TypeError, ValueError):
+            raise ValueError("« ids » doit être une liste d'identifiants entiers.")
+        inconnus = ids - set(players["id"])
+        if inconnus:
+            raise ValueError(f"Joueurs inconnus : {sorted(inconnus)}")
+        return players[players["id"].isin(ids)].reset_index(drop=True)
+    return players[players["present"] == True].reset_index(drop=True)
+
+
+def _entier(valeur, nom, defaut):
+    try:
+        return int(valeur if valeur is not None else defaut)
+    except (TypeError, ValueError):
+        raise ValueError(f"Paramètre « {nom} » invalide : {valeur!r}")
+
+
+# --- Gestionnaires ---
+def sante(params, corps):
+    return {"ok": True}
+
+
+def ligues(params, corps):
+    return {"ligues": lister_ligues()}
+
+
+def joueurs(params, corps):
+    players = load_players()
+    if params.get("presents") in ("1", "true", "oui"):
+        players = players[players["present"] == True]
+    return {"joueurs": df_vers_json(players)}
+
+
+def equipes(params, corps):
+    graine = _entier(corps["graine"], "graine", None) if corps.get("graine") is not None else None
+    teams = generate_teams(_joueurs_demandes(corps), graine=graine)
+    if not teams:
+        raise ValueError("Aucun joueur présent.")
+    return {
+        "blancs": equipe_json(teams["equipeB_trios"], teams["equipeB_duos"], teams["moyB"]),
+        "noirs": equipe_json(teams["equipeN_trios"], teams["equipeN_duos"], teams["moyN"]),
+        "graine": teams["graine"],
+    }
+
+
+def equipes_tournoi(params, corps):
+    presents = _joueurs_demandes(corps)
+    if presents.empty:
+        raise ValueError("Aucun joueur présent.")
+    graine = _entier(corps["graine"], "graine", None) if corps.get("graine") is not None else None
+    resultat = generer_equipes_tournoi(presents, graine=graine)
+    return {"equipes": {nom: equipe_json(eq["trios"], eq["duos"], eq["moyenne"]) for nom, eq in resultat.items()}}
+
+
+def horaire_tournoi(params, corps):
+    noms = corps.get("equipes") or NOMS_EQUIPES_TOURNOI
+    if corps.get("format", "ronde") not in ("ronde", "elimination"):
+        raise ValueError("« format » doit être « ronde » ou « elimination ».")
+    try:
+        debut = datetime.strptime(corps.get("debut", "18:00"), "%H:%M").time()
+    except ValueError:
+        raise ValueError("« debut » doit être au format HH:MM.")
+    try:
+        jour = datetime.strptime(corps["jour"], "%Y-%m-%d").date() if corps.get("jour") else None
+    except (TypeError, ValueError):
+        raise ValueError("« jour » doit être au format AAAA-MM-JJ.")
+    matchs = generer_matchs_equilibres(
+        {nom: {} for nom in noms}, debut,
+        _entier(corps.get("duree_match"), "duree_match", 25),
+        _entier(corps.get("duree_demi"), "duree_demi", 30),
+        _entier(corps.get("duree_finale"), "duree_finale", 35),
+        _entier(corps.get("pause"), "pause", 5),
+        _entier(corps.get("zamboni"), "zamboni", 10),
+        format=corps.get("format") or "ronde", jour=jour,
+        graine=_entier(corps["graine"], "graine", None) if corps.get("graine") is not None else None,
+    )
+    return {"matchs": df_vers_json(matchs)}
+
+
+def classement(params, corps):
+    matchs = pd.DataFrame(corps.get("matchs") or [])
+    for col, defaut in [("Phase", "Ronde"), ("Gagnant", ""), ("Prolongation", False), ("Score A", 0), ("Score B", 0)]:
+        if col not in matchs.columns:
+            matchs[col] = defaut
+    matchs["Gagnant"] = matchs["Gagnant"].fillna("")
+    return {"classement": df_vers_json(classement_from_results(matchs))}
+
+
+def etat_tournoi(params, corps):
+    # état partagé (calculé une fois par version) ; la version sert ensuite à /tournoi/flux
+    flux = evenements_depuis(0)
+    matchs, classement_tournoi = etat_tableau()
+    if matchs is None:
+        raise LookupError("Aucun tournoi en cours.")
+    _, info = etat_journal()
+    return {
+        "info": info, "matchs": df_vers_json(matchs), "classement": df_vers_json(classement_tournoi),
+        "version": flux["version"], "tournoi": flux["tournoi"],
+    }
+
+
+def simulation_tournoi(params, corps):
+    """Corps : moyennes {équipe: moyenne} (sinon celles du tournoi en cours), nb_simulations, graine."""
+    matchs = None
+    moyennes = corps.get("moyennes")
+    if not moyennes:
+        matchs, info = etat_journal()
+        if matchs is None:
+            raise LookupError("Aucun tournoi en cours.")
+        moyennes = info.get("moyennes")
+        if not moyennes:
+            raise ValueError("Le tournoi en cours n'a pas de moyennes d'équipes.")
+    nb = _entier(corps.get("nb_simulations"), "nb_simulations", NB_SIMULATIONS)
+    if not 1 <= nb <= 1_000_000:
+        raise ValueError("nb_simulations doit être entre 1 et 1 000 000.")
+    graine = _entier(corps["graine"], "graine", None) if corps.get("graine") is not None else None
+    probas = simuler_tournoi(moyennes, matchs, nb, rng=np.random.default_rng(graine))
+    return {"probabilites": df_vers_json(probas.reset_index()), "nb_simulations": nb}
+
+
+def flux_tournoi(params, corps):
+    # attendre > 0 : la réponse est retenue jusqu'au prochain changement (long polling)
+    attendre = min(float(params.get("attendre") or 0), 30.0)
+    return evenements_depuis(
+        _entier(params.get("depuis"), "depuis", 0), tournoi=params.get("tournoi") or None, attendre_s=attendre
+    )
+
+
+def _filtres_historique(params):
+    return {
+        "saison": params.get("saison") or None,
+        "joueur": params.get("joueur") or None,
+        "date_debut": params.get("debut") or None,
+        "date_fin": params.get("fin") or None,
+    }
+
+
+def historique(params, corps):
+    page = requete_historique(
+        curseur=params.get("curseur"),
+        limite=_entier(params.get("limite"), "limite", 50),
+        **_filtres_historique(params),
+    )
+    return {"matchs": df_vers_json(page.matchs), "curseur_suivant": page.curseur_suivant}
+
+
+def match_historique(params, corps):
+    id_match = _entier(params.get("id"), "id", None)
+    try:
+        match = lire_match(id_match)
+    except KeyError as e:
+        raise LookupError(e.args[0])
+    return {"match": json.loads(match.to_json(force_ascii=False))}
+
+
+def _morceaux_dans_ligue(ligue, morceaux):
+    # le générateur est lu après la fin de traiter(), depuis le fil du serveur
+    while True:
+        with dans_ligue(ligue):
+            try:
+                morceau = next(morceaux)
+            except StopIteration:
+                return
+        yield morceau
+
+
+def export_historique(params, corps):
+    format = params.get("format", "ndjson")
+    # le générateur ne valide le format qu'au premier morceau : on le fait avant d'envoyer l'en-tête
+    if format not in ("ndjson", "csv"):
+        raise ValueError("Format d'export inconnu (ndjson ou csv).")
+    morceaux = _morceaux_dans_ligue(ligue_active(), exporter_historique(format, **_filtres_historique(params)))
+    return Flux("application/x-ndjson" if format == "ndjson" else "text/csv", morceaux)
+
+
+ROUTES = {
+    ("GET", "/sante"): sante,
+    ("GET", "/ligues"): ligues,
+    ("GET", "/joueurs"): joueurs,
+    ("POST", "/equipes"): equipes,
+    ("POST", "/tournoi/equipes"): equipes_tournoi,
+    ("POST", "/tournoi/horaire"): horaire_tournoi,
+    ("POST", "/tournoi/classement"): classement,
+    ("GET", "/tournoi/etat"): etat_tournoi,
+    ("GET", "/tournoi/flux"): flux_tournoi,
+    ("POST", "/tournoi/simulation"): simulation_tournoi,
+    ("GET", "/historique"): historique,
+    ("GET", "/historique/match"): match_historique,
+    ("GET", "/historique/export"): export_historique,
+}
+
+
+# Type attendu des champs du corps (null accepté : valeur par défaut)
+TYPES_CHAMPS = {
+    "ids": (list, "une liste"),
+    "equipes": (list, "une liste"),
+    "matchs": (list, "une liste"),
+    "moyennes": (dict, "un objet"),
+    "format": (str, "un texte"),
+    "debut": (str, "un texte"),
+    "jour": (str, "un texte"),
+}
+
+
+def valider_corps(corps):
+    """Vérifie que le corps est un objet JSON et que ses champs connus ont le bon type ; ValueError sinon."""
+    if corps is None:
+        return {}
+    if not isinstance(corps, dict):
+        raise ValueError("Le corps JSON doit être un objet.")
+    for champ, (attendu, libelle) in TYPES_CHAMPS.items():
+        if corps.get(champ) is not None and not isinstance(corps[champ], attendu):
+            raise ValueError(f"« {champ} » doit être {libelle}.")
+    return corps
+
+
+def traiter(methode, chemin, params=None, corps=None):
+    """Aiguille une requête ; retourne (statut HTTP, dict JSON)."""
+    gestionnaire = ROUTES.get((methode, chemin.rstrip("/") or "/"))
+    if gestionnaire is None:
+        return 404, {"erreur": f"Route inconnue : {methode} {chemin}"}
+    params = params or {}
+    try:
+        corps = valider_corps(corps)
+        ligue = params.get("ligue") or LIGUE_PRINCIPALE
+        with dans_ligue(ligue):
+            if ligue_active() not in lister_ligues():
+                raise LookupError(f"Ligue inconnue : {ligue}")
+            return 200, gestionnaire(params, corps)
+    except LookupError as e:
+        return 404, {"erreur": str(e)}
+    except ValueError as e:
+        return 400, {"erreur": str(e)}
+    except (TypeError, AttributeError) as e:
+        # valeur d'un type inattendu plus loin dans le corps (ex. un élément de liste)
+        return 400, {"erreur": f"Requête invalide : {e}"}
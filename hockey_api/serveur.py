@@ -0,0 +1,107 @@
+"""
+Petit service HTTP JSON autour de hockey_api.gestionnaires (bibliothèque standard seulement).
+
+    python -m hockey_api.serveur --port 8502 [--donnees /chemin/vers/app]
+
+Exemples :
+    curl localhost:8502/sante
+    curl -X POST localhost:8502/equipes -d '{}'
+    curl localhost:8502/tournoi/etat
+    curl "localhost:8502/tournoi/flux?depuis=12&attendre=25"
+    curl "localhost:8502/historique?saison=2024-2025&limite=20"
+    curl "localhost:8502/historique/export?format=csv" > historique.csv
+"""
+import argparse
+import json
+import os
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qsl
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RACINE not in sys.path:
+    sys.path.insert(0, RACINE)
+
+from hockey_api.gestionnaires import traiter, Flux  # noqa: E402
+
+TAILLE_MAX_CORPS = 1_000_000
+
+
+class GestionnaireHTTP(BaseHTTPRequestHandler):
+    server_version = "HockeyAPI/1.0"
+
+    def _repondre(self, statut, donnees):
+        corps = json.dumps(donnees, ensure_ascii=False).encode("utf-8")
+        self.send_response(statut)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(corps)))
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.end_headers()
+        self.wfile.write(corps)
+
+    def _diffuser(self, flux):
+        self.send_response(200)
+        self.send_header("Content-Type", f"{flux.type_contenu}; charset=utf-8")
+        self.end_headers()
+        # HTTP/1.0 sans Content-Length : la fin de connexion marque la fin du flux
+        for morceau in flux.morceaux:
+            self.wfile.write(morceau.encode("utf-8"))
+
+    def _traiter(self, methode):
+        url = urlparse(self.path)
+        params = dict(parse_qsl(url.query))
+        corps = {}
+        longueur = int(self.headers.get("Content-Length") or 0)
+        if longueur > TAILLE_MAX_CORPS:
+            return self._repondre(413, {"erreur": "Requête trop volumineuse."})
+        if longueur:
+            try:
+                corps = json.loads(self.rfile.read(longueur) or b"{}")
+            except json.JSONDecodeError:
+                return self._repondre(400, {"erreur": "Corps JSON invalide."})
+        statut, donnees = traiter(methode, url.path, params, corps)
+        if isinstance(donnees, Flux):
+            return self._diffuser(donnees)
+        self._repondre(statut, donnees)
+
+    def do_GET(self):
+        self._traiter("GET")
+
+    def do_POST(self):
+        self._traiter("POST")
+
+    def log_message(self, format, *args):
+        if not getattr(self.server, "silencieux", False):
+            super().log_message(format, *args)
+
+
+def creer_serveur(hote="127.0.0.1", port=8502, silencieux=False):
+    serveur = ThreadingHTTPServer((hote, port), GestionnaireHTTP)
+    serveur.daemon_threads = True
+    serveur.silencieux = silencieux
+    return serveur
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Service HTTP JSON de l'application de hockey.")
+    parser.add_argument("--hote", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument("--donnees", default=RACINE, help="Dossier contenant data/ (défaut : racine du dépôt)")
+    args = parser.parse_args(argv)
+
+    os.chdir(args.donnees)
+    from hydratation_utils import hydrater_au_demarrage
+    for repo, resultat in hydrater_au_demarrage():
+        print(f"Hydratation depuis {repo} : {resultat}", file=sys.stderr)
+    serveur = creer_serveur(args.hote, args.port)
+    print(f"Service hockey sur http://{args.hote}:{args.port}", file=sys.stderr)
+    try:
+        serveur.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        serveur.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""
+Hydratation de data/ depuis le dépôt GitHub au démarrage (hébergement éphémère).
+
+github_utils ne fait que pousser les fichiers : après un redémarrage, data/ redevient
+celui du déploiement. Au premier affichage, on demande l'arbre du dépôt (une requête,
+avec le SHA « blob » git de chaque fichier) et on le compare aux fichiers locaux :
+
+- si tout correspond (redémarrage à chaud), on s'arrête là ;
+- sinon, l'archive tar.gz de la branche est lue en flux (une seconde requête) et seuls
+  les fichiers différents sont écrits, chacun vérifié contre son SHA puis écrit de façon
+  atomique (fichier temporaire, fsync, os.replace).
+
+Un fichier modifié localement depuis la dernière hydratation (sauvegarde GitHub échouée)
+est conservé, et l'ancien historique.csv n'est plus récupéré une fois importé dans
+historique/. Si l'API renvoie un arbre tronqué (très gros dépôt), l'archive est lue et
+chaque fichier absent de l'arbre est comparé d'après son propre contenu. L'état de la
+dernière hydratation est gardé dans data/.hydratation.json, ce qui évite aussi de relire
+les fichiers inchangés pour calculer leur SHA.
+
+L'adresse de l'API est configurable (GITHUB_API_URL) pour GitHub Enterprise ou pour un
+faux serveur local : voir benchmarks/hydratation_github.py.
+"""
+import hashlib
+import json
+import os
+import posixpath
+import tarfile
+import threading
+import time
+from collections import namedtuple
+
+import requests
+
+from ligues_utils import DOSSIER_DONNEES, LIGUE_PRINCIPALE, dossier_ligue, valider_ligue
+
+API_GITHUB = "https://api.github.com"
+FICHIER_ETAT = ".hydratation.json"
+NOM_ANCIEN_HISTORIQUE = "historique.csv"  # voir historique_utils.charger_manifeste
+DELAI_S = 30
+
+Hydratation = namedtuple("Hydratation", ["ecrits", "inchanges", "conserves", "erreurs", "requetes", "duree_s"])
+
+_verrou = threading.Lock()
+_deja_fait = False
+
+
+# --- SHA git ---
+def sha_blob(contenu):
+    """SHA-1 d'un objet blob git (celui que donne l'API « trees »)."""
+    return hashlib.sha1(b"blob %d\0" % len(contenu) + contenu).hexdigest()
+
+
+def _sha_fichier(chemin):
+    with open(chemin, "rb") as f:
+        return sha_blob(f.read())
+
+
+def _ecrire_atomique(chemin, contenu):
+    os.makedirs(os.path.dirname(chemin) or ".", exist_ok=True)
+    tmp = f"{chemin}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(contenu)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, chemin)
+
+
+# --- État local ---
+def _chemin_etat(racine):
+    return os.path.join(racine, DOSSIER_DONNEES, FICHIER_ETAT)
+
+
+def _lire_etat(racine):
+    try:
+        with open(_chemin_etat(racine), encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _ecrire_etat(etat, racine):
+    _ecrire_atomique(_chemin_etat(racine), json.dumps(etat, ensure_ascii=False).encode("utf-8"))
+
+
+def _sha_local(chemin_depot, racine, etat):
+    """SHA du fichier local (None s'il n'existe pas), recalculé seulement si mtime / taille ont bougé."""
+    chemin = os.path.join(racine, *chemin_depot.split("/"))
+    try:
+        st_fichier = os.stat(chemin)
+    except FileNotFoundError:
+        return None
+    connu = etat.get(chemin_depot)
+    if connu and connu["mtime_ns"] == st_fichier.st_mtime_ns and connu["taille"] == st_fichier.st_size:
+        return connu["sha_local"]
+    return _sha_fichier(chemin)
+
+
+def _noter(etat, chemin_depot, racine, sha_distant, sha_local):
+    st_fichier = os.stat(os.path.join(racine, *chemin_depot.split("/")))
+    etat[chemin_depot] = {
+        "sha": sha_distant, "sha_local": sha_local,
+        "mtime_ns": st_fichier.st_mtime_ns, "taille": st_fichier.st_size,
+    }
+
+
+# --- Cibles ---
+def cibles_hydratation(environ=None):
+    """[(dépôt, branche, préfixe de chemins, préfixes exclus)] à hydrater.
+
+    Le dépôt commun (GITHUB_REPO) fournit data/ ; une ligue qui a son propre dépôt
+    (GITHUB_REPO_<LIGUE>) fournit data/ligues/<ligue>/ et est exclue du dépôt commun.
+    """
+    environ = os.environ if environ is None else environ
+    propres = []
+    for cle, repo in environ.items():
+        if cle.startswith("GITHUB_REPO_") and repo:
+            try:
+                ligue = valider_ligue(cle[len("GITHUB_REPO_"):].replace("_", "-"))
+            except ValueError:
+                continue
+            if ligue != LIGUE_PRINCIPALE:
+                branche = environ.get(f"GITHUB_BRANCH_{cle[len('GITHUB_REPO_'):]}") or environ.get("GITHUB_BRANCH") or "main"
+                propres.append((repo, branche, dossier_ligue(ligue).replace(os.sep, "/") + "/", ()))
+    cibles = []
+    if environ.get("GITHUB_REPO"):
+        exclus = tuple(prefixe for _, _, prefixe, _ in propres)
+        cibles.append((environ["GITHUB_REPO"], environ.get("GITHUB_BRANCH") or "main", DOSSIER_DONNEES + "/", exclus))
+    return cibles + propres
+
+
+def _retenu(chemin, prefixe, exclus):
+    normal = posixpath.normpath(chemin)
+    return (
+        normal == chemin and chemin.startswith(prefixe) and not chemin.startswith(exclus)
+        and not posixpath.basename(chemin).startswith(".") and not chemin.endswith(".tmp")
+    )
+
+
+def _deja_migre(chemin, racine):
+    """Vrai pour un ancien historique.csv déjà importé dans historique/ (puis renommé en .bak) :
+    le réécrire le ferait importer une seconde fois et doublerait tous les matchs."""
+    if posixpath.basename(chemin) != NOM_ANCIEN_HISTORIQUE:
+        return False
+    local = os.path.join(racine, *chemin.split("/"))
+    dossier = os.path.join(os.path.dirname(local), "historique")
+    return os.path.exists(os.path.join(dossier, "manifest.json")) or os.path.exists(f"{local}.bak")
+
+
+def _comparer(chemin, sha, racine, etat):
+    """« inchange », « conserve » (modifié ici depuis la dernière hydratation) ou « ecrire »."""
+    sha_local = _sha_local(chemin, racine, etat)
+    if sha_local == sha:
+        if etat.get(chemin, {}).get("sha") != sha:
+            _noter(etat, chemin, racine, sha, sha_local)
+        return "inchange"
+    if sha_local is not None and chemin in etat and sha_local != etat[chemin]["sha_local"]:
+        return "conserve"
+    return "ecrire"
+
+
+# --- Hydratation ---
+def hydrater(repo, branche="main", prefixe="data/", exclus=(), racine=".", api=None, token=None, session=None):
+    """Met les fichiers locaux sous `prefixe` au niveau de la branche du dépôt ; retourne une Hydratation.
+
+    Lève requests.RequestException si l'API ne répond pas, ValueError si sa réponse est inattendue.
+    """
+    debut = time.perf_counter()
+    api = (api or os.environ.get("GITHUB_API_URL") or API_GITHUB).rstrip("/")
+    token = token if token is not None else os.environ.get("GITHUB_TOKEN")
+    session = session or requests.Session()
+    entetes = {"Accept": "application/vnd.github+json"}
+    if token:
+        entetes["Authorization"] = f"Bearer {token}"
+
+    # 1. L'arbre : chemin -> SHA blob de chaque fichier de données
+    r = session.get(f"{api}/repos/{repo}/git/trees/{branche}", params={"recursive": "1"},
+                    headers=entetes, timeout=DELAI_S)
+    r.raise_for_status()
+    try:
+        reponse = r.json()
+        arbre = {
+            e["path"]: e["sha"] for e in reponse["tree"]
+            if e.get("type") == "blob" and _retenu(e["path"], prefixe, exclus) and not _deja_migre(e["path"], racine)
+        }
+        # dépôt trop gros pour une seule réponse : l'arbre est partiel, l'archive fait foi
+        tronque = bool(reponse.get("truncated"))
+    except (KeyError, TypeError, AttributeError) as e:
+        raise ValueError(f"Réponse inattendue de l'API GitHub (arbre) : {e}")
+    requetes = 1
+
+    etat = _lire_etat(racine)
+    a_ecrire, inchanges, conserves = {}, [], []
+    for chemin, sha in arbre.items():
+        decision = _comparer(chemin, sha, racine, etat)
+        if decision == "inchange":
+            inchanges.append(chemin)
+        elif decision == "conserve":
+            conserves.append(chemin)  # modifié ici depuis la dernière hydratation : pas écrasé
+        else:
+            a_ecrire[chemin] = sha
+
+    # 2. L'archive, seulement s'il manque quelque chose (ou si l'arbre est incomplet)
+    ecrits, erreurs, lus = [], [], set()
+    if a_ecrire or tronque:
+        r = session.get(f"{api}/repos/{repo}/tarball/{branche}", headers=entetes, timeout=DELAI_S, stream=True)
+        r.raise_for_status()
+        requetes += 1
+        with tarfile.open(fileobj=r.raw, mode="r|gz") as archive:
+            for membre in archive:
+                # les chemins de l'archive commencent par « <propriétaire>-<dépôt>-<commit>/ »
+                chemin = membre.name.split("/", 1)[1] if "/" in membre.name else ""
+                if not membre.isfile():
+                    continue
+                sha = a_ecrire.get(chemin)
+                if sha is None:
+                    # absent de l'arbre tronqué : comparé d'après son propre contenu
+                    if not tronque or chemin in arbre or not _retenu(chemin, prefixe, exclus) or _deja_migre(chemin, racine):
+                        continue
+                    contenu = archive.extractfile(membre).read()
+                    sha = sha_blob(contenu)
+                    decision = _comparer(chemin, sha, racine, etat)
+                    if decision != "ecrire":
+                        (inchanges if decision == "inchange" else conserves).append(chemin)
+                        continue
+                else:
+                    lus.add(chemin)
+                    contenu = archive.extractfile(membre).read()
+                if sha_blob(contenu) != sha:
+                    erreurs.append(f"{chemin} : contenu différent de l'arbre")
+                    continue
+                _ecrire_atomique(os.path.join(racine, *chemin.split("/")), contenu)
+                _noter(etat, chemin, racine, sha, sha)
+                ecrits.append(chemin)
+        erreurs += [f"{c} : absent de l'archive" for c in a_ecrire if c not in lus]
+
+    if ecrits or etat != _lire_etat(racine):
+        _ecrire_etat(etat, racine)
+    return Hydratation(ecrits, inchanges, conserves, erreurs, requetes, round(time.perf_counter() - debut, 4))
+
+
+def hydrater_au_demarrage(racine="."):
+    """Hydrate toutes les cibles une seule fois par processus (GITHUB_REPO absent : rien à faire).
+
+    HYDRATATION=0 désactive l'étape. Les erreurs réseau n'empêchent pas l'application de
+    démarrer sur les données locales ; elles sont retournées avec les résultats.
+    """
+    global _deja_fait
+    with _verrou:
+        if _deja_fait or os.environ.get("HYDRATATION", "1") == "0":
+            return []
+        _deja_fait = True
+        resultats = []
+        for repo, branche, prefixe, exclus in cibles_hydratation():
+            try:
+                resultats.append((repo, hydrater(repo, branche, prefixe, exclus, racine)))
+            except (requests.RequestException, ValueError, tarfile.TarError) as e:
+                resultats.append((repo, e))
+        return resultats
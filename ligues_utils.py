@@ -0,0 +1,141 @@
+"""
+Plusieurs ligues dans un seul déploiement : chaque ligue a son propre dossier de données.
+
+La ligue « principale » garde le dossier data/ historique ; les autres vivent dans
+data/ligues/<ligue>/ avec la même structure (joueurs.csv, historique/, tournoi_*...).
+
+Les chemins de données des modules (JOUEURS_PATH, HISTORIQUE_DIR, FLUX_FILE...) sont des
+CheminLigue : ils se résolvent à chaque utilisation dans le dossier de la ligue active du
+fil d'exécution courant. Streamlit exécute chaque session dans son propre fil, et chaque
+page active la ligue choisie dans la session au début de son exécution ; l'API fait de
+même par requête. Comme les caches sont indexés par chemin absolu et version de fichier,
+chaque ligue a ses propres entrées : écrire dans une ligue n'invalide rien ailleurs.
+"""
+import contextlib
+import os
+import re
+import threading
+
+DOSSIER_DONNEES = "data"
+LIGUE_PRINCIPALE = "principale"
+_NOM_VALIDE = re.compile(r"^[a-z0-9][a-z0-9_-]{0,39}$")
+
+_local = threading.local()
+
+
+# --- Ligue active ---
+def valider_ligue(ligue):
+    """Nom de ligue normalisé (minuscules) ; ValueError s'il ne peut pas servir de dossier."""
+    nom = str(ligue or "").strip().lower()
+    if not _NOM_VALIDE.match(nom):
+        raise ValueError(
+            "Nom de ligue invalide : lettres minuscules, chiffres, « - » ou « _ » (40 caractères au plus)."
+        )
+    return nom
+
+
+def ligue_active():
+    return getattr(_local, "ligue", LIGUE_PRINCIPALE)
+
+
+def activer_ligue(ligue):
+    """Ligue utilisée par les chemins de données dans le fil courant ; retourne son nom."""
+    _local.ligue = valider_ligue(ligue or LIGUE_PRINCIPALE)
+    return _local.ligue
+
+
+@contextlib.contextmanager
+def dans_ligue(ligue):
+    """Exécute un bloc dans une ligue, puis rétablit la ligue précédente du fil."""
+    precedente = ligue_active()
+    activer_ligue(ligue)
+    try:
+        yield
+    finally:
+        _local.ligue = precedente
+
+
+def dossier_ligue(ligue=None):
+    ligue = valider_ligue(ligue) if ligue else ligue_active()
+    if ligue == LIGUE_PRINCIPALE:
+        return DOSSIER_DONNEES
+    return os.path.join(DOSSIER_DONNEES, "ligues", ligue)
+
+
+class CheminLigue(os.PathLike):
+    """Chemin relatif au dossier de la ligue active, résolu à chaque utilisation."""
+    __slots__ = ("relatif",)
+
+    def __init__(self, *parties):
+        self.relatif = os.path.join(*parties)
+
+    def __fspath__(self):
+        return os.path.join(dossier_ligue(), self.relatif)
+
+    __str__ = __fspath__
+
+    def __repr__(self):
+        return f"CheminLigue({self.relatif!r})"
+
+
+# --- Ligues existantes ---
+def lister_ligues():
+    """Ligue principale puis les autres, par ordre alphabétique."""
+    racine = os.path.join(DOSSIER_DONNEES, "ligues")
+    autres = sorted(
+        d for d in os.listdir(racine)
+        if os.path.isdir(os.path.join(racine, d)) and _NOM_VALIDE.match(d)
+    ) if os.path.isdir(racine) else []
+    return [LIGUE_PRINCIPALE] + [d for d in autres if d != LIGUE_PRINCIPALE]
+
+
+def creer_ligue(ligue):
+    """Crée le dossier d'une nouvelle ligue (vide) ; ValueError si elle existe déjà."""
+    nom = valider_ligue(ligue)
+    dossier = dossier_ligue(nom)
+    if nom in lister_ligues():
+        raise ValueError(f"La ligue « {nom} » existe déjà.")
+    os.makedirs(dossier, exist_ok=True)
+    return nom
+
+
+# --- Session Streamlit ---
+def _passer_a(ligue):
+    import streamlit as st
+    # les équipes, présences et curseurs en session appartiennent à l'ancienne ligue
+    for cle in list(st.session_state.keys()):
+        if cle not in ("ligue", "ligue_choix"):
+            del st.session_state[cle]
+    st.session_state["ligue"] = ligue
+
+
+def _changer_ligue():
+    import streamlit as st
+    _passer_a(st.session_state["ligue_choix"])
+
+
+def ligue_de_session():
+    """Sélecteur de ligue dans la barre latérale ; active la ligue de la session et la retourne.
+
+    À appeler au début de chaque page.
+    """
+    import streamlit as st
+    from hydratation_utils import hydrater_au_demarrage
+    # premier affichage du processus : data/ est d'abord remis au niveau du dépôt GitHub
+    for repo, resultat in hydrater_au_demarrage():
+        if isinstance(resultat, Exception):
+            st.sidebar.warning(f"⚠️ Données non récupérées depuis GitHub ({repo}) : {resultat}")
+    ligues = lister_ligues()
+    if st.session_state.get("ligue") not in ligues:
+        st.session_state["ligue"] = LIGUE_PRINCIPALE
+    st.session_state["ligue_choix"] = st.session_state["ligue"]
+    st.sidebar.selectbox("🏒 Ligue", ligues, key="ligue_choix", on_change=_changer_ligue)
+    with st.sidebar.expander("➕ Nouvelle ligue"):
+        nom = st.text_input("Nom de la ligue", key="ligue_nouvelle", placeholder="ex. lundi-soir")
+        if st.button("Créer la ligue", key="ligue_creer"):
+            try:
+                _passer_a(creer_ligue(nom))
+                st.rerun()
+            except ValueError as e:
+                st.error(str(e))
+    return activer_ligue(st.session_state["ligue"])
@@ -0,0 +1,73 @@
+import streamlit as st
+from ligues_utils import ligue_de_session
+import pandas as pd
+from utils import load_players
+from historique_utils import saisons_historique, charger_historique
+from equite_utils import (
+    audit, ecarts, histogramme_ecarts, comparer_algorithme, NB_SIMULATIONS, MIN_MATCHS_JOUEUR,
+)
+
+st.title("⚖️ Équité des matchs")
+ligue = ligue_de_session()
+st.markdown("Les équipes enregistrées sont-elles vraiment équilibrées ? Écart = moyenne des BLANCS − moyenne des NOIRS.")
+
+comptes_saisons = saisons_historique()
+if comptes_saisons.empty:
+    st.warning("Aucun historique trouvé pour le moment.")
+    st.stop()
+
+choix_saison = st.selectbox("🏒 Choisir la saison :", ["Toutes"] + comptes_saisons.index.tolist())
+hist = charger_historique(None if choix_saison == "Toutes" else [choix_saison])
+players = load_players()
+rapport = audit(hist, players)
+resume = rapport["ecarts"]
+if resume["nb_matchs"] == 0:
+    st.warning("Aucun match avec des moyennes pour cette sélection.")
+    st.stop()
+
+# --- Distribution des écarts ---
+st.subheader("📏 Distribution des écarts")
+col1, col2, col3, col4 = st.columns(4)
+col1.metric("Matchs", resume["nb_matchs"])
+col2.metric("|Écart| moyen", resume["moyenne_abs"])
+col3.metric("|Écart| p95", resume["p95_abs"])
+col4.metric("BLANCS plus forts", f"{resume['blancs_plus_forts']:.0%}")
+st.bar_chart(pd.DataFrame(rapport["histogramme"]).set_index("Borne"))
+st.caption(
+    f"{resume['part_sous_0.25']:.0%} des matchs à 0,25 point ou moins, "
+    f"{resume['part_sous_0.5']:.0%} à 0,5 ou moins, {resume['part_sous_1.0']:.0%} à 1 ou moins."
+)
+
+# --- Dérive par saison ---
+st.subheader("📅 Dérive par saison")
+st.dataframe(pd.DataFrame(rapport["saisons"]), hide_index=True, use_container_width=True)
+
+# --- Joueurs ---
+st.subheader("🧍 Joueurs du côté le plus fort")
+st.caption(
+    f"Joueurs avec au moins {MIN_MATCHS_JOUEUR} matchs. z au-delà de ±2 : le joueur se retrouve "
+    "plus (ou moins) souvent qu'au hasard dans l'équipe favorisée."
+)
+st.dataframe(pd.DataFrame(rapport["joueurs"]), hide_index=True, use_container_width=True)
+
+# --- Comparaison avec l'algorithme ---
+st.subheader("🤖 Comparaison avec l’algorithme seul")
+st.markdown(
+    "Simule `generate_teams` sur des groupes tirés au hasard dans la liste des joueurs, "
+    "avec la même taille de groupe que les matchs enregistrés."
+)
+nb_simulations = st.number_input("Nombre de formations simulées", 20, 2000, NB_SIMULATIONS, 20)
+if st.button("🎲 Lancer la comparaison"):
+    with st.spinner("Simulation en cours..."):
+        comparaison = comparer_algorithme(hist, players, nb_simulations, ecart=ecarts(hist))
+    lignes = ["moyenne_abs", "mediane_abs", "p90_abs", "p95_abs", "part_sous_0.25", "part_sous_0.5"]
+    st.dataframe(pd.DataFrame({
+        "Statistique": lignes,
+        "Observé": [comparaison.observe.get(k) for k in lignes],
+        "Algorithme seul": [comparaison.simule.get(k) for k in lignes],
+    }), hide_index=True, use_container_width=True)
+    st.bar_chart(histogramme_ecarts(comparaison.ecarts_simules).set_index("Borne"))
+    st.caption(
+        f"Statistique KS sur |écart| : {comparaison.ks} (0 = distributions identiques). "
+        "Un écart observé plus grand vient des échanges et formations manuelles."
+    )
@@ -0,0 +1,94 @@
+import streamlit as st
+from ligues_utils import ligue_de_session
+import pandas as pd
+import io
+import json
+from versions_utils import (
+    CIBLES, VERSIONS_GARDEES, JOURS_GARDES,
+    lister_versions, lire_version, contenu_fichier, restaurer_version, annuler_derniere, version_precedente,
+    occupation,
+)
+
+st.title("🕰️ Versions et restauration")
+ligue = ligue_de_session()
+st.markdown(
+    "Chaque enregistrement des joueurs (présences comprises), chaque match enregistré et chaque "
+    "suppression dans l’historique garde une version. L’état remplacé par une restauration est "
+    "lui-même gardé : une restauration s’annule comme le reste."
+)
+
+cible = st.radio("Fichiers", list(CIBLES), format_func=CIBLES.get, horizontal=True)
+versions = lister_versions(cible)
+if versions.empty:
+    st.info("Aucune version pour le moment : elles s’ajoutent à chaque enregistrement.")
+    st.stop()
+
+# --- Annuler la dernière modification ---
+def annuler(cible):
+    # avant l'affichage : le bouton montre ensuite la version que remettrait le clic suivant
+    try:
+        id_version = annuler_derniere(cible)
+        st.session_state["versions_annulation"] = (
+            ("success", f"✅ Version {id_version} restaurée.") if id_version else ("error", "⚠️ Plus rien à annuler.")
+        )
+    except (ValueError, OSError) as e:
+        st.session_state["versions_annulation"] = ("error", f"⚠️ Restauration impossible : {e}")
+
+
+derniere = versions.iloc[0]
+st.caption(f"Dernière modification : **{derniere['Raison']}** ({derniere['Date']})")
+precedente = version_precedente(cible)
+if precedente is not None:
+    st.button(
+        f"↩️ Annuler la dernière modification (revenir à la version {precedente['id']})",
+        help="Chaque clic recule d'une version de plus.", on_click=annuler, args=(cible,),
+    )
+if "versions_annulation" in st.session_state:
+    niveau, message = st.session_state.pop("versions_annulation")
+    (st.success if niveau == "success" else st.error)(message)
+
+# --- Toutes les versions ---
+st.subheader("📚 Versions enregistrées")
+st.dataframe(versions.drop(columns=["Cible"]), hide_index=True, use_container_width=True)
+
+raisons = dict(zip(versions["id"], versions["Date"] + " — " + versions["Raison"]))
+choix = st.selectbox("Version à consulter", versions["id"].tolist(), format_func=lambda i: f"{i} · {raisons[i]}")
+version = lire_version(choix)
+
+try:
+    if cible == "joueurs":
+        joueurs = pd.read_csv(io.BytesIO(contenu_fichier(choix, "joueurs.csv")))
+        presents = int(joueurs["present"].astype(str).str.lower().isin(["true", "1"]).sum()) if "present" in joueurs else 0
+        st.caption(f"{len(joueurs)} joueurs, {presents} présents.")
+        st.dataframe(joueurs, hide_index=True, use_container_width=True)
+    else:
+        manifeste = "historique/manifest.json"
+        if manifeste in version["fichiers"]:
+            saisons = json.loads(contenu_fichier(choix, manifeste))["saisons"]
+            st.dataframe(
+                pd.DataFrame([{"Saison": s, "Matchs": r["nb_matchs"]} for s, r in sorted(saisons.items())]),
+                hide_index=True,
+            )
+        else:
+            st.caption("Historique vide dans cette version.")
+except ValueError as e:
+    st.error(f"⚠️ {e}")
+
+if st.button(f"♻️ Restaurer la version {choix}"):
+    try:
+        reecrits = restaurer_version(choix)
+        st.success(f"✅ Version {choix} restaurée ({len(reecrits)} fichier(s) remis en place).")
+    except (ValueError, OSError) as e:
+        st.error(f"⚠️ Restauration impossible : {e}")
+
+# --- Espace disque ---
+st.divider()
+nb_versions, logique, disque = occupation()
+col1, col2, col3 = st.columns(3)
+col1.metric("Versions", nb_versions)
+col2.metric("Copies complètes", f"{logique / 1e6:.2f} Mo")
+col3.metric("Sur disque", f"{disque / 1e6:.2f} Mo")
+st.caption(
+    f"Rétention : les {VERSIONS_GARDEES} dernières versions de chaque fichier, plus la dernière "
+    f"de chaque jour pendant {JOURS_GARDES} jours."
+)
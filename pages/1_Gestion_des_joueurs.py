@@ -1,31 +1,48 @@
 import streamlit as st
+from ligues_utils import ligue_de_session
 import pandas as pd
-from utils import load_players, save_players
+from utils import (
+    load_players, version_fichier, JOUEURS_PATH,
+    verifier_changements_joueurs, appliquer_changements_joueurs, reinitialiser_presences,
+)
+from presences_utils import statistiques_presences, presence_attendue, resume_seances, prechauffer_formation
 
 st.title("👥 Gestion des joueurs")
+ligue = ligue_de_session()
 
-# Charger les joueurs
-df = load_players()
+# Charger les joueurs (une seule fois : l'éditeur travaille sur cette version)
+if "joueurs_base" not in st.session_state:
+    st.session_state["joueurs_version"] = version_fichier(JOUEURS_PATH)
+    st.session_state["joueurs_base"] = load_players()
+df = st.session_state["joueurs_base"].copy()
 
 # S'assurer que les talents sont en format float avec 2 décimales
 df["talent_attaque"] = df["talent_attaque"].astype(float).round(2)
 df["talent_defense"] = df["talent_defense"].astype(float).round(2)
 
+def recharger():
+    for cle in ["joueurs_base", "joueurs_version", "editeur_joueurs"]:
+        st.session_state.pop(cle, None)
+    st.rerun()
+
 # 🧮 Compteur de joueurs présents
 present_count = df["present"].sum()
 st.info(f"✅ {present_count} joueurs présents sélectionnés")
 
-# Empêcher les noms dupliqués
-if df["nom"].duplicated().any():
-    st.warning("⚠️ Des noms sont dupliqués ! Tu dois corriger avant d’enregistrer.")
+if version_fichier(JOUEURS_PATH) != st.session_state["joueurs_version"]:
+    st.warning("🔄 La liste a été modifiée par quelqu'un d'autre depuis l'ouverture de la page.")
+    if st.button("🔄 Recharger la liste"):
+        recharger()
 
 st.subheader("Liste complète des joueurs")
 
-edited_df = st.data_editor(
+st.data_editor(
     df,
+    key="editeur_joueurs",
     num_rows="dynamic",
     use_container_width=True,
     column_config={
+        "id": st.column_config.NumberColumn("ID", disabled=True),
         "nom": st.column_config.TextColumn("Nom du joueur"),
         "talent_attaque": st.column_config.NumberColumn(
             "Talent Attaque",
@@ -46,26 +63,44 @@ edited_df = st.data_editor(
     hide_index=True
 )
 
-# Nettoyage automatique des noms
-edited_df["nom"] = edited_df["nom"].fillna("").str.strip().str.upper()
+# Changements faits dans l'éditeur (seules ces lignes sont vérifiées et enregistrées)
+changements = st.session_state.get("editeur_joueurs", {})
+
+# Empêcher les noms dupliqués
+doublons = verifier_changements_joueurs(df, changements, st.session_state["joueurs_version"])
+if doublons:
+    st.warning(f"⚠️ Des noms sont dupliqués ! Tu dois corriger avant d’enregistrer : {', '.join(doublons)}")
 
 # Bouton d'enregistrement
 if st.button("💾 Enregistrer les modifications"):
-    # Vérifier doublons
-    if edited_df["nom"].duplicated().any():
-        st.error("⚠️ Impossible d’enregistrer : il y a des noms en double.")
-    else:
-        # Sauvegarde finale
-        edited_df["talent_attaque"] = edited_df["talent_attaque"].astype(float).round(2)
-        edited_df["talent_defense"] = edited_df["talent_defense"].astype(float).round(2)
-
-        save_players(edited_df)
+    try:
+        appliquer_changements_joueurs(df, changements, st.session_state["joueurs_version"])
         st.success("✅ Modifications enregistrées avec succès.")
-        st.rerun()
+        recharger()
+    except ValueError as e:
+        st.error(f"⚠️ Impossible d’enregistrer : {e}")
 
 # Bouton remise à zéro
 if st.button("🧹 Remettre à zéro la présence"):
-    edited_df["present"] = False
-    save_players(edited_df)
+    reinitialiser_presences()
     st.success("✅ Toutes les présences ont été remises à zéro.")
-    st.rerun()
+    recharger()
+
+# --- Assiduité (journal des présences) ---
+with st.expander("📈 Assiduité"):
+    nb_seances, derniere, ouverte = resume_seances()
+    if not nb_seances:
+        st.info("Aucune séance terminée : le journal se remplit à chaque enregistrement des présences "
+                "et chaque remise à zéro clôt une séance.")
+    else:
+        attendus, probables = presence_attendue()
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Séances", nb_seances)
+        col2.metric("Dernière séance", derniere.isoformat())
+        col3.metric("Présence attendue", f"~{attendus:g}")
+        st.dataframe(statistiques_presences(), hide_index=True, use_container_width=True)
+        if st.button("🔥 Préparer la formation pour les joueurs probables"):
+            ids = prechauffer_formation(probables)
+            st.success(f"✅ Caches de formation prêts pour {len(ids)} joueurs probables.")
+    if ouverte:
+        st.caption(f"Séance en cours : {len(ouverte)} joueurs inscrits.")
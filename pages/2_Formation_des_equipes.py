@@ -1,16 +1,25 @@
 import streamlit as st
+from ligues_utils import ligue_de_session
 import pandas as pd
-import random
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from datetime import datetime
-from utils import load_players, save_history
+from utils import load_players, save_history, roster_par_id
+from presences_utils import presence_attendue, prechauffer_formation
+from formation_utils import (
+    generate_teams, meilleurs_echanges, appliquer_echange, moyennes_equipes,
+    talents_des_groupes, EquipeCompacte, compacter_match, deplier_match,
+)
+from contraintes_utils import generer_equipes_contraintes, BUDGET_S
+from rejeu_utils import archiver_roster
+from rotation_utils import planifier_match, temps_de_glace, dessiner_rotation, DUREE_PRESENCE_S
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
 import io
 
 st.title("2️⃣ Formation des équipes de hockey 🏒")
+ligue = ligue_de_session()
 st.markdown(
     "Forme automatiquement **deux équipes équilibrées** (**BLANCS ⚪ / NOIRS ⚫**) "
     "avec 4 trios et 4 duos équilibrés, et affiche leurs moyennes de talent."
@@ -24,99 +33,82 @@ date_match = st.date_input("Match du :", datetime.now().date())
 players = load_players()
 players_present = players[players["present"] == True].reset_index(drop=True)
 st.info(f"✅ {len(players_present)} joueurs présents sélectionnés")
+attendus, probables = presence_attendue()
+if attendus:
+    st.caption(f"📈 Présence attendue d'après les séances passées : ~{attendus:g} joueurs ({len(probables)} probables).")
+if players_present.empty:
+    # personne n'est encore coché : on prépare les caches pour le roster probable
+    prechauffer_formation(probables)
 
 if len(players_present) < 10:
     st.warning("⚠️ Peu de joueurs présents — les équipes seront formées quand même.")
 
-# --- Fonction pour générer deux équipes équilibrées ---
-def generate_teams(players_present: pd.DataFrame):
-    if players_present.empty:
-        return None
-
-    players_present = players_present.copy()
-    players_present["poste"] = players_present.apply(
-        lambda x: "Attaquant" if x["talent_attaque"] >= x["talent_defense"] else "Défenseur",
-        axis=1
-    )
-
-    attaquants = players_present[players_present["poste"] == "Attaquant"].copy()
-    defenseurs = players_present[players_present["poste"] == "Défenseur"].copy()
-
-    # équilibrage
-    if len(defenseurs) < 8:
-        supl = attaquants.nlargest(8 - len(defenseurs), "talent_defense")
-        defenseurs = pd.concat([defenseurs, supl])
-        attaquants = attaquants.drop(supl.index)
-
-    if len(attaquants) < 12:
-        supl = defenseurs.nlargest(12 - len(attaquants), "talent_attaque")
-        attaquants = pd.concat([attaquants, supl])
-        defenseurs = defenseurs.drop(supl.index)
-
-    # répartition snake draft
-    def snake_draft(df, nb_groupes, colonne):
-        if df.empty:
-            return [pd.DataFrame() for _ in range(nb_groupes)]
-        df = df.sample(frac=1).sort_values(colonne, ascending=False).reset_index(drop=True)
-        groupes = [[] for _ in range(nb_groupes)]
-        sens = 1
-        idx = 0
-        for _, joueur in df.iterrows():
-            groupes[idx].append(joueur)
-            idx += sens
-            if idx == nb_groupes:
-                sens = -1
-                idx = nb_groupes - 1
-            elif idx < 0:
-                sens = 1
-                idx = 0
-        return [pd.DataFrame(g) for g in groupes]
-
-    trios = snake_draft(attaquants, 4, "talent_attaque")
-    duos = snake_draft(defenseurs, 4, "talent_defense")
-    random.shuffle(trios)
-    random.shuffle(duos)
-
-    equipeB_trios = trios[::2]
-    equipeN_trios = trios[1::2]
-    equipeB_duos = duos[::2]
-    equipeN_duos = duos[1::2]
-
-    def moyenne(unites, colonne):
-        valeurs = [u[colonne].mean() for u in unites if not u.empty]
-        return round(sum(valeurs) / len(valeurs), 2) if valeurs else 0
-
-    moyB = round((moyenne(equipeB_trios, "talent_attaque") + moyenne(equipeB_duos, "talent_defense")) / 2, 2)
-    moyN = round((moyenne(equipeN_trios, "talent_attaque") + moyenne(equipeN_duos, "talent_defense")) / 2, 2)
-
-    # compter les joueurs
-    nb_joueurs_B = sum(len(t) for t in (equipeB_trios + equipeB_duos))
-    nb_joueurs_N = sum(len(t) for t in (equipeN_trios + equipeN_duos))
-
-    return dict(
-        equipeB_trios=equipeB_trios,
-        equipeN_trios=equipeN_trios,
-        equipeB_duos=equipeB_duos,
-        equipeN_duos=equipeN_duos,
-        moyB=moyB,
-        moyN=moyN,
-        nbB=nb_joueurs_B,
-        nbN=nb_joueurs_N
+# --- Contraintes (familles à garder ensemble ou à séparer, postes imposés) ---
+TYPES_REGLES = {
+    "meme_equipe": "Même équipe",
+    "separes": "Équipes différentes",
+    "meme_ligne": "Même trio / duo",
+}
+noms_presents = dict(zip(players_present["id"], players_present["nom"]))
+contraintes = st.session_state.setdefault("contraintes", {t: [] for t in TYPES_REGLES})
+
+with st.expander("🔗 Contraintes (familles, lignes, postes)"):
+    col_type, col_joueurs = st.columns([1, 2])
+    type_regle = col_type.selectbox("Règle", list(TYPES_REGLES), format_func=TYPES_REGLES.get)
+    joueurs_regle = col_joueurs.multiselect(
+        "Joueurs", list(noms_presents), format_func=lambda i: noms_presents.get(i, f"#{i}")
     )
+    if st.button("➕ Ajouter la règle"):
+        if len(joueurs_regle) < 2:
+            st.warning("⚠️ Une règle doit viser au moins 2 joueurs.")
+        else:
+            contraintes[type_regle].append([int(i) for i in joueurs_regle])
+            st.rerun()
+
+    for type_r, groupes_r in contraintes.items():
+        for k, groupe in enumerate(groupes_r):
+            col_txt, col_btn = st.columns([5, 1])
+            col_txt.write(f"**{TYPES_REGLES[type_r]}** : {', '.join(noms_presents.get(i, f'#{i}') for i in groupe)}")
+            if col_btn.button("🗑️", key=f"suppr_{type_r}_{k}"):
+                groupes_r.pop(k)
+                st.rerun()
+
+    forces_att = st.multiselect("Toujours en attaque", list(noms_presents), format_func=noms_presents.get)
+    forces_def = st.multiselect("Toujours en défense", list(noms_presents), format_func=noms_presents.get)
+    budget = st.slider("Temps de recherche maximal (secondes)", 0.5, 10.0, BUDGET_S, 0.5)
+
+postes_forces = {**{int(i): "Attaquant" for i in forces_att}, **{int(i): "Défenseur" for i in forces_def}}
+avec_contraintes = any(contraintes.values()) or postes_forces
 
 # --- GÉNÉRATION DES ÉQUIPES ---
 if st.button("🎯 Générer les équipes équilibrées"):
-    st.session_state["teams"] = generate_teams(players_present)
-
-teams = st.session_state.get("teams")
+    if avec_contraintes:
+        try:
+            resultat = generer_equipes_contraintes(
+                players_present, postes=postes_forces, budget_s=budget, **contraintes
+            )
+            st.session_state["teams"] = [EquipeCompacte.depuis_equipe(eq) for eq in resultat]
+            st.session_state["rejeu"] = None
+        except ValueError as e:
+            st.error(f"❌ {e}")
+    else:
+        teams = generate_teams(players_present)
+        st.session_state["teams"] = compacter_match(teams) if teams else None
+        # graine + groupe archivé : l'historique pourra régénérer cette formation
+        st.session_state["rejeu"] = (teams["graine"], archiver_roster(players_present)) if teams else None
+
+# La session ne garde que les ids ; les DataFrames sont reconstruits à chaque affichage
+equipes_compactes = st.session_state.get("teams")
 
 # --- AFFICHAGE AVEC PROTECTION ---
-if not teams:
+if not equipes_compactes:
     st.warning("Aucune équipe n’a encore été générée.")
-elif not all(k in teams for k in ["equipeB_trios", "equipeN_trios", "equipeB_duos", "equipeN_duos"]):
+elif not all(isinstance(eq, EquipeCompacte) for eq in equipes_compactes):
     st.error("⚠️ Erreur de génération : certaines données d’équipes sont manquantes.")
     st.info("Cliquez sur **🎯 Générer les équipes équilibrées** pour relancer la création.")
 else:
+    teams = deplier_match(equipes_compactes, roster_par_id())
+
     # --- ÉQUIPE BLANCHE ---
     st.subheader(f"⚪ BLANCS — {teams['nbB']} joueurs")
     for i, trio in enumerate(teams["equipeB_trios"], 1):
@@ -141,18 +133,69 @@ else:
             st.write(f"**Duo {i} ({moy}) :** {', '.join(duo['nom'])}")
     st.write(f"### Moyenne totale : {teams['moyN']}")
 
+    # --- Suggestions d'échanges ---
+    st.subheader("💡 Suggestions d’échanges")
+    groupes = teams["equipeB_trios"] + teams["equipeB_duos"] + teams["equipeN_trios"] + teams["equipeN_duos"]
+    talents = talents_des_groupes(groupes)
+    equipes_ids = [eq.vers_ids() for eq in equipes_compactes]
+    suggestions = meilleurs_echanges(equipes_ids, talents, n=3)
+    if not suggestions:
+        st.caption("Aucun échange ne réduit l’écart entre les équipes.")
+    joueurs_equipes = pd.concat([g for g in groupes if not g.empty])
+    id_vers_nom = dict(zip(joueurs_equipes["id"], joueurs_equipes["nom"]))
+    couleurs = ["BLANCS", "NOIRS"]
+    for k, ech in enumerate(suggestions):
+        st.write(
+            f"**{ech['type']}** : {', '.join(id_vers_nom[i] for i in ech['sortants'])} "
+            f"({couleurs[ech['equipe_1']]}) ⇄ {', '.join(id_vers_nom[i] for i in ech['entrants'])} "
+            f"({couleurs[ech['equipe_2']]}) — écart {ech['ecart_avant']} → {ech['ecart_apres']}"
+        )
+        if st.button("✅ Appliquer cet échange", key=f"echange_{k}"):
+            nouv = appliquer_echange(equipes_ids, ech)
+            moyennes = moyennes_equipes(nouv, talents)
+            st.session_state["teams"] = [
+                EquipeCompacte(eq["trios"], eq["duos"], round(moy, 2)) for eq, moy in zip(nouv, moyennes)
+            ]
+            st.session_state["rejeu"] = None  # formation retouchée : plus rejouable depuis la graine
+            st.rerun()
+
     # --- Enregistrement dans l'historique ---
     if st.button("💾 Enregistrer dans l’historique"):
         equipeB = [p for t in (teams["equipeB_trios"] + teams["equipeB_duos"]) for p in t["nom"].tolist()]
         equipeN = [p for t in (teams["equipeN_trios"] + teams["equipeN_duos"]) for p in t["nom"].tolist()]
+        graine, version_roster = st.session_state.get("rejeu") or (None, None)
         save_history(
             equipeB, equipeN, teams["moyB"], teams["moyN"],
             date_match.strftime("%Y-%m-%d"),
             triosB=teams["equipeB_trios"], duosB=teams["equipeB_duos"],
-            triosN=teams["equipeN_trios"], duosN=teams["equipeN_duos"]
+            triosN=teams["equipeN_trios"], duosN=teams["equipeN_duos"],
+            graine=graine, version_roster=version_roster,
         )
         st.success("✅ Équipes enregistrées dans l’historique.")
 
+    # --- Rotation des présences ---
+    st.divider()
+    st.subheader("⏱️ Rotation des présences")
+    equipes_rotation = [
+        {"trios": teams["equipeB_trios"], "duos": teams["equipeB_duos"]},
+        {"trios": teams["equipeN_trios"], "duos": teams["equipeN_duos"]},
+    ]
+    col1, col2, col3 = st.columns(3)
+    duree_match = col1.number_input("Durée du match (minutes)", min_value=5, max_value=120, value=60, step=5)
+    duree_presence = col2.number_input("Durée d'une présence (secondes)", min_value=30, max_value=300,
+                                       value=DUREE_PRESENCE_S, step=15)
+    appariement = col3.checkbox("Apparier les lignes par talent", value=True,
+                                help="Les lignes des NOIRS affrontent des lignes de talent semblable chez les BLANCS.")
+    planB, planN = planifier_match(*equipes_rotation, duree_match, duree_presence, appariement)
+    colonnes_plan = ["Présence", "Début", "Fin", "Trio", "Attaquants", "Duo", "Défenseurs"]
+    with st.expander(f"⚪ BLANCS — {len(planB)} présences"):
+        st.dataframe(planB[colonnes_plan], hide_index=True, use_container_width=True)
+        st.caption(" · ".join(f"{ligne} : {m} min" for ligne, m in temps_de_glace(planB).items()))
+    with st.expander(f"⚫ NOIRS — {len(planN)} présences"):
+        st.dataframe(planN[colonnes_plan], hide_index=True, use_container_width=True)
+        st.caption(" · ".join(f"{ligne} : {m} min" for ligne, m in temps_de_glace(planN).items()))
+    inclure_rotation = st.checkbox("Inclure la rotation dans le PDF", value=False)
+
     # --- PDF ---
     st.divider()
     st.subheader("📄 Télécharger les équipes en PDF")
@@ -183,6 +226,12 @@ else:
             pdf.drawString(60, y, f"Duo {i}: {', '.join(duo['nom'])}")
             y -= 15
 
+        if inclure_rotation:
+            pdf.showPage()
+            dessiner_rotation(pdf, planB, f"⚪ BLANCS — rotation ({duree_match} min, présences de {duree_presence} s)")
+            pdf.showPage()
+            dessiner_rotation(pdf, planN, f"⚫ NOIRS — rotation ({duree_match} min, présences de {duree_presence} s)")
+
         pdf.save()
         buffer.seek(0)
         st.download_button(
@@ -197,6 +246,6 @@ st.divider()
 st.subheader("🏆 Mode tournoi")
 st.markdown("Vous pouvez aussi créer un tournoi avec les joueurs présents actuels.")
 if st.button("➡️ Créer un tournoi à partir des joueurs présents"):
-    st.session_state["joueurs_pour_tournoi"] = players_present
+    st.session_state["joueurs_pour_tournoi"] = [int(i) for i in players_present["id"]]
     st.success("✅ Joueurs copiés vers le mode tournoi.")
     st.info("Allez maintenant dans la page **Configuration → Onglet Tournoi** pour lancer la création du tournoi.")
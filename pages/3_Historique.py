@@ -1,53 +1,159 @@
 import streamlit as st
+from ligues_utils import ligue_de_session
 import pandas as pd
 import os
+from utils import index_joueurs, texte_vers_ids
+from historique_utils import (
+    requete_historique, exporter_historique, saisons_historique, COLONNES_RESUME,
+    lire_match, supprimer_saison, supprimer_historique,
+)
+from rejeu_utils import est_rejouable, rejouer_match, verifier_match
+from versions_utils import avec_version
 
 st.title("📜 Historique des matchs")
+ligue = ligue_de_session()
 
-path = "data/historique.csv"
-
-if not os.path.exists(path):
+comptes_saisons = saisons_historique()
+if comptes_saisons.empty:
     st.warning("Aucun match enregistré pour le moment.")
     st.stop()
 
-# Charger l’historique
-hist = pd.read_csv(path)
+# --- Filtres ---
+choix_saison = st.selectbox("🏒 Choisir la saison :", ["Toutes"] + comptes_saisons.index.tolist())
+if choix_saison != "Toutes":
+    st.info(f"📅 Saison sélectionnée : **{choix_saison}** — {comptes_saisons[choix_saison]} matchs trouvés.")
+
+id_vers_nom = index_joueurs().id_vers_nom
+col1, col2, col3 = st.columns([2, 2, 1])
+with col1:
+    choix_joueur = st.selectbox(
+        "👤 Joueur :", [None] + sorted(id_vers_nom, key=lambda i: id_vers_nom[i]),
+        format_func=lambda i: "Tous" if i is None else id_vers_nom[i],
+    )
+with col2:
+    periode = st.date_input("📆 Période :", value=[], format="YYYY-MM-DD")
+with col3:
+    taille_page = st.selectbox("Par page :", [25, 50, 100], index=1)
+
+filtres = {
+    "saison": None if choix_saison == "Toutes" else choix_saison,
+    "joueur": choix_joueur,
+    "date_debut": periode[0] if len(periode) > 0 else None,
+    "date_fin": periode[1] if len(periode) > 1 else None,
+}
 
-# --- Filtre de saison ---
-if "Saison" in hist.columns:
-    saisons = sorted(hist["Saison"].dropna().unique(), reverse=True)
-    choix_saison = st.selectbox("🏒 Choisir la saison :", ["Toutes"] + saisons)
-    if choix_saison != "Toutes":
-        hist = hist[hist["Saison"] == choix_saison]
-        st.info(f"📅 Saison sélectionnée : **{choix_saison}** — {len(hist)} matchs trouvés.")
-else:
-    choix_saison = "Toutes"
+# --- Pagination par curseur ---
+# Pile des curseurs des pages déjà vues ; remise à zéro quand les filtres changent.
+cle_filtres = (tuple(sorted((k, str(v)) for k, v in filtres.items())), taille_page)
+if st.session_state.get("hist_filtres") != cle_filtres:
+    st.session_state["hist_filtres"] = cle_filtres
+    st.session_state["hist_curseurs"] = [None]
+
+curseurs = st.session_state["hist_curseurs"]
+try:
+    page = requete_historique(curseur=curseurs[-1], limite=taille_page, **filtres)
+except ValueError as e:
+    st.warning(f"⚠️ {e}")
+    st.session_state["hist_curseurs"] = [None]
+    page = requete_historique(limite=taille_page, **filtres)
+    curseurs = st.session_state["hist_curseurs"]
+hist = page.matchs
 
 if hist.empty:
-    st.warning("Aucun match trouvé pour cette saison.")
+    st.warning("Aucun match trouvé pour ces filtres.")
     st.stop()
 
 # --- Affichage résumé ---
 st.subheader("📅 Liste des matchs enregistrés")
 st.dataframe(
-    hist[["Date", "Saison", "Moyenne_BLANCS", "Moyenne_NOIRS", "Équipe_BLANCS", "Équipe_NOIRS"]],
+    hist[[c for c in COLONNES_RESUME if c in hist.columns]],
     use_container_width=True
 )
 
+def page_precedente():
+    st.session_state["hist_curseurs"].pop()
+
+def page_suivante(curseur):
+    st.session_state["hist_curseurs"].append(curseur)
+
+col_prec, col_num, col_suiv = st.columns([1, 2, 1])
+with col_prec:
+    st.button("⬅️ Précédent", disabled=len(curseurs) == 1, on_click=page_precedente)
+with col_num:
+    st.caption(f"Page {len(curseurs)}")
+with col_suiv:
+    st.button("Suivant ➡️", disabled=page.curseur_suivant is None,
+              on_click=page_suivante, args=(page.curseur_suivant,))
+
+# --- Export ---
+# Générés au clic, bloc par bloc, à partir des mêmes filtres
+col_json, col_csv = st.columns(2)
+with col_json:
+    st.download_button(
+        "📥 Exporter (NDJSON)", lambda: "".join(exporter_historique("ndjson", **filtres)),
+        file_name="historique.ndjson", mime="application/x-ndjson",
+    )
+with col_csv:
+    st.download_button(
+        "📥 Exporter (CSV)", lambda: "".join(exporter_historique("csv", **filtres)),
+        file_name="historique.csv", mime="text/csv",
+    )
+
 # --- Détails d’un match ---
 st.divider()
 st.subheader("🔍 Détails d’un match")
 
-match_list = hist["Date"].astype(str).tolist()
-selection = st.selectbox("Choisir une date de match :", [""] + match_list)
+# Plusieurs matchs peuvent avoir la même date : on choisit par ID_Match
+libelles = dict(zip(hist["ID_Match"], hist["Date"].astype(str) + " (" + hist["Saison"].astype(str) + ")"))
+selection = st.selectbox(
+    "Choisir un match (page affichée) :", [None] + list(libelles),
+    format_func=lambda i: "" if i is None else f"{libelles[i]} · #{i}",
+)
 
-if selection:
-    match = hist[hist["Date"].astype(str) == selection].iloc[0]
+if selection is not None:
+    match = lire_match(selection)
     st.markdown(f"### 🏒 Match du **{match['Date']}** ({match['Saison']})")
+
+    def noms_equipe(couleur):
+        # Noms actuels via les ids (un joueur renommé garde son historique)
+        ids = texte_vers_ids(match.get(f"Ids_{couleur}"))
+        if ids:
+            return ", ".join(id_vers_nom.get(i, f"#{i}") for i in ids)
+        return match[f"Équipe_{couleur}"]
+
     st.write(f"⚪ **BLANCS (moyenne {match['Moyenne_BLANCS']})**")
-    st.write(match["Équipe_BLANCS"])
+    st.write(noms_equipe("BLANCS"))
     st.write(f"⚫ **NOIRS (moyenne {match['Moyenne_NOIRS']})**")
-    st.write(match["Équipe_NOIRS"])
+    st.write(noms_equipe("NOIRS"))
+
+    # --- Trios et duos : enregistrés en texte, ou régénérés depuis la graine ---
+    if est_rejouable(match):
+        st.caption(f"🎲 Graine {int(match['Seed'])} · groupe {match['Version_roster']} · algorithme v{int(match['Version_algo'])}")
+        col_rejeu, col_verif = st.columns(2)
+        if col_rejeu.button("🔁 Régénérer les trios et duos"):
+            try:
+                teams = rejouer_match(match)
+                for c, couleur in [("B", "⚪ BLANCS"), ("N", "⚫ NOIRS")]:
+                    st.write(f"**{couleur}**")
+                    for i, trio in enumerate(teams[f"equipe{c}_trios"], 1):
+                        st.write(f"Trio {i} : {', '.join(trio['nom'])}")
+                    for i, duo in enumerate(teams[f"equipe{c}_duos"], 1):
+                        st.write(f"Duo {i} : {', '.join(duo['nom'])}")
+            except ValueError as e:
+                st.error(f"⚠️ {e}")
+        if col_verif.button("✅ Vérifier le rejeu"):
+            try:
+                ecarts = verifier_match(match)
+                if ecarts:
+                    st.error("❌ Le rejeu ne correspond pas à l’enregistrement : " + " ; ".join(ecarts))
+                else:
+                    st.success("✅ Le rejeu redonne exactement les équipes enregistrées.")
+            except ValueError as e:
+                st.error(f"⚠️ {e}")
+    else:
+        for colonne in ["Trios_BLANCS", "Duos_BLANCS", "Trios_NOIRS", "Duos_NOIRS"]:
+            if isinstance(match.get(colonne), str) and match[colonne]:
+                st.write(f"**{colonne.replace('_', ' ')}** : {match[colonne]}")
 
 # --- Suppression sécurisée ---
 st.divider()
@@ -71,14 +177,14 @@ if choix_action != "Rien":
     if confirmation == "Oui, supprimer définitivement":
         try:
             if choix_action == "Tout l’historique":
-                os.remove(path)
-                st.success("✅ Historique complet supprimé avec succès.")
+                with avec_version("historique", "Suppression de tout l’historique"):
+                    supprimer_historique()
+                st.success("✅ Historique complet supprimé avec succès. (Récupérable depuis la page Versions.)")
                 st.stop()
             elif choix_action == "Seulement la saison sélectionnée" and choix_saison != "Toutes":
-                hist = pd.read_csv(path)
-                hist = hist[hist["Saison"] != choix_saison]
-                hist.to_csv(path, index=False)
-                st.success(f"✅ Saison **{choix_saison}** supprimée avec succès.")
+                with avec_version("historique", f"Suppression de la saison {choix_saison}"):
+                    supprimer_saison(choix_saison)
+                st.success(f"✅ Saison **{choix_saison}** supprimée avec succès. (Récupérable depuis la page Versions.)")
                 st.stop()
             else:
                 st.warning("⚠️ Aucune saison sélectionnée à supprimer.")
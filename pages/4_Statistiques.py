@@ -1,68 +1,58 @@
 import streamlit as st
+from ligues_utils import ligue_de_session
 import pandas as pd
 import os
+from utils import load_players, stats_depuis_comptes
+from historique_utils import saisons_historique, resume_historique
+from graphiques_utils import graphique_talents, graphique_matchs_par_joueur, graphique_ecart
 
 st.title("📊 Statistiques des joueurs")
+ligue = ligue_de_session()
 
-path = "data/historique.csv"
-players_path = "data/joueurs.csv"
-
-if not os.path.exists(path):
+comptes_saisons = saisons_historique()
+if comptes_saisons.empty:
     st.warning("Aucun historique trouvé pour le moment.")
     st.stop()
 
-# Charger les données
-hist = pd.read_csv(path)
-players = pd.read_csv(players_path) if os.path.exists(players_path) else pd.DataFrame()
+players = load_players()
 
 # --- Sélecteur de saison ---
-if "Saison" in hist.columns:
-    saisons = sorted(hist["Saison"].dropna().unique(), reverse=True)
-    choix_saison = st.selectbox("🏒 Choisir la saison :", ["Toutes"] + saisons)
-    if choix_saison != "Toutes":
-        hist = hist[hist["Saison"] == choix_saison]
-        st.info(f"📅 Saison sélectionnée : **{choix_saison}** — {len(hist)} matchs trouvés.")
-else:
-    st.warning("⚠️ Aucune colonne 'Saison' trouvée dans l'historique.")
-    choix_saison = "Toutes"
+choix_saison = st.selectbox("🏒 Choisir la saison :", ["Toutes"] + comptes_saisons.index.tolist())
+if choix_saison != "Toutes":
+    st.info(f"📅 Saison sélectionnée : **{choix_saison}** — {comptes_saisons[choix_saison]} matchs trouvés.")
 
-if hist.empty:
+# Tout vient des résumés par saison du manifeste : aucune ligne de match n'est relue
+resume = resume_historique(None if choix_saison == "Toutes" else [choix_saison])
+if resume.nb_matchs == 0:
     st.warning("Aucune donnée pour la saison sélectionnée.")
     st.stop()
 
 # --- Calcul du nombre de matchs par joueur ---
-joueurs_stats = {}
-
-def ajouter_presence(equipe):
-    if isinstance(equipe, str):
-        for nom in [x.strip() for x in equipe.split(",") if x.strip()]:
-            joueurs_stats[nom] = joueurs_stats.get(nom, 0) + 1
-
-for _, row in hist.iterrows():
-    ajouter_presence(row["Équipe_BLANCS"])
-    ajouter_presence(row["Équipe_NOIRS"])
-
-stats_df = pd.DataFrame(
-    [{"Joueur": j, "Matchs joués": c} for j, c in joueurs_stats.items()]
-).sort_values(by="Matchs joués", ascending=False)
-
-# --- Fusion avec les talents si disponibles ---
-if not players.empty:
-    stats_df = stats_df.merge(players[["nom", "talent_attaque", "talent_defense"]],
-                              left_on="Joueur", right_on="nom", how="left")
-    stats_df.drop(columns=["nom"], inplace=True)
+stats_df = stats_depuis_comptes(resume.matchs_par_joueur, players)
 
 # --- Affichage ---
 st.subheader("📋 Statistiques individuelles")
 st.dataframe(stats_df, use_container_width=True)
 
+# --- Graphiques (images en cache par saison et version des données) ---
+saisons_choisies = None if choix_saison == "Toutes" else [choix_saison]
+st.divider()
+st.subheader("📊 Graphiques")
+onglet_joueurs, onglet_talents, onglet_ecart = st.tabs(["Matchs par joueur", "Talents des présents", "Écart BLANCS / NOIRS"])
+with onglet_joueurs:
+    st.image(graphique_matchs_par_joueur(saisons_choisies))
+with onglet_talents:
+    st.image(graphique_talents())
+with onglet_ecart:
+    st.image(graphique_ecart(saisons_choisies))
+
 # --- Résumé global ---
 st.divider()
 st.subheader("📈 Résumé global de la saison")
 
-nb_matchs = hist["Date"].nunique()
-moy_B = hist["Moyenne_BLANCS"].mean()
-moy_N = hist["Moyenne_NOIRS"].mean()
+nb_matchs = resume.nb_dates
+moy_B = resume.moyenne_blancs
+moy_N = resume.moyenne_noirs
 
 col1, col2, col3 = st.columns(3)
 col1.metric("Matchs joués", nb_matchs)
@@ -1,95 +1,93 @@
 import streamlit as st
+from ligues_utils import ligue_de_session, dossier_ligue
 import pandas as pd
 import os
-import random
-import itertools
-import json
-from datetime import datetime, timedelta, time
-from utils import load_players
+from datetime import datetime, time
+from utils import load_players, index_joueurs, roster_par_id
+from presences_utils import prechauffer_formation
+from formation_utils import (
+    generer_equipes_tournoi, NOMS_EQUIPES_TOURNOI, meilleurs_echanges, appliquer_echange, moyennes_equipes,
+    talents_des_groupes, EquipeCompacte, nouvelle_graine,
+)
+from tournoi_utils import generer_matchs_equilibres
+from flux_utils import creer_tournoi
+from rotation_utils import planifier_presences, dessiner_rotation, DUREE_PRESENCE_S
+from recherche_parallele import recherche_parallele
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
 import io
 
 st.title("🏒 Génération du tournoi (4 équipes fixes)")
+ligue = ligue_de_session()
 
-DATA_DIR = "data"
-BRACKET_FILE = os.path.join(DATA_DIR, "tournoi_bracket.csv")
-INFO_FILE = os.path.join(DATA_DIR, "tournoi_info.json")
+DATA_DIR = dossier_ligue()
 os.makedirs(DATA_DIR, exist_ok=True)
 
 # --- Charger les joueurs présents ---
-def charger_joueurs():
+# La session ne garde que des ids ; les lignes viennent du roster en cache partagé
+def ids_presents():
     players = load_players()
-    return players[players["present"] == True].reset_index(drop=True)
+    return [int(i) for i in players.loc[players["present"] == True, "id"]]
 
 if st.button("🔄 Recharger les joueurs présents"):
-    st.session_state["players_present"] = charger_joueurs()
+    st.session_state["players_present"] = ids_presents()
     st.success("✅ Liste des joueurs mise à jour !")
 
-players_present = st.session_state.get("players_present", charger_joueurs())
+ids_tournoi = (
+    st.session_state.get("players_present")
+    or st.session_state.get("joueurs_pour_tournoi")
+    or ids_presents()
+)
+roster = roster_par_id()
+players_present = roster.loc[[i for i in ids_tournoi if i in roster.index]].reset_index(drop=True)
 st.info(f"✅ {len(players_present)} joueurs présents sélectionnés")
 if len(players_present) < 10:
     st.warning("⚠️ Peu de joueurs présents — la formation sera approximative.")
+if players_present.empty:
+    prechauffer_formation()
 
 # --- Sélection de la date du tournoi ---
 st.subheader("📅 Date du tournoi")
 date_tournoi = st.date_input("Choisir la date du tournoi :", datetime.now().date())
 
-# --- Snake draft équilibré ---
-def snake_draft(df, nb_groupes, colonne):
-    if df.empty:
-        return [pd.DataFrame() for _ in range(nb_groupes)]
-    df = df.sample(frac=1).sort_values(colonne, ascending=False).reset_index(drop=True)
-    groupes = [[] for _ in range(nb_groupes)]
-    sens, idx = 1, 0
-    for _, joueur in df.iterrows():
-        groupes[idx].append(joueur)
-        idx += sens
-        if idx == nb_groupes:
-            sens, idx = -1, nb_groupes - 1
-        elif idx < 0:
-            sens, idx = 1, 0
-    return [pd.DataFrame(g) for g in groupes]
-
-# --- Génération des équipes équilibrées ---
-def generer_equipes_tournoi(players_present):
-    players_present = players_present.copy()
-    players_present["poste"] = players_present.apply(
-        lambda x: "Attaquant" if x["talent_attaque"] >= x["talent_defense"] else "Défenseur",
-        axis=1
-    )
-
-    attaquants = players_present[players_present["poste"] == "Attaquant"]
-    defenseeurs = players_present[players_present["poste"] == "Défenseur"]
-
-    trios = snake_draft(attaquants, 8, "talent_attaque")
-    duos = snake_draft(defenseeurs, 8, "talent_defense")
-    random.shuffle(trios)
-    random.shuffle(duos)
-
-    equipes = {
-        "BLANCS ⚪": {"trios": trios[0:2], "duos": duos[0:2]},
-        "NOIRS ⚫": {"trios": trios[2:4], "duos": duos[2:4]},
-        "ROUGES 🔴": {"trios": trios[4:6], "duos": duos[4:6]},
-        "VERTS 🟢": {"trios": trios[6:8], "duos": duos[6:8]},
-    }
-
-    for nom, eq in equipes.items():
-        moy_trios = [t["talent_attaque"].mean() for t in eq["trios"] if not t.empty]
-        moy_duos = [d["talent_defense"].mean() for d in eq["duos"] if not d.empty]
-        eq["moyenne"] = round(sum(moy_trios + moy_duos) / len(moy_trios + moy_duos), 2)
-    return equipes
-
 # --- Générer les équipes ---
+recherche_approfondie = st.checkbox(
+    "🔬 Recherche approfondie",
+    help="Part de la formation habituelle, évalue des centaines de milliers d'autres formations "
+         "et garde la plus équilibrée.",
+)
+if recherche_approfondie:
+    budget = st.slider("Temps de recherche (secondes)", 1, 20, 3)
+    # un seul processus par défaut : le serveur est partagé avec les autres sessions
+    nb_coeurs = os.cpu_count() or 1
+    nb_processus = st.slider("Processus", 1, nb_coeurs, 1) if nb_coeurs > 1 else 1
+
 if st.button("🎯 Générer les équipes du tournoi"):
-    st.session_state["tournoi_equipes"] = generer_equipes_tournoi(players_present)
+    # une seule graine pour les équipes et l'ordre des matchs : le tournoi se rejoue en entier
+    graine = nouvelle_graine()
+    st.session_state["tournoi_graine"] = graine
+    if recherche_approfondie:
+        resultat, infos = recherche_parallele(
+            players_present, nb_equipes=len(NOMS_EQUIPES_TOURNOI), budget_s=budget, nb_workers=nb_processus,
+            seed=graine,
+        )
+        st.session_state["tournoi_equipes"] = {
+            nom: EquipeCompacte.depuis_equipe(eq) for nom, eq in zip(NOMS_EQUIPES_TOURNOI, resultat)
+        }
+        st.caption(f"{infos['evalues']:,} formations évaluées sur {infos['nb_workers']} processus — écart {infos['ecart']}")
+    else:
+        st.session_state["tournoi_equipes"] = {
+            nom: EquipeCompacte.depuis_equipe(eq)
+            for nom, eq in generer_equipes_tournoi(players_present, graine=graine).items()
+        }
     st.session_state["capitaines"] = {}
     st.success("✅ Équipes du tournoi générées !")
 
-equipes = st.session_state.get("tournoi_equipes")
+equipes_compactes = st.session_state.get("tournoi_equipes")
 capitaines = st.session_state.get("capitaines", {})
 
-if equipes:
+if equipes_compactes:
+    equipes = {nom: eq.deplier(roster) for nom, eq in equipes_compactes.items()}
     st.subheader("📋 Composition des équipes et choix des capitaines")
     for nom, eq in equipes.items():
         st.markdown(f"### {nom} — Moyenne : **{eq['moyenne']}**")
@@ -98,22 +96,55 @@ if equipes:
             if not trio.empty:
                 noms = trio["nom"].tolist()
                 st.write(f"**Trio {i} ({round(trio['talent_attaque'].mean(),2)}) :** {', '.join(noms)}")
-                eq_joueurs += noms
+                eq_joueurs += trio["id"].tolist()
         for i, duo in enumerate(eq["duos"], 1):
             if not duo.empty:
                 noms = duo["nom"].tolist()
                 st.write(f"**Duo {i} ({round(duo['talent_defense'].mean(),2)}) :** {', '.join(noms)}")
-                eq_joueurs += noms
-
-        capitaine = st.selectbox(f"👑 Choisir le capitaine pour {nom}", eq_joueurs, key=f"cap_{nom}")
+                eq_joueurs += duo["id"].tolist()
+        eq["ids"] = [int(i) for i in eq_joueurs]
+
+        id_vers_nom = index_joueurs().id_vers_nom
+        capitaine = st.selectbox(
+            f"👑 Choisir le capitaine pour {nom}", eq["ids"],
+            format_func=lambda i: id_vers_nom.get(i, f"#{i}"), key=f"cap_{nom}"
+        )
         capitaines[nom] = capitaine
-        st.markdown(f"🧢 **Capitaine choisi : {capitaine}**")
+        st.markdown(f"🧢 **Capitaine choisi : {id_vers_nom.get(capitaine, capitaine)}**")
         st.divider()
 
     st.session_state["capitaines"] = capitaines
 
+    # --- Suggestions d'échanges ---
+    st.subheader("💡 Suggestions d’échanges")
+    noms_equipes = list(equipes.keys())
+    groupes = [g for eq in equipes.values() for g in eq["trios"] + eq["duos"]]
+    talents = talents_des_groupes(groupes)
+    equipes_ids = [eq.vers_ids() for eq in equipes_compactes.values()]
+    suggestions = meilleurs_echanges(equipes_ids, talents, n=3)
+    if not suggestions:
+        st.caption("Aucun échange ne réduit l’écart entre les équipes.")
+    joueurs_equipes = pd.concat([g for g in groupes if not g.empty])
+    noms_joueurs = dict(zip(joueurs_equipes["id"], joueurs_equipes["nom"]))
+    for k, ech in enumerate(suggestions):
+        st.write(
+            f"**{ech['type']}** : {', '.join(noms_joueurs[i] for i in ech['sortants'])} "
+            f"({noms_equipes[ech['equipe_1']]}) ⇄ {', '.join(noms_joueurs[i] for i in ech['entrants'])} "
+            f"({noms_equipes[ech['equipe_2']]}) — écart {ech['ecart_avant']} → {ech['ecart_apres']}"
+        )
+        if st.button("✅ Appliquer cet échange", key=f"echange_{k}"):
+            nouv = appliquer_echange(equipes_ids, ech)
+            moyennes = moyennes_equipes(nouv, talents)
+            st.session_state["tournoi_equipes"] = {
+                nom: EquipeCompacte(eq_ids["trios"], eq_ids["duos"], round(moy, 2))
+                for nom, eq_ids, moy in zip(noms_equipes, nouv, moyennes)
+            }
+            st.rerun()
+
     # --- Paramètres de temps ---
     st.subheader("⏱️ Paramètres de l’horaire")
+    FORMATS = {"ronde": "Ronde complète + demi-finales (1er vs 4e, 2e vs 3e)", "elimination": "Élimination directe"}
+    format_tournoi = st.radio("Format", list(FORMATS), format_func=FORMATS.get, horizontal=True)
     start_time = st.time_input("Heure de début du premier match", time(18, 0))
     match_duration = st.number_input("Durée d’un match de ronde (minutes)", 10, 120, 25, 5)
     demi_duration = st.number_input("Durée d’une demi-finale (minutes)", 10, 120, 30, 5)
@@ -121,100 +152,51 @@ if equipes:
     pause = st.number_input("Pause entre les matchs (minutes)", 0, 60, 5, 5)
     zamboni_pause = st.number_input("Durée de la pause Zamboni (minutes)", 5, 30, 10, 5)
 
-    # --- Générer le tournoi ---
-    def generer_matchs_equilibres(equipes):
-        noms = list(equipes.keys())
-        matchs_possibles = list(itertools.combinations(noms, 2))
-        random.shuffle(matchs_possibles)
-
-        matchs = pd.DataFrame(matchs_possibles, columns=["Équipe A", "Équipe B"])
-        matchs["Phase"] = "Ronde"
-
-        heure = datetime.combine(datetime.today(), start_time)
-        rows = []
-        match_counter = 0
-
-        # --- Matchs de ronde ---
-        for _, row in matchs.iterrows():
-            rows.append({
-                "Heure": heure.strftime("%H:%M"),
-                "Équipe A": row["Équipe A"],
-                "Équipe B": row["Équipe B"],
-                "Durée (min)": match_duration,
-                "Phase": "Ronde",
-                "Type": "Match"
-            })
-            heure += timedelta(minutes=match_duration + pause)
-            match_counter += 1
-            if match_counter % 3 == 0:
-                rows.append({
-                    "Heure": heure.strftime("%H:%M"),
-                    "Équipe A": "🧊 Pause Zamboni",
-                    "Équipe B": "",
-                    "Durée (min)": zamboni_pause,
-                    "Phase": "",
-                    "Type": "Pause"
-                })
-                heure += timedelta(minutes=zamboni_pause)
-
-        # --- Demi-finales ---
-        for j in range(2):
-            rows.append({
-                "Heure": heure.strftime("%H:%M"),
-                "Équipe A": f"Demi-finale {j+1} - {'1er vs 4e' if j == 0 else '2e vs 3e'}",
-                "Équipe B": "",
-                "Durée (min)": demi_duration,
-                "Phase": "Demi-finale",
-                "Type": "Match"
-            })
-            heure += timedelta(minutes=demi_duration + pause)
-            match_counter += 1
-            if match_counter % 3 == 0:
-                rows.append({
-                    "Heure": heure.strftime("%H:%M"),
-                    "Équipe A": "🧊 Pause Zamboni",
-                    "Équipe B": "",
-                    "Durée (min)": zamboni_pause,
-                    "Phase": "",
-                    "Type": "Pause"
-                })
-                heure += timedelta(minutes=zamboni_pause)
-
-        # --- Pause avant la finale ---
-        rows.append({
-            "Heure": heure.strftime("%H:%M"),
-            "Équipe A": "🧊 Pause Zamboni (avant la finale)",
-            "Équipe B": "",
-            "Durée (min)": zamboni_pause,
-            "Phase": "",
-            "Type": "Pause"
-        })
-        heure += timedelta(minutes=zamboni_pause)
-
-        # --- Finale ---
-        rows.append({
-            "Heure": heure.strftime("%H:%M"),
-            "Équipe A": "🏆 Finale - Gagnants demi-finales",
-            "Équipe B": "",
-            "Durée (min)": finale_duration,
-            "Phase": "Finale",
-            "Type": "Match"
-        })
-
-        return pd.DataFrame(rows)
+    # --- Rotation des présences (un match de ronde par équipe) ---
+    with st.expander("⏱️ Rotation des présences"):
+        duree_presence = st.number_input("Durée d'une présence (secondes)", 30, 300, DUREE_PRESENCE_S, 15)
+        plans = {nom: planifier_presences(eq, match_duration, duree_presence) for nom, eq in equipes.items()}
+        for nom, plan in plans.items():
+            st.markdown(f"**{nom}**")
+            st.dataframe(plan[["Présence", "Début", "Fin", "Trio", "Duo"]], hide_index=True, use_container_width=True)
+
+        def pdf_rotations():
+            buffer = io.BytesIO()
+            pdf = canvas.Canvas(buffer, pagesize=letter)
+            for nom, plan in plans.items():
+                dessiner_rotation(pdf, plan, f"{nom} — rotation ({match_duration} min, présences de {duree_presence} s)")
+                pdf.showPage()
+            pdf.save()
+            return buffer.getvalue()
+
+        st.download_button(
+            "⬇️ Télécharger les rotations (PDF)", pdf_rotations,
+            file_name=f"Rotations_{date_tournoi}.pdf", mime="application/pdf",
+        )
 
     # --- Bouton principal ---
     if st.button("🏁 Créer le tournoi complet"):
-        matchs = generer_matchs_equilibres(equipes)
-        matchs.to_csv(BRACKET_FILE, index=False)
-
+        if format_tournoi == "elimination":
+            # têtes de série : la meilleure moyenne affronte la plus faible
+            equipes = dict(sorted(equipes.items(), key=lambda e: -equipes_compactes[e[0]].moyenne))
+        graine = st.session_state.get("tournoi_graine")
+        matchs = generer_matchs_equilibres(
+            equipes, start_time, match_duration, demi_duration,
+            finale_duration, pause, zamboni_pause, format=format_tournoi, jour=date_tournoi, graine=graine
+        )
+
+        id_vers_nom = index_joueurs().id_vers_nom
         info = {
             "date": date_tournoi.strftime("%Y-%m-%d"),
-            "capitaines": capitaines,
-            "equipes": list(equipes.keys())
+            "capitaines": {eq: id_vers_nom.get(c, "") for eq, c in capitaines.items()},
+            "capitaines_ids": {eq: int(c) for eq, c in capitaines.items() if c is not None},
+            "joueurs_ids": {nom: eq.ids for nom, eq in equipes_compactes.items()},
+            "moyennes": {nom: eq.moyenne for nom, eq in equipes_compactes.items()},
+            "equipes": list(equipes.keys()),
+            "graine": graine,
         }
-        with open(INFO_FILE, "w") as f:
-            json.dump(info, f)
+        # bracket et infos partent ensemble dans le journal (une seule écriture atomique)
+        creer_tournoi(matchs, info)
 
         st.success("✅ Tournoi complet créé et capitaines enregistrés !")
         st.balloons()
@@ -1,18 +1,16 @@
 import streamlit as st
+from ligues_utils import ligue_de_session
 import pandas as pd
-import os
-import json
 from datetime import datetime
 import matplotlib.pyplot as plt
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
-from reportlab.lib.units import inch
+from tournoi_utils import classement_from_results, recaler_horaire, FORMAT_DEBUT
+from bracket_utils import propager, recalculer_bracket, matchs_modifies, equipes_reelles, en_attente
+from utils import index_joueurs
+from flux_utils import publier, differences, etat_tournoi, pdf_horaire
+from simulation_utils import simuler_tournoi, NB_SIMULATIONS
 
 st.title("🏒 Tournoi en cours")
-
-DATA_DIR = "data"
-BRACKET_FILE = os.path.join(DATA_DIR, "tournoi_bracket.csv")
-INFO_FILE = os.path.join(DATA_DIR, "tournoi_info.json")
+ligue = ligue_de_session()
 
 # --- Dictionnaire français pour la date ---
 mois_fr = {
@@ -32,76 +30,68 @@ def format_date_fr(date_str):
     return f"{jour} {d.day} {mois} {d.year}"
 
 # --- Vérification du tournoi existant ---
-if not os.path.exists(BRACKET_FILE):
+# L'état est rejoué depuis le journal du tournoi (instantané + scores enregistrés)
+matchs_enregistres, info = etat_tournoi()
+if matchs_enregistres is None:
     st.warning("⚠️ Aucun tournoi n’a encore été généré. Allez dans 'Génération du tournoi'.")
     st.stop()
 
-matchs = pd.read_csv(BRACKET_FILE)
-with open(INFO_FILE, "r") as f:
-    info = json.load(f)
-
 date_tournoi = format_date_fr(info["date"])
-capitaines = info.get("capitaines", {})
+capitaines = dict(info.get("capitaines", {}))
+# Les ids priment : un capitaine renommé s'affiche sous son nom actuel
+id_vers_nom = index_joueurs().id_vers_nom
+for equipe, id_cap in info.get("capitaines_ids", {}).items():
+    capitaines[equipe] = id_vers_nom.get(id_cap, capitaines.get(equipe, ""))
 
 st.subheader(f"📅 Tournoi du {date_tournoi.capitalize()}")
 
-# --- Colonnes manquantes ---
-for col in ["Score A", "Score B", "Gagnant", "Prolongation"]:
-    if col not in matchs.columns:
-        if "Score" in col:
-            matchs[col] = 0
-        elif col == "Prolongation":
-            matchs[col] = False
-        else:
-            matchs[col] = ""
-
-# --- Fonction d'export PDF propre ---
-def export_pdf(matchs, date_tournoi):
-    filename = os.path.join(DATA_DIR, f"horaire_{date_tournoi.replace(' ', '_')}.pdf")
-    c = canvas.Canvas(filename, pagesize=letter)
-    width, height = letter
-
-    # Titre principal
-    c.setFont("Helvetica-Bold", 18)
-    c.drawCentredString(width / 2, height - inch, f"Horaire du tournoi - {date_tournoi.capitalize()}")
-
-    # Ligne décorative
-    c.setLineWidth(1)
-    c.line(inch, height - 1.1 * inch, width - inch, height - 1.1 * inch)
-
-    y = height - 1.5 * inch
-    c.setFont("Helvetica", 11)
-
-    for _, row in matchs.iterrows():
-        heure = "" if pd.isna(row["Heure"]) else str(row["Heure"]).strip()
-        phase = row["Phase"]
+matchs = matchs_enregistres.copy()
 
-        if row["Type"] == "Match":
-            ligne = f"{heure: <6} | {phase: <15} | {row['Équipe A']} vs {row['Équipe B']}  ({row['Durée (min)']} min)"
-        else:
-            texte_pause = str(row['Équipe A']).strip()
-            if texte_pause.lower() == "nan" or texte_pause == "":
-                texte_pause = "Pause"
-            ligne = f"{heure: <6} | {texte_pause} ({row['Durée (min)']} min)"
-
-        c.drawString(inch, y, ligne)
-        y -= 0.25 * inch
+def enregistrer(matchs):
+    # Seuls les matchs modifiés sont ajoutés au journal (lu aussi par le tableau des scores)
+    publier(differences(matchs_enregistres, matchs))
 
-        if y < inch:
-            c.showPage()
-            c.setFont("Helvetica", 11)
-            y = height - inch
+# Ancien tournoi (demi-finales en texte) ou journal incomplet : le bracket est remis en place
+if recalculer_bracket(matchs):
+    enregistrer(matchs)
+    matchs_enregistres = matchs.copy()
+reelles = equipes_reelles(matchs)
 
-    c.save()
-    return filename
-
-# --- Bouton d’export ---
+# --- Recalage de l'horaire (match en retard, longue prolongation...) ---
 st.divider()
-if st.button("📄 Exporter l’horaire en PDF"):
-    pdf_path = export_pdf(matchs, date_tournoi)
-    st.success("✅ Horaire exporté avec succès !")
-    with open(pdf_path, "rb") as f:
-        st.download_button("⬇️ Télécharger l’horaire", f, file_name=os.path.basename(pdf_path), mime="application/pdf")
+with st.expander("⏱️ Un match a commencé ou s’est terminé en retard"):
+    lignes = list(matchs.index)
+    a_venir = [i for i in lignes if matchs.at[i, "Type"] == "Match" and not str(matchs.at[i, "Gagnant"]).strip()]
+    ligne_recalee = st.selectbox(
+        "Match ou pause", lignes, index=lignes.index(a_venir[0]) if a_venir else 0,
+        format_func=lambda i: f"{matchs.at[i, 'Heure']} — {matchs.at[i, 'Équipe A']}"
+                              + (f" vs {matchs.at[i, 'Équipe B']}" if matchs.at[i, "Type"] == "Match" else ""),
+    )
+    heure_reelle = st.time_input("Heure réelle", datetime.now().time().replace(second=0, microsecond=0), step=60)
+    moment = datetime.combine(datetime.strptime(matchs.at[ligne_recalee, "Début"], FORMAT_DEBUT).date(), heure_reelle)
+    col_debut, col_fin = st.columns(2)
+    recalage = None
+    if col_debut.button("▶️ A commencé à cette heure"):
+        recalage = False
+    if col_fin.button("⏹️ S’est terminé à cette heure"):
+        recalage = True
+    if recalage is not None:
+        try:
+            decalees = recaler_horaire(matchs, ligne_recalee, moment, fin=recalage)
+        except ValueError as e:
+            st.error(f"❌ {e}")
+        else:
+            enregistrer(matchs)
+            matchs_enregistres = matchs.copy()
+            st.success(f"✅ Horaire recalé : {len(decalees)} ligne(s) mise(s) à jour.")
+
+# --- Horaire en PDF (refait seulement quand le journal change) ---
+st.download_button(
+    "📄 Télécharger l’horaire en PDF",
+    pdf_horaire(f"Horaire du tournoi - {date_tournoi.capitalize()}"),
+    file_name=f"horaire_{date_tournoi.replace(' ', '_')}.pdf",
+    mime="application/pdf",
+)
 
 # --- Horaire et résultats ---
 st.divider()
@@ -120,7 +110,11 @@ for i, row in matchs.iterrows():
 
     st.markdown(f"### 🕓 {heure} — {phase_label}")
 
-    if row["Type"] == "Match":
+    if row["Type"] == "Match" and en_attente(matchs, i, reelles):
+        st.markdown(f"### {row['Équipe A']} vs {row['Équipe B']}")
+        st.caption("⏳ En attente des résultats précédents : les équipes s’afficheront automatiquement.")
+
+    elif row["Type"] == "Match":
         col1, col2, col3, col4 = st.columns([2, 2, 1, 1])
         with col1:
             st.markdown(f"### {row['Équipe A']}")
@@ -149,76 +143,34 @@ for i, row in matchs.iterrows():
         else:
             st.info(f"🧊 Pause ({row['Durée (min)']} minutes)")
 
-        # Bouton mise à jour demi
-        if "avant la finale" not in texte_pause and any(matchs["Phase"].str.contains("Demi-finale")):
-            idx_demi = matchs[matchs["Phase"] == "Demi-finale"].index.min()
-            if i == idx_demi - 1:
-                st.markdown("### ⚙️ **Mettre à jour les demi-finales**")
-                if st.button("🔁 Mettre à jour maintenant", key="update_demi_button"):
-                    st.session_state["update_demi"] = True
-
-        # Bouton mise à jour finale
-        if "avant la finale" in texte_pause and any(matchs["Phase"].str.contains("Finale")):
-            st.markdown("### 🏆 **Mettre à jour la finale**")
-            if st.button("🔁 Mettre à jour la finale maintenant", key="update_finale_button"):
-                st.session_state["update_finale"] = True
-
 st.divider()
 if st.button("💾 Enregistrer les résultats"):
-    matchs.to_csv(BRACKET_FILE, index=False)
+    # seuls les matchs en aval des résultats modifiés sont recalculés
+    places = propager(matchs, matchs_modifies(matchs_enregistres, matchs))
+    enregistrer(matchs)
     st.success("✅ Résultats enregistrés !")
+    for j in places:
+        if not en_attente(matchs, j, reelles):
+            st.info(f"🏒 {matchs.at[j, 'Phase']} : {matchs.at[j, 'Équipe A']} vs {matchs.at[j, 'Équipe B']}")
 
 # --- Classement ---
 st.divider()
 st.subheader("📊 Classement de la ronde")
 
-def classement_from_results(df):
-    scores = {}
-    for _, row in df.iterrows():
-        if row["Phase"] != "Ronde" or row["Gagnant"] == "":
-            continue
-        a, b = row["Équipe A"], row["Équipe B"]
-        sa, sb = row["Score A"], row["Score B"]
-        prolong = bool(row.get("Prolongation", False))
-        for team in [a, b]:
-            if team not in scores:
-                scores[team] = {"Pts": 0, "BP": 0, "BC": 0}
-        scores[a]["BP"] += sa
-        scores[a]["BC"] += sb
-        scores[b]["BP"] += sb
-        scores[b]["BC"] += sa
-        if sa > sb:
-            scores[a]["Pts"] += 2
-            if prolong:
-                scores[b]["Pts"] += 1
-        elif sb > sa:
-            scores[b]["Pts"] += 2
-            if prolong:
-                scores[a]["Pts"] += 1
-    clas = pd.DataFrame(scores).T
-    clas["Diff"] = clas["BP"] - clas["BC"]
-    clas = clas.sort_values(["Pts", "Diff", "BP"], ascending=False).reset_index()
-    clas.rename(columns={"index": "Équipe"}, inplace=True)
-    return clas
-
 classement = classement_from_results(matchs)
 st.dataframe(classement)
 
-# --- Mise à jour des phases ---
-if "update_demi" in st.session_state and st.session_state["update_demi"]:
-    if len(classement) >= 4:
-        top4 = classement["Équipe"].tolist()[:4]
-        matchs.loc[matchs["Équipe A"].str.contains("1er vs 4e"), ["Équipe A", "Équipe B"]] = [top4[0], top4[3]]
-        matchs.loc[matchs["Équipe A"].str.contains("2e vs 3e"), ["Équipe A", "Équipe B"]] = [top4[1], top4[2]]
-        matchs.to_csv(BRACKET_FILE, index=False)
-        st.success("✅ Demi-finales mises à jour avec succès !")
-        st.session_state["update_demi"] = False
-
-if "update_finale" in st.session_state and st.session_state["update_finale"]:
-    demi = matchs[matchs["Phase"] == "Demi-finale"]
-    gagnants = demi["Gagnant"].tolist()
-    if len(gagnants) == 2 and all(gagnants):
-        matchs.loc[matchs["Phase"] == "Finale", ["Équipe A", "Équipe B"]] = gagnants
-        matchs.to_csv(BRACKET_FILE, index=False)
-        st.success("✅ Finale mise à jour avec les gagnants des demi-finales !")
-        st.session_state["update_finale"] = False
+# --- Probabilités (simulation Monte Carlo des matchs restants) ---
+st.subheader("🎲 Chances de chaque équipe")
+moyennes = info.get("moyennes")
+if not (matchs["Phase"] == "Ronde").any():
+    st.caption("La simulation suit le format ronde + demi-finales ; elle n’est pas offerte en élimination directe.")
+elif not moyennes or len(moyennes) < 4:
+    st.caption("Moyennes des équipes absentes : recréez le tournoi pour activer la simulation.")
+elif st.button(f"🎲 Simuler {NB_SIMULATIONS:,} tournois".replace(",", " ")):
+    probas = simuler_tournoi(moyennes, matchs)
+    st.dataframe(
+        probas.style.format({c: "{:.1%}" for c in probas.columns if c != "Pts moyens"} | {"Pts moyens": "{:.1f}"}),
+        use_container_width=True,
+    )
+    st.caption("Selon les moyennes de talent et les résultats déjà saisis ; pas de match pour la 3e place.")
@@ -1,4 +1,5 @@
 import streamlit as st
+from ligues_utils import ligue_de_session
 import pandas as pd
 import io
 import smtplib
@@ -7,41 +8,112 @@ from email.mime.multipart import MIMEMultipart
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
 
-from utils import load_players
+from utils import load_players, index_joueurs, table_talents, version_fichier, JOUEURS_PATH
+from formation_utils import meilleurs_echanges, appliquer_echange
 
 st.title("🧩 Formation manuelle des équipes")
+ligue = ligue_de_session()
 
-# Charger les joueurs
+# Charger les joueurs (les choix se font par id, affichés par nom)
 players = load_players()
-players_list = players["nom"].tolist()
+players_list = players["id"].tolist()
+id_vers_nom = index_joueurs().id_vers_nom
 
 
-# ✅ Petite fonction utilitaire
-def get_df(noms):
-    return players[players["nom"].isin(noms)]
+def nom_joueur(id_):
+    return id_vers_nom.get(id_, f"#{id_}")
 
 
-def moyenne_talent(df, colonne):
-    if df.empty:
-        return 0
-    return round(df[colonne].mean(), 2)
+def noms(ids):
+    return [nom_joueur(i) for i in ids]
+
+
+# ✅ Talents précalculés (id -> position dans les tableaux attaque / défense)
+talents = table_talents()
+version_talents = version_fichier(JOUEURS_PATH)
+
+LIGNES = {
+    "trioB1": "attaque", "trioB2": "attaque", "duoB1": "defense", "duoB2": "defense",
+    "trioN1": "attaque", "trioN2": "attaque", "duoN1": "defense", "duoN2": "defense",
+}
+
+
+def talent(id_, colonne):
+    pos = talents.position.get(id_)
+    if pos is None:
+        return None
+    return float(talents.attaque[pos] if colonne == "attaque" else talents.defense[pos])
+
+
+# ✅ Sommes courantes par ligne : chaque changement ne touche que les joueurs ajoutés/retirés
+def sommes_initiales():
+    sommes = {}
+    for cle, colonne in LIGNES.items():
+        valeurs = [talent(i, colonne) for i in st.session_state.get(cle, [])]
+        valeurs = [v for v in valeurs if v is not None]
+        sommes[cle] = [float(sum(valeurs)), len(valeurs)]
+    st.session_state["sommes_lignes"] = sommes
+    st.session_state["selections_prec"] = {cle: list(st.session_state.get(cle, [])) for cle in LIGNES}
+    st.session_state["sommes_version"] = version_talents
+
+
+def maj_somme(cle):
+    colonne = LIGNES[cle]
+    nouveau = set(st.session_state.get(cle, []))
+    ancien = set(st.session_state["selections_prec"].get(cle, []))
+    somme, n = st.session_state["sommes_lignes"][cle]
+    for i in nouveau - ancien:
+        v = talent(i, colonne)
+        if v is not None:
+            somme, n = somme + v, n + 1
+    for i in ancien - nouveau:
+        v = talent(i, colonne)
+        if v is not None:
+            somme, n = somme - v, n - 1
+    st.session_state["sommes_lignes"][cle] = [somme, n]
+    st.session_state["selections_prec"][cle] = list(st.session_state.get(cle, []))
+
+
+if st.session_state.get("sommes_version") != version_talents:
+    sommes_initiales()
+
+
+def moyenne_ligne(cle):
+    somme, n = st.session_state["sommes_lignes"][cle]
+    return round(somme / n, 2) if n else 0
+
+
+def moyenne_equipe(cles):
+    valeurs = [moyenne_ligne(c) for c in cles if st.session_state["sommes_lignes"][c][1]]
+    return round(sum(valeurs) / len(valeurs), 2) if valeurs else 0
+
+
+# ✅ Empêcher doublons dans les choix : on n'offre que les joueurs libres
+selections = {cle: set(st.session_state.get(cle, [])) for cle in LIGNES}
+utilises = set().union(*selections.values())
 
 
-# ✅ Empêcher doublons dans les choix
 def choix_sans_doublons(choices, all_choices, key):
+    pris_ailleurs = utilises - selections[key]
+    options = [p for p in all_choices if p not in pris_ailleurs]
     return st.multiselect(
         choices,
-        all_choices,
+        options,
+        format_func=nom_joueur,
         key=key,
+        on_change=maj_somme,
+        args=(key,),
         help="Impossible de choisir un joueur déjà utilisé ailleurs.",
     )
 
 
 # ✅ Fonction de validation des doublons
 def verifier_doublons(*listes):
-    flat = [p for lst in listes for p in lst]
-    dups = pd.Series(flat).duplicated(keep=False)
-    doublons = list(pd.Series(flat)[dups].unique())
+    vus, doublons = set(), []
+    for p in (p for lst in listes for p in lst):
+        if p in vus and p not in doublons:
+            doublons.append(p)
+        vus.add(p)
     return doublons
 
 
@@ -55,12 +127,12 @@ st.subheader("⚪ Équipe BLANCS")
 colB1, colB2 = st.columns(2)
 
 with colB1:
-    trioB1 = st.multiselect("Trio 1 (3 joueurs)", players_list, key="trioB1")
-    trioB2 = st.multiselect("Trio 2 (3 joueurs)", players_list, key="trioB2")
+    trioB1 = choix_sans_doublons("Trio 1 (3 joueurs)", players_list, "trioB1")
+    trioB2 = choix_sans_doublons("Trio 2 (3 joueurs)", players_list, "trioB2")
 
 with colB2:
-    duoB1 = st.multiselect("Duo 1 (2 joueurs)", players_list, key="duoB1")
-    duoB2 = st.multiselect("Duo 2 (2 joueurs)", players_list, key="duoB2")
+    duoB1 = choix_sans_doublons("Duo 1 (2 joueurs)", players_list, "duoB1")
+    duoB2 = choix_sans_doublons("Duo 2 (2 joueurs)", players_list, "duoB2")
 
 st.divider()
 st.subheader("⚫ Équipe NOIRS")
@@ -68,12 +140,12 @@ st.subheader("⚫ Équipe NOIRS")
 colN1, colN2 = st.columns(2)
 
 with colN1:
-    trioN1 = st.multiselect("Trio 1 (3 joueurs)", players_list, key="trioN1")
-    trioN2 = st.multiselect("Trio 2 (3 joueurs)", players_list, key="trioN2")
+    trioN1 = choix_sans_doublons("Trio 1 (3 joueurs)", players_list, "trioN1")
+    trioN2 = choix_sans_doublons("Trio 2 (3 joueurs)", players_list, "trioN2")
 
 with colN2:
-    duoN1 = st.multiselect("Duo 1 (2 joueurs)", players_list, key="duoN1")
-    duoN2 = st.multiselect("Duo 2 (2 joueurs)", players_list, key="duoN2")
+    duoN1 = choix_sans_doublons("Duo 1 (2 joueurs)", players_list, "duoN1")
+    duoN2 = choix_sans_doublons("Duo 2 (2 joueurs)", players_list, "duoN2")
 
 
 # ✅ Vérification des doublons
@@ -81,59 +153,87 @@ all_groups = [trioB1, trioB2, duoB1, duoB2, trioN1, trioN2, duoN1, duoN2]
 doublons = verifier_doublons(*all_groups)
 
 if doublons:
-    st.error(f"❌ Les joueurs suivants sont sélectionnés plus d'une fois : {', '.join(doublons)}")
+    st.error(f"❌ Les joueurs suivants sont sélectionnés plus d'une fois : {', '.join(noms(doublons))}")
     st.stop()
 
 
-# ✅ Affichage des stats
+# ✅ Affichage des stats (mis à jour à chaque changement de sélection)
 def afficher_stats(trios, duos, couleur):
     st.markdown(f"### 📊 Statistiques {couleur}")
 
-    totaux = []
-
     # Trios
-    for i, trio in enumerate(trios, 1):
-        df = get_df(trio)
-        moy = moyenne_talent(df, "talent_attaque")
-        totaux.append(moy)
-        st.write(f"**Trio {i} — attaque : {moy}**")
-        for p in trio:
+    for i, cle in enumerate(trios, 1):
+        st.write(f"**Trio {i} — attaque : {moyenne_ligne(cle)}**")
+        for p in noms(st.session_state.get(cle, [])):
             st.caption(p)
 
     # Duos
-    for i, duo in enumerate(duos, 1):
-        df = get_df(duo)
-        moy = moyenne_talent(df, "talent_defense")
-        totaux.append(moy)
-        st.write(f"**Duo {i} — défense : {moy}**")
-        for p in duo:
+    for i, cle in enumerate(duos, 1):
+        st.write(f"**Duo {i} — défense : {moyenne_ligne(cle)}**")
+        for p in noms(st.session_state.get(cle, [])):
             st.caption(p)
 
-    if totaux:
-        total = round(sum(totaux) / len(totaux), 2)
-        st.success(f"🎯 Moyenne totale équipe {couleur} : **{total}**")
-        return total
-    return 0
+    total = moyenne_equipe(trios + duos)
+    st.success(f"🎯 Moyenne totale équipe {couleur} : **{total}**")
+    return total
 
 
-if st.button("📊 Afficher les statistiques"):
-    st.subheader("Résultats des équipes")
+st.subheader("Résultats des équipes")
 
-    col1, col2 = st.columns(2)
+col1, col2 = st.columns(2)
 
-    with col1:
-        moyB = afficher_stats(
-            trios=[trioB1, trioB2],
-            duos=[duoB1, duoB2],
-            couleur="BLANCS ⚪",
-        )
+with col1:
+    moyB = afficher_stats(
+        trios=["trioB1", "trioB2"],
+        duos=["duoB1", "duoB2"],
+        couleur="BLANCS ⚪",
+    )
+
+with col2:
+    moyN = afficher_stats(
+        trios=["trioN1", "trioN2"],
+        duos=["duoN1", "duoN2"],
+        couleur="NOIRS ⚫",
+    )
 
-    with col2:
-        moyN = afficher_stats(
-            trios=[trioN1, trioN2],
-            duos=[duoN1, duoN2],
-            couleur="NOIRS ⚫",
-        )
+st.metric("⚖️ Écart entre les équipes", round(abs(moyB - moyN), 2))
+
+# ✅ Suggestions d'échanges
+CLES_EQUIPES = [
+    {"trios": ["trioB1", "trioB2"], "duos": ["duoB1", "duoB2"]},
+    {"trios": ["trioN1", "trioN2"], "duos": ["duoN1", "duoN2"]},
+]
+equipes_ids = [
+    {type_ligne: [list(st.session_state.get(c, [])) for c in cles] for type_ligne, cles in eq.items()}
+    for eq in CLES_EQUIPES
+]
+talents_choisis = {
+    i: (talent(i, "attaque"), talent(i, "defense"))
+    for i in utilises if talents.position.get(i) is not None
+}
+
+
+def appliquer_suggestion(echange):
+    nouv = appliquer_echange(equipes_ids, echange)
+    for eq_cles, eq_ids in zip(CLES_EQUIPES, nouv):
+        for type_ligne, cles in eq_cles.items():
+            for cle, ids in zip(cles, eq_ids[type_ligne]):
+                st.session_state[cle] = ids
+    sommes_initiales()
+
+
+if len(talents_choisis) == len(utilises):
+    suggestions = meilleurs_echanges(equipes_ids, talents_choisis, n=3)
+    if suggestions:
+        st.subheader("💡 Suggestions d’échanges")
+        couleurs = ["BLANCS", "NOIRS"]
+        for k, ech in enumerate(suggestions):
+            st.write(
+                f"**{ech['type']}** : {', '.join(noms(ech['sortants']))} ({couleurs[ech['equipe_1']]}) ⇄ "
+                f"{', '.join(noms(ech['entrants']))} ({couleurs[ech['equipe_2']]}) — "
+                f"écart {ech['ecart_avant']} → {ech['ecart_apres']}"
+            )
+            st.button("✅ Appliquer cet échange", key=f"echange_{k}", on_click=appliquer_suggestion, args=(ech,))
 
 st.divider()
 
@@ -154,20 +254,20 @@ if st.button("💾 Télécharger PDF"):
     pdf.drawString(50, y, "⚪ BLANCS")
     y -= 20
     for i, trio in enumerate([trioB1, trioB2], 1):
-        pdf.drawString(60, y, f"Trio {i}: {', '.join(trio)}")
+        pdf.drawString(60, y, f"Trio {i}: {', '.join(noms(trio))}")
         y -= 15
     for i, duo in enumerate([duoB1, duoB2], 1):
-        pdf.drawString(60, y, f"Duo {i}: {', '.join(duo)}")
+        pdf.drawString(60, y, f"Duo {i}: {', '.join(noms(duo))}")
         y -= 15
 
     y -= 20
     pdf.drawString(50, y, "⚫ NOIRS")
     y -= 20
     for i, trio in enumerate([trioN1, trioN2], 1):
-        pdf.drawString(60, y, f"Trio {i}: {', '.join(trio)}")
+        pdf.drawString(60, y, f"Trio {i}: {', '.join(noms(trio))}")
         y -= 15
     for i, duo in enumerate([duoN1, duoN2], 1):
-        pdf.drawString(60, y, f"Duo {i}: {', '.join(duo)}")
+        pdf.drawString(60, y, f"Duo {i}: {', '.join(noms(duo))}")
         y -= 15
 
     pdf.save()
@@ -194,12 +294,12 @@ if st.button("📨 Envoyer courriel"):
     corps_html = f"""
     <h2>Équipes manuelles</h2>
     <h3>⚪ BLANCS</h3>
-    <p>Trios:<br>{'<br>'.join([', '.join(t) for t in [trioB1, trioB2]])}</p>
-    <p>Duos:<br>{'<br>'.join([', '.join(d) for d in [duoB1, duoB2]])}</p>
+    <p>Trios:<br>{'<br>'.join([', '.join(noms(t)) for t in [trioB1, trioB2]])}</p>
+    <p>Duos:<br>{'<br>'.join([', '.join(noms(d)) for d in [duoB1, duoB2]])}</p>
 
     <h3>⚫ NOIRS</h3>
-    <p>Trios:<br>{'<br>'.join([', '.join(t) for t in [trioN1, trioN2]])}</p>
-    <p>Duos:<br>{'<br>'.join([', '.join(d) for d in [duoN1, duoN2]])}</p>
+    <p>Trios:<br>{'<br>'.join([', '.join(noms(t)) for t in [trioN1, trioN2]])}</p>
+    <p>Duos:<br>{'<br>'.join([', '.join(noms(d)) for d in [duoN1, duoN2]])}</p>
     """
 
     try:
@@ -1,4 +1,5 @@
 import streamlit as st
+from ligues_utils import ligue_de_session, dossier_ligue
 import pandas as pd
 import os
 from reportlab.lib.pagesizes import letter
@@ -7,9 +8,10 @@ import io
 from datetime import datetime
 
 st.title("📜 Historique des tournois 🏆")
+ligue = ligue_de_session()
 
-HISTO_PATH = "data/historique_tournois.csv"
-os.makedirs("data", exist_ok=True)
+HISTO_PATH = os.path.join(dossier_ligue(), "historique_tournois.csv")
+os.makedirs(dossier_ligue(), exist_ok=True)
 
 if not os.path.exists(HISTO_PATH):
     st.warning("Aucun tournoi archivé pour le moment.")
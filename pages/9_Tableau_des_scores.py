@@ -0,0 +1,45 @@
+import streamlit as st
+from ligues_utils import ligue_de_session, activer_ligue
+import pandas as pd
+from datetime import datetime
+from flux_utils import etat_tableau, version_flux
+
+st.title("📺 Tableau des scores")
+ligue = ligue_de_session()
+st.caption("Affichage en lecture seule pour les spectateurs — mis à jour automatiquement.")
+
+INTERVALLE_S = 5
+
+# Seul ce fragment est relancé : un stat des fichiers, puis l'état calculé une fois
+# par version et partagé par tous les spectateurs.
+@st.fragment(run_every=INTERVALLE_S)
+def tableau():
+    activer_ligue(ligue)  # le fragment peut être relancé hors de l'exécution complète de la page
+    matchs, classement = etat_tableau()
+    if matchs is None:
+        st.info("Aucun tournoi en cours.")
+        return
+
+    st.caption(f"🔄 {datetime.now():%H:%M:%S} — {version_flux()} mises à jour reçues")
+
+    st.subheader("📊 Classement")
+    if classement.empty:
+        st.write("Aucun résultat pour le moment.")
+    else:
+        st.dataframe(classement, hide_index=True, use_container_width=True)
+
+    st.subheader("🏒 Matchs")
+    jeux = matchs[matchs["Type"] == "Match"]
+    joue = (jeux["Gagnant"] != "") | (jeux["Score A"].astype(int) + jeux["Score B"].astype(int) > 0)
+    score = jeux["Score A"].astype(int).astype(str) + " – " + jeux["Score B"].astype(int).astype(str)
+    prolongation = jeux["Prolongation"].astype(str).str.lower().isin(["true", "1"])
+    affichage = pd.DataFrame({
+        "Heure": jeux["Heure"].fillna(""),
+        "Phase": jeux["Phase"],
+        "Équipe A": jeux["Équipe A"],
+        "Score": score.where(joue, "—") + prolongation.map({True: " (Prol.)", False: ""}),
+        "Équipe B": jeux["Équipe B"],
+    })
+    st.dataframe(affichage, hide_index=True, use_container_width=True)
+
+tableau()
@@ -0,0 +1,208 @@
+"""
+Journal des présences (data/presences.log) : qui était là, séance après séance.
+
+La colonne `present` de joueurs.csv ne garde que la semaine en cours. Chaque enregistrement
+qui change les présences ajoute ici une ligne « date P <bits> » : l'ensemble des présents,
+en hexadécimal (bit i = joueur d'id i). La remise à zéro ajoute « date R » et clôt la
+séance ; une séance est aussi close quand la présence suivante arrive JOURS_ENTRE_SEANCES
+jours plus tard (semaine oubliée sans remise à zéro). Les présences d'une séance sont
+celles de sa dernière ligne P.
+
+Les agrégats (présences, séries, probabilité de venir) sont tenus par joueur dans des
+tableaux NumPy et mis à jour séance par séance en O(joueurs) : à chaque lecture, seules
+les lignes ajoutées depuis la précédente sont lues.
+"""
+import os
+import threading
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+from ligues_utils import CheminLigue
+from utils import load_players, roster_par_id, index_joueurs, table_talents
+
+PRESENCES_PATH = CheminLigue("presences.log")
+JOURS_ENTRE_SEANCES = 4
+LISSAGE = 0.3  # poids de la dernière séance dans la probabilité de venir
+SEUIL_PROBABLE = 0.5
+
+_verrou = threading.Lock()
+_etats = {}  # chemin absolu -> _Agregats
+
+
+# --- Bitsets ---
+def ids_vers_bits(ids):
+    bits = 0
+    for i in ids:
+        bits |= 1 << int(i)
+    return bits
+
+
+def bits_vers_ids(bits):
+    return [i for i in range(bits.bit_length()) if bits >> i & 1]
+
+
+def _bits_vers_tableau(bits, taille):
+    octets = bits.to_bytes(max((taille + 7) // 8, 1), "little")
+    return np.unpackbits(np.frombuffer(octets, dtype=np.uint8), bitorder="little")[:taille].astype(bool)
+
+
+# --- Écriture ---
+def _ajouter(ligne, path):
+    os.makedirs(os.path.dirname(os.fspath(path)) or ".", exist_ok=True)
+    with _verrou, open(path, "a", encoding="utf-8") as f:
+        f.write(ligne + "\n")
+
+
+def journaliser_presences(ids_presents, jour=None, path=PRESENCES_PATH):
+    """Ajoute l'ensemble des présents (ids) au journal."""
+    jour = jour or date.today()
+    _ajouter(f"{jour.isoformat()} P {ids_vers_bits(ids_presents):x}", path)
+
+
+def journaliser_remise_a_zero(jour=None, path=PRESENCES_PATH):
+    """Clôt la séance en cours (bouton « Remettre à zéro la présence »)."""
+    jour = jour or date.today()
+    _ajouter(f"{jour.isoformat()} R", path)
+
+
+# --- Agrégats incrémentaux ---
+class _Agregats:
+    """Totaux par joueur (indice = id) des séances closes, plus la séance ouverte."""
+
+    def __init__(self):
+        self.position = 0          # octets du journal déjà lus
+        self.nb_seances = 0
+        self.taille = 0
+        self.presences = np.zeros(0, dtype=np.int64)
+        self.premiere = np.zeros(0, dtype=np.int64)   # indice de la 1re séance présente (-1 = jamais)
+        self.serie = np.zeros(0, dtype=np.int64)
+        self.meilleure = np.zeros(0, dtype=np.int64)
+        self.probabilite = np.zeros(0, dtype=float)
+        self.ouverte = None        # bits de la séance en cours (None = aucune)
+        self.date_ouverte = None
+        self.dates = []            # date de chaque séance close
+
+    def _agrandir(self, taille):
+        if taille <= self.taille:
+            return
+        for nom, defaut in [("presences", 0), ("premiere", -1), ("serie", 0), ("meilleure", 0), ("probabilite", 0.0)]:
+            ancien = getattr(self, nom)
+            nouveau = np.full(taille, defaut, dtype=ancien.dtype)
+            nouveau[:len(ancien)] = ancien
+            setattr(self, nom, nouveau)
+        self.taille = taille
+
+    def clore(self):
+        if self.ouverte is None:
+            return
+        self._agrandir(self.ouverte.bit_length())
+        present = _bits_vers_tableau(self.ouverte, self.taille)
+        self.presences += present
+        self.premiere[present & (self.premiere < 0)] = self.nb_seances
+        self.serie = np.where(present, self.serie + 1, 0)
+        np.maximum(self.meilleure, self.serie, out=self.meilleure)
+        self.probabilite = (1 - LISSAGE) * self.probabilite + LISSAGE * present
+        self.nb_seances += 1
+        self.dates.append(self.date_ouverte)
+        self.ouverte, self.date_ouverte = None, None
+
+    def appliquer(self, ligne):
+        morceaux = ligne.split()
+        if len(morceaux) < 2:
+            return
+        try:
+            jour = datetime.strptime(morceaux[0], "%Y-%m-%d").date()
+        except ValueError:
+            return
+        if morceaux[1] == "R":
+            self.clore()
+        elif morceaux[1] == "P" and len(morceaux) == 3:
+            if self.date_ouverte is not None and (jour - self.date_ouverte).days >= JOURS_ENTRE_SEANCES:
+                self.clore()
+            self.ouverte, self.date_ouverte = int(morceaux[2], 16), jour
+
+
+def _agregats(path=PRESENCES_PATH):
+    """Agrégats à jour : seules les lignes ajoutées depuis la dernière lecture sont lues."""
+    chemin = os.path.abspath(path)
+    with _verrou:
+        etat = _etats.get(chemin)
+        taille = os.path.getsize(chemin) if os.path.exists(chemin) else 0
+        if etat is None or taille < etat.position:  # journal remplacé ou tronqué : on repart de zéro
+            etat = _etats[chemin] = _Agregats()
+        if taille > etat.position:
+            with open(chemin, "rb") as f:
+                f.seek(etat.position)
+                nouveau = f.read()
+            fin = nouveau.rfind(b"\n") + 1  # une ligne en cours d'écriture attendra la prochaine lecture
+            for ligne in nouveau[:fin].decode("utf-8").splitlines():
+                etat.appliquer(ligne)
+            etat.position += fin
+        return etat
+
+
+# --- Requêtes ---
+def statistiques_presences(path=PRESENCES_PATH):
+    """Par joueur du roster : présences, taux (depuis sa première séance), séries, probabilité de venir."""
+    etat = _agregats(path)
+    players = load_players()
+    ids = players["id"].to_numpy(dtype=np.int64)
+    connus = ids < etat.taille
+    pos = np.where(connus, ids, 0)
+
+    def par_joueur(tableau, defaut):
+        if etat.taille == 0:
+            return np.full(len(ids), defaut)
+        return np.where(connus, tableau[pos], defaut)
+
+    presences = par_joueur(etat.presences, 0)
+    premiere = par_joueur(etat.premiere, -1)
+    seances = np.where(premiere >= 0, etat.nb_seances - premiere, 0)
+    stats = pd.DataFrame({
+        "id": ids,
+        "Joueur": players["nom"].to_numpy(),
+        "Présences": presences,
+        "Séances": seances,
+        "Taux": np.round(np.divide(presences, seances, out=np.zeros(len(ids)), where=seances > 0), 3),
+        "Série actuelle": par_joueur(etat.serie, 0),
+        "Meilleure série": par_joueur(etat.meilleure, 0),
+        "Probabilité": np.round(par_joueur(etat.probabilite, 0.0), 3),
+    })
+    return stats.sort_values(["Probabilité", "Taux"], ascending=False).reset_index(drop=True)
+
+
+def presence_attendue(path=PRESENCES_PATH):
+    """(nombre de joueurs attendus, ids probables) pour la prochaine séance."""
+    etat = _agregats(path)
+    ids_roster = set(roster_par_id().index.tolist())
+    if etat.taille == 0:
+        return 0.0, []
+    probables = [int(i) for i in np.flatnonzero(etat.probabilite >= SEUIL_PROBABLE) if int(i) in ids_roster]
+    attendus = float(sum(etat.probabilite[i] for i in range(etat.taille) if i in ids_roster))
+    return round(attendus, 1), probables
+
+
+def resume_seances(path=PRESENCES_PATH):
+    """(nombre de séances closes, date de la dernière, présents de la séance ouverte)."""
+    etat = _agregats(path)
+    ouverte = bits_vers_ids(etat.ouverte) if etat.ouverte is not None else []
+    return etat.nb_seances, (etat.dates[-1] if etat.dates else None), ouverte
+
+
+def prechauffer_formation(ids=None, path=PRESENCES_PATH):
+    """Charge d'avance les caches de formation pour le roster probable ; retourne les ids utilisés."""
+    from formation_utils import candidats_postes
+
+    if ids is None:
+        ids = presence_attendue(path)[1]
+    roster = roster_par_id()
+    index_joueurs()
+    table_talents()
+    # même ordre (celui du fichier) que les présents filtrés par les pages de formation
+    probables = roster[roster.index.isin(ids)].reset_index(drop=True)
+    if not probables.empty:
+        candidats_postes(probables)                    # deux équipes (page 2)
+        candidats_postes(probables, equilibrer=False)  # tournoi (page 5)
+    return probables["id"].astype(int).tolist()
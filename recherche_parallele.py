@@ -0,0 +1,158 @@
+import os
+import time
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from formation_utils import NOMS_EQUIPES_TOURNOI, attribuer_postes, generer_equipes_tournoi
+
+
+# --- Recherche parallèle de formations (tournoi, grosses soirées) ---
+# Chaque processus tire des lots de formations au hasard et les évalue d'un coup avec
+# NumPy. Les talents sont déposés une seule fois en mémoire partagée : on ne transmet
+# aux processus que le nom du segment et quelques entiers, jamais le roster.
+
+def _capacites(nb_joueurs, nb_lignes):
+    base, reste = divmod(nb_joueurs, nb_lignes)
+    return np.array([base + (1 if l < reste else 0) for l in range(nb_lignes)], dtype=np.int64)
+
+
+def _evaluer_lot(talents, perms, capacites, nb_equipes):
+    """Somme pondérée par équipe pour un lot de permutations (lot, nb_equipes)."""
+    nb_lignes = len(capacites)
+    scores = np.zeros((perms.shape[0], nb_equipes))
+    if perms.shape[1] == 0:
+        return scores, np.zeros(nb_equipes)
+    valeurs = talents[perms]
+    debuts = np.concatenate([[0], np.cumsum(capacites)[:-1]])
+    non_vides = capacites > 0
+    sommes = np.add.reduceat(valeurs, debuts[non_vides], axis=1)
+    moyennes = sommes / capacites[non_vides]
+    equipe_ligne = (np.arange(nb_lignes) % nb_equipes)[non_vides]
+    np.add.at(scores.T, equipe_ligne, moyennes.T)
+    return scores, np.bincount(equipe_ligne, minlength=nb_equipes)
+
+
+def _ecart_equipes(equipes):
+    """Écart (max - min) des moyennes non arrondies, calculées comme _evaluer_lot."""
+    moyennes = []
+    for eq in equipes:
+        moy = [g["talent_attaque"].mean() for g in eq["trios"] if not g.empty] + \
+              [g["talent_defense"].mean() for g in eq["duos"] if not g.empty]
+        moyennes.append(sum(moy) / len(moy) if moy else 0.0)
+    return float(max(moyennes) - min(moyennes)) if moyennes else 0.0
+
+
+def _meilleur_lot(talents_a, talents_d, cap_a, cap_d, nb_equipes, rng, taille_lot):
+    perms_a = rng.permuted(np.tile(np.arange(len(talents_a)), (taille_lot, 1)), axis=1)
+    perms_d = rng.permuted(np.tile(np.arange(len(talents_d)), (taille_lot, 1)), axis=1)
+    s_a, n_a = _evaluer_lot(talents_a, perms_a, cap_a, nb_equipes)
+    s_d, n_d = _evaluer_lot(talents_d, perms_d, cap_d, nb_equipes)
+    nb_lignes = np.maximum(n_a + n_d, 1)
+    moyennes = (s_a + s_d) / nb_lignes
+    ecarts = moyennes.max(axis=1) - moyennes.min(axis=1)
+    k = int(np.argmin(ecarts))
+    return float(ecarts[k]), perms_a[k], perms_d[k]
+
+
+def _chercher(nom_shm, n_a, n_d, cap_a, cap_d, nb_equipes, budget_s, seed, taille_lot, max_lots,
+              arret_si_parfait=True, ecart_depart=float("inf")):
+    """Travail d'un processus : retourne (écart, perm_attaque, perm_défense, nb_évalués).
+
+    Seules les formations plus équilibrées que `ecart_depart` sont retenues ; si aucune
+    ne l'est, les permutations retournées valent None.
+    """
+    shm = shared_memory.SharedMemory(name=nom_shm)
+    try:
+        talents = np.ndarray((n_a + n_d,), dtype=np.float64, buffer=shm.buf)
+        talents_a, talents_d = talents[:n_a].copy(), talents[n_a:].copy()
+    finally:
+        shm.close()
+    # l'échéance court une fois le processus prêt : son démarrage ne mange pas le budget
+    deadline = time.monotonic() + budget_s
+    rng = np.random.default_rng(seed)
+    cap_a, cap_d = np.asarray(cap_a), np.asarray(cap_d)
+    meilleur = (ecart_depart, None, None)
+    evalues = 0
+    for _ in range(max_lots):
+        resultat = _meilleur_lot(talents_a, talents_d, cap_a, cap_d, nb_equipes, rng, taille_lot)
+        evalues += taille_lot
+        if resultat[0] < meilleur[0]:
+            meilleur = resultat
+        if time.monotonic() >= deadline or (arret_si_parfait and meilleur[0] < 1e-9):
+            break
+    return meilleur[0], meilleur[1], meilleur[2], evalues
+
+
+def recherche_parallele(players_present, nb_equipes=4, trios_par_equipe=2, duos_par_equipe=2,
+                        budget_s=2.0, nb_workers=1, taille_lot=2048, max_lots=10_000, seed=None,
+                        arret_si_parfait=True):
+    """
+    Cherche la formation la plus équilibrée en répartissant l'évaluation des candidats
+    sur `nb_workers` processus (ProcessPoolExecutor), chacun pendant `budget_s` secondes
+    (ou jusqu'à ce qu'un processus trouve un écart nul). `nb_workers=None` prend tous les cœurs.
+
+    Les postes suivent generer_equipes_tournoi (meilleur talent). Pour le format du tournoi
+    (4 équipes, 2 trios et 2 duos), la formation de generer_equipes_tournoi(graine=seed) sert
+    de point de départ : elle est retournée si aucun tirage ne fait mieux. Retourne
+    (équipes, infos) où équipes = [{"trios": [DataFrame], "duos": [DataFrame], "moyenne"}]
+    et infos = {"ecart", "evalues", "nb_workers"}.
+    """
+    nb_workers = nb_workers or os.cpu_count() or 1
+    depart, ecart_depart = None, float("inf")
+    if not players_present.empty and (nb_equipes, trios_par_equipe, duos_par_equipe) == (len(NOMS_EQUIPES_TOURNOI), 2, 2):
+        depart = list(generer_equipes_tournoi(players_present, graine=seed).values())
+        ecart_depart = _ecart_equipes(depart)
+    joueurs = attribuer_postes(players_present).reset_index(drop=True)
+    attaquants = joueurs[joueurs["poste"] == "Attaquant"].reset_index(drop=True)
+    defenseurs = joueurs[joueurs["poste"] == "Défenseur"].reset_index(drop=True)
+    cap_a = _capacites(len(attaquants), nb_equipes * trios_par_equipe)
+    cap_d = _capacites(len(defenseurs), nb_equipes * duos_par_equipe)
+    talents = np.concatenate([
+        attaquants["talent_attaque"].to_numpy(dtype=np.float64),
+        defenseurs["talent_defense"].to_numpy(dtype=np.float64),
+    ])
+    graines = np.random.SeedSequence(seed).spawn(nb_workers)
+
+    if arret_si_parfait and ecart_depart < 1e-9:
+        return depart, {"ecart": round(ecart_depart, 4), "evalues": 0, "nb_workers": nb_workers}
+
+    shm = shared_memory.SharedMemory(create=True, size=max(talents.nbytes, 1))
+    try:
+        np.ndarray(talents.shape, dtype=np.float64, buffer=shm.buf)[:] = talents
+        args = [(shm.name, len(attaquants), len(defenseurs), cap_a.tolist(), cap_d.tolist(),
+                 nb_equipes, budget_s, g, taille_lot, max_lots, arret_si_parfait, ecart_depart) for g in graines]
+        if nb_workers == 1:
+            resultats = [_chercher(*args[0])]
+        else:
+            with ProcessPoolExecutor(max_workers=nb_workers) as pool:
+                resultats = list(pool.map(_chercher, *zip(*args)))
+    finally:
+        shm.close()
+        shm.unlink()
+
+    ecart, perm_a, perm_d, _ = min(resultats, key=lambda r: r[0])
+    evalues = sum(r[3] for r in resultats)
+    if depart is not None and perm_a is None:
+        # aucun tirage ne bat la formation de départ
+        return depart, {"ecart": round(ecart_depart, 4), "evalues": evalues, "nb_workers": nb_workers}
+
+    # --- Reconstruction des lignes (la ligne l appartient à l'équipe l % nb_equipes) ---
+    def lignes(df, perm, capacites):
+        if perm is None or df.empty:
+            return [pd.DataFrame() for _ in capacites]
+        debuts = np.concatenate([[0], np.cumsum(capacites)])
+        return [df.iloc[perm[debuts[l]:debuts[l + 1]]].reset_index(drop=True) if capacites[l] else pd.DataFrame()
+                for l in range(len(capacites))]
+
+    trios = lignes(attaquants, perm_a, cap_a)
+    duos = lignes(defenseurs, perm_d, cap_d)
+    equipes = []
+    for t in range(nb_equipes):
+        eq_trios, eq_duos = trios[t::nb_equipes], duos[t::nb_equipes]
+        moy = [g["talent_attaque"].mean() for g in eq_trios if not g.empty] + \
+              [g["talent_defense"].mean() for g in eq_duos if not g.empty]
+        equipes.append({"trios": eq_trios, "duos": eq_duos,
+                        "moyenne": round(float(sum(moy) / len(moy)), 2) if moy else 0})
+    return equipes, {"ecart": round(ecart, 4), "evalues": evalues, "nb_workers": nb_workers}
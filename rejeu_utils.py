@@ -0,0 +1,101 @@
+"""
+Rejeu des formations enregistrées : une ligne d'historique garde la graine, la version du
+groupe de joueurs et la version de l'algorithme au lieu de tous ses trios / duos en texte.
+
+Le groupe de joueurs passé à generate_teams est archivé une seule fois, adressé par son
+contenu, dans data/rosters/<empreinte>.csv (id, nom, talents, dans l'ordre ; l'empreinte
+« sha256-<16 hex> » n'est jamais lue comme un nombre dans le CSV de l'historique) : la même
+formation peut ensuite être régénérée à la demande, et verifier_match prouve que le rejeu
+redonne exactement les équipes enregistrées (ids dans l'ordre des lignes et moyennes).
+"""
+import hashlib
+import os
+
+import pandas as pd
+
+from ligues_utils import CheminLigue
+from formation_utils import generate_teams, COLONNES_CANDIDATS, VERSION_ALGO
+from utils import texte_vers_ids
+
+ROSTERS_DIR = CheminLigue("rosters")
+
+
+def _contenu_roster(groupe):
+    return groupe[COLONNES_CANDIDATS].to_csv(index=False).encode("utf-8")
+
+
+def _empreinte(contenu):
+    return "sha256-" + hashlib.sha256(contenu).hexdigest()[:16]
+
+
+def version_roster(groupe):
+    """Empreinte du groupe de joueurs, ordre compris."""
+    return _empreinte(_contenu_roster(groupe))
+
+
+def archiver_roster(groupe, dossier=ROSTERS_DIR):
+    """Archive le groupe sous son empreinte (rien à écrire s'il existe déjà) ; retourne l'empreinte."""
+    contenu = _contenu_roster(groupe)
+    version = _empreinte(contenu)
+    chemin = os.path.join(dossier, f"{version}.csv")
+    if not os.path.exists(chemin):
+        os.makedirs(dossier, exist_ok=True)
+        tmp = f"{chemin}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(contenu)
+        os.replace(tmp, chemin)
+    return version
+
+
+def charger_roster(version, dossier=ROSTERS_DIR):
+    """Groupe de joueurs archivé ; ValueError s'il manque ou ne correspond plus à son empreinte."""
+    chemin = os.path.join(dossier, f"{version}.csv")
+    if not os.path.exists(chemin):
+        raise ValueError(f"Groupe de joueurs {version} introuvable dans l'archive.")
+    with open(chemin, "rb") as f:
+        contenu = f.read()
+    if _empreinte(contenu) != version:
+        raise ValueError(f"Le groupe de joueurs {version} a été modifié dans l'archive.")
+    return pd.read_csv(chemin, float_precision="round_trip")
+
+
+def est_rejouable(ligne):
+    """Vrai si la ligne d'historique porte une graine et une version de groupe."""
+    graine, version = ligne.get("Seed"), ligne.get("Version_roster")
+    return not pd.isna(graine) and isinstance(version, str) and bool(version)
+
+
+def rejouer_match(ligne, dossier=ROSTERS_DIR):
+    """Régénère les équipes (résultat de generate_teams) d'une ligne d'historique rejouable."""
+    if not est_rejouable(ligne):
+        raise ValueError("Ce match n'a pas de graine : il a été formé à la main ou avec des contraintes.")
+    algo = ligne.get("Version_algo")
+    algo = 0 if pd.isna(algo) else int(algo)
+    if algo != VERSION_ALGO:
+        raise ValueError(
+            f"Formation faite avec l'algorithme v{algo} ; la version actuelle (v{VERSION_ALGO}) ne peut pas la rejouer."
+        )
+    return generate_teams(charger_roster(ligne["Version_roster"], dossier), graine=int(ligne["Seed"]))
+
+
+def ids_equipe_rejouee(teams, couleur):
+    """Ids d'une équipe rejouée, dans l'ordre des lignes (comme la colonne Ids_* de l'historique)."""
+    c = couleur[0]
+    return [int(i) for g in teams[f"equipe{c}_trios"] + teams[f"equipe{c}_duos"] if not g.empty for i in g["id"]]
+
+
+def verifier_match(ligne, dossier=ROSTERS_DIR):
+    """Rejoue la ligne et la compare à ce qui est enregistré : retourne la liste des écarts (vide = identique)."""
+    teams = rejouer_match(ligne, dossier)
+    ecarts = []
+    for couleur in ["BLANCS", "NOIRS"]:
+        ids = ligne.get(f"Ids_{couleur}")
+        # une équipe d'un seul joueur est relue comme un nombre par read_csv
+        attendu = [int(ids)] if pd.api.types.is_number(ids) and not pd.isna(ids) else texte_vers_ids(ids)
+        obtenu = ids_equipe_rejouee(teams, couleur)
+        if attendu != obtenu:
+            ecarts.append(f"{couleur} : joueurs {attendu} enregistrés, {obtenu} rejoués")
+        moyenne = float(ligne.get(f"Moyenne_{couleur}"))
+        if round(moyenne, 2) != round(float(teams[f"moy{couleur[0]}"]), 2):
+            ecarts.append(f"{couleur} : moyenne {moyenne} enregistrée, {teams[f'moy{couleur[0]}']} rejouée")
+    return ecarts
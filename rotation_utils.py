@@ -0,0 +1,160 @@
+"""
+Plan des présences (shifts) d'un match : quel trio et quel duo sont sur la glace, et quand.
+
+Les trios (attaque) et les duos (défense) tournent chacun de leur côté. À chaque présence,
+on prend la ligne qui a le moins joué (file de priorité), sans reprendre celle qui sort
+de la glace. En option, les lignes de la deuxième équipe sont choisies pour affronter
+des lignes de talent semblable chez l'adversaire.
+"""
+import heapq
+
+import pandas as pd
+
+DUREE_PRESENCE_S = 90
+
+
+def lignes_equipe(equipe):
+    """[(nom, joueurs, talent)] des trios puis des duos d'une équipe (dict trios / duos en DataFrames)."""
+    trios = [
+        (f"Trio {k}", ", ".join(g["nom"]), float(g["talent_attaque"].mean()))
+        for k, g in enumerate(equipe["trios"], 1) if not g.empty
+    ]
+    duos = [
+        (f"Duo {k}", ", ".join(g["nom"]), float(g["talent_defense"].mean()))
+        for k, g in enumerate(equipe["duos"], 1) if not g.empty
+    ]
+    return trios, duos
+
+
+def _rotation(talents, nb_presences, adverses=None):
+    """Indice de ligne pour chaque présence.
+
+    talents : talent de chaque ligne ; adverses : talent de la ligne adverse à chaque
+    présence (None = sans appariement). File de priorité sur (présences jouées, ordre).
+    """
+    if not talents:
+        return [None] * nb_presences
+    file = [(0, k) for k in range(len(talents))]
+    heapq.heapify(file)
+    plan, precedente = [], None
+    for p in range(nb_presences):
+        # lignes ex aequo pour le moins de présences, hors celle qui sort de la glace
+        mises_de_cote, candidates = [], []
+        while file:
+            joue, k = heapq.heappop(file)
+            if candidates and joue > candidates[0][0]:
+                heapq.heappush(file, (joue, k))
+                break
+            if k == precedente and len(talents) > 1:
+                mises_de_cote.append((joue, k))
+                continue
+            candidates.append((joue, k))
+            if adverses is None:
+                break
+        if not candidates:  # seule la ligne précédente était disponible à ce niveau
+            candidates = [mises_de_cote.pop(0)]
+        if adverses is not None and adverses[p] is not None:
+            choix = min(candidates, key=lambda c: (abs(talents[c[1]] - adverses[p]), c[1]))
+        else:
+            choix = candidates[0]
+        for c in candidates + mises_de_cote:
+            if c != choix:
+                heapq.heappush(file, c)
+        heapq.heappush(file, (choix[0] + 1, choix[1]))
+        plan.append(choix[1])
+        precedente = choix[1]
+    return plan
+
+
+def _horaire(duree_min, duree_presence_s):
+    if duree_min <= 0 or duree_presence_s <= 0:
+        raise ValueError("La durée du match et celle d'une présence doivent être positives.")
+    total = int(round(duree_min * 60))
+    debuts = list(range(0, total, int(duree_presence_s)))
+    return [(d, min(d + int(duree_presence_s), total)) for d in debuts]
+
+
+def _mmss(secondes):
+    return f"{secondes // 60}:{secondes % 60:02d}"
+
+
+def _plan(trios, duos, horaire, adversaire=None):
+    adv_trios = adv_duos = None
+    if adversaire is not None:
+        adv_trios = adversaire["Talent trio"].tolist()
+        adv_duos = adversaire["Talent duo"].tolist()
+    plan_trios = _rotation([t for _, _, t in trios], len(horaire), adv_trios)
+    plan_duos = _rotation([t for _, _, t in duos], len(horaire), adv_duos)
+
+    lignes = []
+    for p, ((debut, fin), kt, kd) in enumerate(zip(horaire, plan_trios, plan_duos), 1):
+        trio = trios[kt] if kt is not None else ("", "", None)
+        duo = duos[kd] if kd is not None else ("", "", None)
+        lignes.append({
+            "Présence": p, "Début": _mmss(debut), "Fin": _mmss(fin), "Secondes": fin - debut,
+            "Trio": trio[0], "Attaquants": trio[1], "Talent trio": trio[2],
+            "Duo": duo[0], "Défenseurs": duo[1], "Talent duo": duo[2],
+        })
+    return pd.DataFrame(lignes)
+
+
+def planifier_presences(equipe, duree_min, duree_presence_s=DUREE_PRESENCE_S, adversaire=None):
+    """Plan des présences d'une équipe : DataFrame Présence, Début, Fin, Trio, Attaquants, Duo, Défenseurs.
+
+    adversaire : plan déjà établi de l'autre équipe (sortie de cette fonction) pour
+    apparier les lignes par talent ; None = simple rotation équitable.
+    """
+    return _plan(*lignes_equipe(equipe), _horaire(duree_min, duree_presence_s), adversaire)
+
+
+def planifier_match(equipe_a, equipe_b, duree_min, duree_presence_s=DUREE_PRESENCE_S, appariement=True):
+    """Plans des deux équipes ; avec appariement, B suit les lignes de A par talent."""
+    plan_a = planifier_presences(equipe_a, duree_min, duree_presence_s)
+    plan_b = planifier_presences(equipe_b, duree_min, duree_presence_s, plan_a if appariement else None)
+    return plan_a, plan_b
+
+
+def planifier_journee(equipes, matchs, duree_presence_s=DUREE_PRESENCE_S, appariement=True):
+    """Plans de tous les matchs d'un horaire (generer_matchs_equilibres) dont les équipes sont connues.
+
+    Retourne {indice du match: (plan Équipe A, plan Équipe B)}. Les lignes de chaque
+    équipe sont calculées une seule fois pour la journée.
+    """
+    lignes = {nom: lignes_equipe(eq) for nom, eq in equipes.items()}
+    plans = {}
+    for i, row in matchs[matchs["Type"] == "Match"].iterrows():
+        a, b = row["Équipe A"], row["Équipe B"]
+        if a not in lignes or b not in lignes:
+            continue  # demi-finales et finale avant que les équipes soient connues
+        horaire = _horaire(row["Durée (min)"], duree_presence_s)
+        plan_a = _plan(*lignes[a], horaire)
+        plans[i] = (plan_a, _plan(*lignes[b], horaire, plan_a if appariement else None))
+    return plans
+
+
+def temps_de_glace(plan):
+    """Minutes jouées par ligne (trios et duos) d'un plan."""
+    temps = {}
+    for colonne in ["Trio", "Duo"]:
+        for ligne, secondes in plan.groupby(colonne)["Secondes"].sum().items():
+            if ligne:
+                temps[ligne] = round(secondes / 60, 1)
+    return pd.Series(temps, name="Minutes")
+
+
+def dessiner_rotation(pdf, plan, titre, y=770):
+    """Écrit un plan de présences sur un canvas reportlab (nouvelle page au besoin) ; retourne y."""
+    pdf.setFont("Helvetica-Bold", 13)
+    pdf.drawString(50, y, titre)
+    y -= 20
+    pdf.setFont("Helvetica", 9)
+    for _, row in plan.iterrows():
+        if y < 50:
+            pdf.showPage()
+            pdf.setFont("Helvetica", 9)
+            y = 770
+        pdf.drawString(50, y, f"{row['Présence']:>2}. {row['Début']}–{row['Fin']}")
+        pdf.drawString(130, y, f"{row['Trio']} : {row['Attaquants']}"[:60])
+        pdf.drawString(390, y, f"{row['Duo']} : {row['Défenseurs']}"[:45])
+        y -= 13
+    return y - 15
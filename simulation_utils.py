@@ -0,0 +1,184 @@
+"""
+Simulation Monte Carlo du tournoi : probabilité de chaque équipe de finir 1re, 2e, 3e, 4e...
+
+Les buts de chaque match suivent une loi de Poisson dont la moyenne dépend de l'écart
+entre les moyennes de talent des deux équipes. Les matchs déjà joués (bracket en cours)
+sont gardés tels quels ; seuls les matchs restants sont tirés, pour toutes les
+simulations à la fois (tableaux NumPy de forme (nb_simulations, ...)).
+
+Format : ronde complète (points de classement_from_results), demi-finales 1er vs 4e et
+2e vs 3e, finale. Il n'y a pas de match pour la 3e place : les perdants des demi-finales
+sont départagés par leur rang de la ronde.
+"""
+import numpy as np
+import pandas as pd
+
+from tournoi_utils import POINTS_VICTOIRE, POINTS_DEFAITE_PROLONGATION
+
+# Paramètres du modèle (ordres de grandeur d'une ligue récréative)
+BUTS_MOYENS = 3.0      # buts par équipe quand les moyennes sont égales
+SENSIBILITE = 0.35     # effet d'un point de talent d'écart (multiplicatif, exp)
+NB_SIMULATIONS = 100_000
+
+
+def _vrai(valeur):
+    return str(valeur).strip().lower() in ("true", "1", "oui")
+
+
+def _tirer_matchs(rng, force_a, force_b, buts_moyens, sensibilite):
+    """Buts des deux équipes et prolongation pour des matchs (tableaux de même forme).
+
+    Une égalité est tranchée en prolongation (un but de plus pour le gagnant, tiré selon
+    la part de talent de chaque équipe).
+    """
+    ecart = sensibilite * (force_a - force_b)
+    buts_a = rng.poisson(buts_moyens * np.exp(ecart))
+    buts_b = rng.poisson(buts_moyens * np.exp(-ecart))
+    prolongation = buts_a == buts_b
+    a_gagne_prol = rng.random(force_a.shape) < force_a / (force_a + force_b)
+    buts_a = buts_a + (prolongation & a_gagne_prol)
+    buts_b = buts_b + (prolongation & ~a_gagne_prol)
+    return buts_a, buts_b, prolongation
+
+
+def _matchs_ronde(noms, matchs):
+    """(joués, restants) : listes de (i, j, score_i, score_j, prolongation) et de (i, j)."""
+    rang = {n: k for k, n in enumerate(noms)}
+    joues, vus = [], set()
+    if matchs is not None:
+        ronde = matchs[(matchs["Phase"] == "Ronde") & (matchs["Type"] == "Match")]
+        for _, row in ronde.iterrows():
+            a, b = row["Équipe A"], row["Équipe B"]
+            if a not in rang or b not in rang:
+                continue
+            vus.add(frozenset((a, b)))
+            if str(row.get("Gagnant", "") or "").strip() not in ("", "nan"):
+                joues.append((rang[a], rang[b], int(row["Score A"]), int(row["Score B"]), _vrai(row.get("Prolongation"))))
+        restants = [
+            (rang[row["Équipe A"]], rang[row["Équipe B"]])
+            for _, row in ronde.iterrows()
+            if row["Équipe A"] in rang and row["Équipe B"] in rang
+            and str(row.get("Gagnant", "") or "").strip() in ("", "nan")
+        ]
+    else:
+        restants = [(i, j) for i in range(len(noms)) for j in range(i + 1, len(noms))]
+    return joues, restants
+
+
+def _resultat_fixe(matchs, phase, rang):
+    """Matchs d'élimination dont les équipes (et éventuellement le gagnant) sont connus."""
+    if matchs is None:
+        return []
+    fixes = []
+    for _, row in matchs[(matchs["Phase"] == phase) & (matchs["Type"] == "Match")].iterrows():
+        a, b = row["Équipe A"], row["Équipe B"]
+        if a in rang and b in rang:
+            gagnant = str(row.get("Gagnant", "") or "").strip()
+            fixes.append((rang[a], rang[b], rang.get(gagnant)))
+        else:
+            fixes.append(None)
+    return fixes
+
+
+def simuler_tournoi(moyennes, matchs=None, nb_simulations=NB_SIMULATIONS, rng=None,
+                    buts_moyens=BUTS_MOYENS, sensibilite=SENSIBILITE):
+    """Probabilités de classement final de chaque équipe.
+
+    moyennes : dict nom d'équipe -> moyenne de talent (au moins 4 équipes).
+    matchs : bracket en cours (data/tournoi_bracket.csv) ; None = tournoi pas commencé.
+    Retourne un DataFrame indexé par équipe, colonnes « 1er », « 2e », ... (probabilités)
+    et « Pts moyens » (points de ronde).
+    """
+    noms = list(moyennes)
+    nb = len(noms)
+    if nb < 4:
+        raise ValueError("Il faut au moins 4 équipes pour simuler demi-finales et finale.")
+    rng = rng if rng is not None else np.random.default_rng()
+    force = np.array([float(moyennes[n]) for n in noms])
+    rang = {n: k for k, n in enumerate(noms)}
+    n_sim = int(nb_simulations)
+
+    # --- Ronde : résultats connus + matchs restants tirés ---
+    pts = np.zeros((n_sim, nb))
+    bp = np.zeros((n_sim, nb))
+    bc = np.zeros((n_sim, nb))
+    joues, restants = _matchs_ronde(noms, matchs)
+    for i, j, si, sj, prol in joues:
+        gagnant, perdant = (i, j) if si > sj else (j, i)
+        if si != sj:
+            pts[:, gagnant] += POINTS_VICTOIRE
+            if prol:
+                pts[:, perdant] += POINTS_DEFAITE_PROLONGATION
+        bp[:, i] += si; bc[:, i] += sj
+        bp[:, j] += sj; bc[:, j] += si
+    if restants:
+        ia = np.array([i for i, _ in restants])
+        ib = np.array([j for _, j in restants])
+        fa = np.broadcast_to(force[ia], (n_sim, len(restants)))
+        fb = np.broadcast_to(force[ib], (n_sim, len(restants)))
+        buts_a, buts_b, prol = _tirer_matchs(rng, fa, fb, buts_moyens, sensibilite)
+        victoire_a = buts_a > buts_b
+        pts_a = np.where(victoire_a, POINTS_VICTOIRE, np.where(prol, POINTS_DEFAITE_PROLONGATION, 0))
+        pts_b = np.where(~victoire_a, POINTS_VICTOIRE, np.where(prol, POINTS_DEFAITE_PROLONGATION, 0))
+        for k in range(len(restants)):
+            pts[:, ia[k]] += pts_a[:, k]; pts[:, ib[k]] += pts_b[:, k]
+            bp[:, ia[k]] += buts_a[:, k]; bc[:, ia[k]] += buts_b[:, k]
+            bp[:, ib[k]] += buts_b[:, k]; bc[:, ib[k]] += buts_a[:, k]
+
+    # Rang de ronde : Pts, puis Diff, puis BP (comme classement_from_results), puis au hasard
+    cle = np.lexsort((rng.random((n_sim, nb)), -bp, -(bp - bc), -pts), axis=-1)
+    lignes = np.arange(n_sim)
+    rang_ronde = np.empty_like(cle)
+    rang_ronde[lignes[:, None], cle] = np.arange(nb)
+
+    # --- Demi-finales : 1er vs 4e, 2e vs 3e (ou équipes déjà inscrites au bracket) ---
+    fixes = _resultat_fixe(matchs, "Demi-finale", rang)
+    gagnants, perdants = [], []
+    for k, (haut, bas) in enumerate([(0, 3), (1, 2)]):
+        fixe = fixes[k] if k < len(fixes) else None
+        if fixe is not None:
+            a = np.full(n_sim, fixe[0]); b = np.full(n_sim, fixe[1])
+        else:
+            a, b = cle[:, haut], cle[:, bas]
+        if fixe is not None and fixe[2] is not None:
+            a_gagne = np.full(n_sim, fixe[2] == fixe[0])
+        else:
+            buts_a, buts_b, _ = _tirer_matchs(rng, force[a], force[b], buts_moyens, sensibilite)
+            a_gagne = buts_a > buts_b
+        gagnants.append(np.where(a_gagne, a, b))
+        perdants.append(np.where(a_gagne, b, a))
+
+    # --- Finale ---
+    finale = _resultat_fixe(matchs, "Finale", rang)
+    a, b = gagnants
+    if finale and finale[0] is not None and finale[0][2] is not None:
+        a_gagne = finale[0][2] == a
+    else:
+        buts_a, buts_b, _ = _tirer_matchs(rng, force[a], force[b], buts_moyens, sensibilite)
+        a_gagne = buts_a > buts_b
+    champion = np.where(a_gagne, a, b)
+    finaliste = np.where(a_gagne, b, a)
+
+    # --- Places : 1-2 en finale, 3-4 selon le rang de ronde des perdants, puis la ronde ---
+    p1, p2 = perdants
+    p1_devant = rang_ronde[lignes, p1] < rang_ronde[lignes, p2]
+    places = np.empty((n_sim, nb), dtype=np.int64)
+    places[lignes, champion] = 0
+    places[lignes, finaliste] = 1
+    places[lignes, np.where(p1_devant, p1, p2)] = 2
+    places[lignes, np.where(p1_devant, p2, p1)] = 3
+    if nb > 4:
+        dans_demis = np.zeros((n_sim, nb), dtype=bool)
+        for equipe in (champion, finaliste, p1, p2):
+            dans_demis[lignes, equipe] = True
+        # les autres équipes gardent leur ordre de ronde, à partir de la 5e place
+        ordre = np.where(dans_demis, nb, rang_ronde)
+        places_restantes = np.argsort(np.argsort(ordre, axis=1, kind="stable"), axis=1, kind="stable")
+        places = np.where(dans_demis, places, places_restantes + 4)
+
+    comptes = np.stack([np.bincount(places[:, k], minlength=nb) for k in range(nb)])
+    colonnes = ["1er"] + [f"{k}e" for k in range(2, nb + 1)]
+    resultat = pd.DataFrame(comptes / n_sim, index=noms, columns=colonnes)
+    resultat["Pts moyens"] = pts.mean(axis=0)
+    resultat.index.name = "Équipe"
+    return resultat.sort_values(["1er", "2e"], ascending=False)
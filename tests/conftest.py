@@ -0,0 +1,28 @@
+"""Chaque test tourne dans un dossier temporaire avec son propre data/ et des caches vides."""
+import functools
+import gc
+import os
+import sys
+
+import pytest
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RACINE not in sys.path:
+    sys.path.insert(0, RACINE)
+
+
+def _vider_caches():
+    # les caches sont indexés par (chemin absolu, version) : un mtime identique d'un test à
+    # l'autre réutiliserait le contenu du test précédent
+    for objet in gc.get_objects():
+        if isinstance(objet, functools._lru_cache_wrapper):
+            objet.cache_clear()
+
+
+@pytest.fixture(autouse=True)
+def dossier_temporaire(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("data")
+    _vider_caches()
+    yield tmp_path
+    _vider_caches()
@@ -0,0 +1,104 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from historique_utils import ajouter_match
+from hockey_api.gestionnaires import traiter
+from hockey_api.serveur import creer_serveur
+
+JOUEURS = (
+    "id,nom,talent_attaque,talent_defense,present\n"
+    + "".join(f"{i},J{i},{4 + i % 5},{3 + i % 4},True\n" for i in range(1, 15))
+    + "15,Absent,5,5,False\n"
+)
+
+
+@pytest.fixture(autouse=True)
+def joueurs():
+    with open("data/joueurs.csv", "w", encoding="utf-8") as f:
+        f.write(JOUEURS)
+
+
+def test_sante_et_route_inconnue():
+    assert traiter("GET", "/sante") == (200, {"ok": True})
+    statut, donnees = traiter("GET", "/nulle-part")
+    assert statut == 404 and "Route inconnue" in donnees["erreur"]
+
+
+def test_joueurs_presents():
+    statut, donnees = traiter("GET", "/joueurs", {"presents": "1"})
+    assert statut == 200 and len(donnees["joueurs"]) == 14
+
+
+def test_equipes_graine_reproductible():
+    statut, premier = traiter("POST", "/equipes", {}, {"graine": 7})
+    assert statut == 200
+    assert traiter("POST", "/equipes", {}, {"graine": 7})[1] == premier
+    ids = [j["id"] for eq in ("blancs", "noirs") for g in premier[eq]["trios"] + premier[eq]["duos"] for j in g["joueurs"]]
+    assert sorted(ids) == list(range(1, 15))
+
+
+def test_horaire_graine_reproductible():
+    corps = {"jour": "2025-03-01", "graine": 3}
+    statut, premier = traiter("POST", "/tournoi/horaire", {}, corps)
+    assert statut == 200 and traiter("POST", "/tournoi/horaire", {}, dict(corps))[1] == premier
+
+
+@pytest.mark.parametrize("corps", [[], "x", 5, ["ids"]])
+def test_corps_non_objet(corps):
+    statut, donnees = traiter("POST", "/equipes", {}, corps)
+    assert statut == 400 and "objet" in donnees["erreur"]
+
+
+@pytest.mark.parametrize("chemin, corps", [
+    ("/equipes", {"ids": 5}),
+    ("/equipes", {"ids": "1,2"}),
+    ("/tournoi/horaire", {"equipes": "A"}),
+    ("/tournoi/horaire", {"debut": 1800}),
+    ("/tournoi/simulation", {"moyennes": [1, 2]}),
+    ("/tournoi/classement", {"matchs": {"a": 1}}),
+])
+def test_champ_du_mauvais_type(chemin, corps):
+    statut, donnees = traiter("POST", chemin, {}, corps)
+    assert statut == 400 and "doit être" in donnees["erreur"]
+
+
+def test_elements_invalides():
+    assert traiter("POST", "/equipes", {}, {"ids": [{"id": 1}]})[0] == 400
+    assert traiter("POST", "/equipes", {}, {"ids": [1, 999]}) == (400, {"erreur": "Joueurs inconnus : [999]"})
+    assert traiter("POST", "/equipes", {}, {"graine": "abc"})[0] == 400
+
+
+def test_ligue_inconnue():
+    assert traiter("GET", "/joueurs", {"ligue": "absente"})[0] == 404
+    assert traiter("GET", "/joueurs", {"ligue": "../x"})[0] == 400
+
+
+def test_historique_pagine():
+    for j in range(1, 4):
+        ajouter_match({"Date": f"2025-01-0{j}", "Saison": "2024-2025", "Équipe_BLANCS": "J1", "Équipe_NOIRS": "J2",
+                       "Moyenne_BLANCS": 7.0, "Moyenne_NOIRS": 7.0})
+    statut, page = traiter("GET", "/historique", {"limite": "2"})
+    assert statut == 200 and len(page["matchs"]) == 2 and page["curseur_suivant"]
+    assert traiter("GET", "/historique/match", {"id": "3"})[1]["match"]["Date"] == "2025-01-03"
+    assert traiter("GET", "/historique/match", {"id": "42"})[0] == 404
+
+
+def test_serveur_repond_400_au_lieu_de_couper():
+    serveur = creer_serveur(port=0, silencieux=True)
+    fil = threading.Thread(target=serveur.serve_forever, daemon=True)
+    fil.start()
+    try:
+        url = f"http://127.0.0.1:{serveur.server_address[1]}/equipes"
+        for corps in (b"[]", b'"x"', b'{"ids": 5}', b"{pas du json"):
+            requete = urllib.request.Request(url, data=corps, method="POST")
+            with pytest.raises(urllib.error.HTTPError) as e:
+                urllib.request.urlopen(requete, timeout=5)
+            assert e.value.code == 400
+            assert "erreur" in json.loads(e.value.read())
+    finally:
+        serveur.shutdown()
+        serveur.server_close()
@@ -0,0 +1,45 @@
+import random
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from contraintes_utils import PRECISION, generer_equipes_contraintes
+
+
+def _joueurs(n, graine):
+    rng = np.random.default_rng(graine)
+    return pd.DataFrame({
+        "id": range(1, n + 1), "nom": [f"J{i}" for i in range(1, n + 1)],
+        "talent_attaque": rng.uniform(3, 10, n).round(2), "talent_defense": rng.uniform(3, 10, n).round(2),
+    })
+
+
+def test_contraintes_respectees():
+    joueurs = _joueurs(20, 1)
+    equipes = generer_equipes_contraintes(
+        joueurs, meme_equipe=[[1, 2]], separes=[[3, 4]], meme_ligne=[[5, 6]], postes={5: "Défenseur"},
+        rng=random.Random(0),
+    )
+    composition = [{int(i) for g in eq["trios"] + eq["duos"] if not g.empty for i in g["id"]} for eq in equipes]
+    assert sorted(i for c in composition for i in c) == list(range(1, 21))
+    assert any({1, 2} <= c for c in composition)
+    assert not any({3, 4} <= c for c in composition)
+    assert any(not g.empty and {5, 6} <= set(g["id"]) for eq in equipes for g in eq["duos"])
+
+
+@pytest.mark.parametrize("graine", [0, 1, 2])
+def test_arret_avant_le_budget(graine):
+    # un roster de 20 joueurs s'équilibre à PRECISION près bien avant l'échéance
+    debut = time.monotonic()
+    equipes = generer_equipes_contraintes(_joueurs(20, graine), meme_equipe=[[1, 2]], separes=[[3, 4]],
+                                          budget_s=5.0, rng=random.Random(1))
+    assert time.monotonic() - debut < 2.0
+    moyennes = [eq["moyenne"] for eq in equipes]
+    assert max(moyennes) - min(moyennes) <= 0.01 + PRECISION
+
+
+def test_contraintes_contradictoires():
+    with pytest.raises(ValueError, match="contradictoires"):
+        generer_equipes_contraintes(_joueurs(20, 0), meme_equipe=[[1, 2]], separes=[[1, 2]])
@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+
+from equite_utils import _ids_plats, cote_fort_joueurs
+
+
+def _joueurs():
+    pd.DataFrame({
+        "id": [1, 2, 3, 4], "nom": ["Ana", "Ben", "Cléo", "Dom"],
+        "talent_attaque": 5.0, "talent_defense": 5.0, "present": False,
+    }).to_csv("data/joueurs.csv", index=False)
+
+
+def test_ids_plats_melange_ids_et_noms():
+    _joueurs()
+    hist = pd.DataFrame({
+        "Équipe_BLANCS": ["Ana, Ben", "Cléo, Inconnu", "Dom", ""],
+        "Ids_BLANCS": ["1,2", None, "", "4, x ,3"],
+    })
+    ids, matchs = _ids_plats(hist, "BLANCS")
+    # id illisible ou nom inconnu : ignoré sans décaler les autres
+    assert sorted(zip(matchs.tolist(), ids.tolist())) == [(0, 1), (0, 2), (1, 3), (2, 4), (3, 3), (3, 4)]
+
+
+def test_historique_sans_ids_compte_par_nom():
+    _joueurs()
+    hist = pd.DataFrame({
+        "Équipe_BLANCS": ["Ana, Ben"] * 6, "Équipe_NOIRS": ["Cléo, Dom"] * 6,
+        "Moyenne_BLANCS": [7.0] * 6, "Moyenne_NOIRS": [6.0] * 6,
+    })
+    resultat = cote_fort_joueurs(hist, min_matchs=1).set_index("id")
+    assert resultat["Matchs"].to_dict() == {1: 6, 2: 6, 3: 6, 4: 6}
+    assert resultat.loc[[1, 2], "Côté fort"].tolist() == [6, 6]
+    assert np.all(resultat.loc[[3, 4], "Côté fort"] == 0)
@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+
+from formation_utils import appliquer_echange, generate_teams, ids_des_groupes, meilleurs_echanges, moyennes_equipes
+
+
+def _roster(n, graine=1):
+    rng = np.random.default_rng(graine)
+    return pd.DataFrame({
+        "id": range(1, n + 1), "nom": [f"J{i}" for i in range(1, n + 1)],
+        "talent_attaque": rng.uniform(1, 10, n).round(2), "talent_defense": rng.uniform(1, 10, n).round(2),
+        "present": True,
+    })
+
+
+def test_moyennes_comme_generate_teams():
+    players = _roster(20)
+    teams = generate_teams(players)
+    talents = {int(i): (a, d) for i, a, d in zip(players["id"], players["talent_attaque"], players["talent_defense"])}
+    equipes = [
+        {"trios": ids_des_groupes(teams[f"equipe{c}_trios"]), "duos": ids_des_groupes(teams[f"equipe{c}_duos"])}
+        for c in "BN"
+    ]
+    moyennes = moyennes_equipes(equipes, talents)
+    # generate_teams arrondit chaque moyenne intermédiaire à 0,01
+    assert abs(moyennes[0] - teams["moyB"]) < 0.01 and abs(moyennes[1] - teams["moyN"]) < 0.01
+
+
+def test_moyenne_trios_et_duos_a_parts_egales():
+    talents = {1: (9, 0), 2: (3, 0), 3: (0, 5)}
+    # trois joueurs d'attaque sur deux trios, un duo : (moyenne(9, 3) + 5) / 2
+    assert moyennes_equipes([{"trios": [[1], [2]], "duos": [[3]]}], talents)[0] == 5.5
+
+
+def test_ecart_annonce_egal_a_l_ecart_obtenu():
+    rng = np.random.default_rng(4)
+    talents = {i: (float(rng.uniform(1, 10)), float(rng.uniform(1, 10))) for i in range(30)}
+    equipes = [
+        {"trios": [[0, 1, 2], [3, 4]], "duos": [[5, 6], [7, 8], [9]]},
+        {"trios": [[10, 11, 12], [13, 14, 15], []], "duos": [[16, 17]]},
+        {"trios": [[18, 19, 20]], "duos": [[21, 22], [23, 24]]},
+    ]
+    echanges = meilleurs_echanges(equipes, talents, n=20)
+    assert echanges
+    for echange in echanges:
+        moyennes = moyennes_equipes(appliquer_echange(equipes, echange), talents)
+        assert abs((moyennes.max() - moyennes.min()) - echange["ecart_apres"]) < 1e-3
+
+
+def test_candidats_en_cache_par_contenu():
+    from formation_utils import _candidats, candidats_postes
+    from utils import load_players
+
+    _roster(24).to_csv("data/joueurs.csv", index=False)
+    presents = load_players()
+    presents = presents[presents["id"] % 5 != 0].reset_index(drop=True)
+    attaquants, defenseurs = candidats_postes(presents)
+    assert (len(attaquants), len(defenseurs)) == (12, 8)
+    avant = _candidats.cache_info()
+    assert [t["id"].tolist() for t in candidats_postes(presents.copy())] == [attaquants["id"].tolist(), defenseurs["id"].tolist()]
+    assert _candidats.cache_info().hits == avant.hits + 1
+
+    # talents retouchés à l'écran : autre empreinte, nouveau partage
+    retouches = presents.assign(talent_defense=presents["talent_defense"] + 10)
+    _, defenseurs = candidats_postes(retouches)
+    assert _candidats.cache_info().misses == avant.misses + 1
+    assert len(defenseurs) == len(retouches) - 12
+
+
+def test_prechauffage_survit_a_la_sauvegarde_des_presences():
+    from formation_utils import _candidats
+    from presences_utils import prechauffer_formation
+    from utils import load_players, save_players
+
+    _roster(24).to_csv("data/joueurs.csv", index=False)
+    probables = [i for i in range(1, 25) if i % 5 != 0]
+    prechauffer_formation(probables)  # comme les pages 2 et 5, avant que les présences soient cochées
+    avant = _candidats.cache_info()
+
+    players = load_players()
+    players["present"] = players["id"].isin(probables)
+    save_players(players, "Présences")  # change la version de joueurs.csv
+    presents = load_players()
+    presents = presents[presents["present"] == True].reset_index(drop=True)
+    generate_teams(presents)
+    assert _candidats.cache_info().hits == avant.hits + 1
+    assert _candidats.cache_info().misses == avant.misses
@@ -0,0 +1,80 @@
+import io
+import os
+import threading
+
+import pandas as pd
+
+from historique_utils import (
+    ajouter_match, charger_historique, charger_manifeste, exporter_historique, lire_match, saisons_historique,
+    supprimer_saison,
+)
+
+
+def _match(date, saison="Inconnue"):
+    return {"Date": date, "Saison": saison, "Équipe_BLANCS": "A, B", "Équipe_NOIRS": "C, D",
+            "Moyenne_BLANCS": 7.0, "Moyenne_NOIRS": 7.2}
+
+
+def test_ids_successifs_et_lecture():
+    assert [ajouter_match(_match(f"2025-01-0{j}")) for j in range(1, 4)] == [1, 2, 3]
+    assert lire_match(2)["Date"] == "2025-01-02"
+    assert charger_historique()["ID_Match"].tolist() == [1, 2, 3]
+
+
+def test_manifeste_retourne_une_copie():
+    ajouter_match(_match("2025-01-01"))
+    manifeste = charger_manifeste()
+    manifeste["prochain_id"] = 99
+    manifeste["saisons"].clear()
+    # le cache n'a pas bougé : le prochain match prend l'identifiant suivant
+    assert charger_manifeste()["prochain_id"] == 2
+    assert ajouter_match(_match("2025-01-02")) == 2
+
+
+def test_ajouts_simultanes_ids_uniques():
+    ids, erreurs = [], []
+
+    def ajouter(k):
+        try:
+            ids.append(ajouter_match(_match(f"2025-02-{k % 28 + 1:02d}")))
+        except Exception as e:  # pragma: no cover - remonté par l'assertion
+            erreurs.append(e)
+
+    fils = [threading.Thread(target=ajouter, args=(k,)) for k in range(20)]
+    for f in fils:
+        f.start()
+    for f in fils:
+        f.join()
+    assert not erreurs
+    assert sorted(ids) == list(range(1, 21))
+    assert sorted(charger_historique()["ID_Match"]) == list(range(1, 21))
+
+
+def test_supprimer_saison():
+    ajouter_match(_match("2025-01-01", "2024-2025"))
+    ajouter_match(_match("2025-11-01", "2025-2026"))
+    assert supprimer_saison("2024-2025") == 1
+    assert supprimer_saison("2024-2025") == 0
+    assert saisons_historique().to_dict() == {"2025-2026": 1}
+    assert charger_historique()["Saison"].tolist() == ["2025-2026"]
+
+
+def test_migration_ancien_historique():
+    pd.DataFrame([_match("2025-01-01"), _match("2025-01-02")]).to_csv("data/historique.csv", index=False)
+    assert sorted(charger_manifeste()["saisons"]["Inconnue"]["ids"]) == [1, 2]
+    assert os.path.exists("data/historique.csv.bak") and not os.path.exists("data/historique.csv")
+    # importé une seule fois
+    assert len(charger_historique()) == 2
+    assert ajouter_match(_match("2025-01-03")) == 3
+
+
+def test_export_csv_partitions_de_schemas_differents():
+    ajouter_match(_match("2024-01-01", "2023-2024"))  # ancienne ligne, sans graine ni ids
+    ajouter_match({**_match("2025-01-01", "2024-2025"), "Seed": 42, "Ids_BLANCS": "1,2", "Ids_NOIRS": "3,4"})
+    ajouter_match(_match("2024-02-01", "2023-2024"))
+    export = pd.read_csv(io.StringIO("".join(exporter_historique("csv"))))
+    assert {"Seed", "Ids_BLANCS", "Ids_NOIRS"} <= set(export.columns)
+    export = export.set_index("ID_Match")
+    assert export.loc[2, "Seed"] == 42 and export.loc[2, "Ids_NOIRS"] == "3,4"
+    assert export.loc[[1, 3], "Seed"].isna().all()
+    assert export.loc[[1, 2, 3], "Date"].tolist() == ["2024-01-01", "2025-01-01", "2024-02-01"]
@@ -0,0 +1,134 @@
+import io
+import json
+import os
+import tarfile
+
+import pandas as pd
+
+import hydratation_utils
+from hydratation_utils import hydrater, sha_blob
+from historique_utils import charger_historique, charger_manifeste
+
+DEPOT = "club/equipes-hockey"
+
+HISTORIQUE = (
+    "Date,Saison,Équipe_BLANCS,Équipe_NOIRS,Moyenne_BLANCS,Moyenne_NOIRS\n"
+    "2025-01-05,2024-2025,A,B,7.0,7.1\n"
+    "2025-01-12,2024-2025,C,D,6.9,7.0\n"
+).encode("utf-8")
+JOUEURS = b"id,nom,talent_attaque,talent_defense,present\n1,A,8,5,True\n"
+
+
+class Reponse:
+    def __init__(self, donnees=None, brut=None):
+        self.donnees, self.raw = donnees, brut
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.donnees
+
+
+class FausseSession:
+    """Répond aux deux routes de l'API GitHub utilisées par hydrater, à partir d'un dict chemin -> contenu."""
+
+    def __init__(self, fichiers, tronque=False):
+        self.fichiers, self.tronque, self.urls = dict(fichiers), tronque, []
+
+    def get(self, url, params=None, headers=None, timeout=None, stream=False):
+        self.urls.append(url)
+        if "/git/trees/" in url:
+            arbre = [{"path": p, "type": "blob", "sha": sha_blob(c)} for p, c in self.fichiers.items()]
+            return Reponse({"tree": arbre[:1] if self.tronque else arbre, "truncated": self.tronque})
+        tampon = io.BytesIO()
+        with tarfile.open(fileobj=tampon, mode="w:gz") as tar:
+            for chemin, contenu in self.fichiers.items():
+                info = tarfile.TarInfo(f"club-equipes-hockey-abc1234/{chemin}")
+                info.size = len(contenu)
+                tar.addfile(info, io.BytesIO(contenu))
+        tampon.seek(0)
+        return Reponse(brut=tampon)
+
+
+def _hydrater(session):
+    return hydrater(DEPOT, session=session, api="http://faux")
+
+
+def test_sha_blob_identique_a_git():
+    # mêmes valeurs que « git hash-object »
+    assert sha_blob(b"hello\n") == "ce013625030ba8dba906f756967f9e9ca394464a"
+    assert sha_blob(b"") == "e69de29bb2d1d6434b8b29ae775ad8c2e48c5391"
+
+
+def test_demarrage_a_froid_puis_a_chaud():
+    session = FausseSession({"data/joueurs.csv": JOUEURS, "data/sous/note.txt": b"x"})
+    froid = _hydrater(session)
+    assert sorted(froid.ecrits) == ["data/joueurs.csv", "data/sous/note.txt"]
+    assert froid.requetes == 2 and not froid.erreurs
+    with open("data/joueurs.csv", "rb") as f:
+        assert f.read() == JOUEURS
+
+    chaud = _hydrater(session)
+    assert chaud.ecrits == [] and chaud.requetes == 1
+    assert sorted(chaud.inchanges) == ["data/joueurs.csv", "data/sous/note.txt"]
+
+
+def test_fichier_modifie_localement_conserve():
+    session = FausseSession({"data/joueurs.csv": JOUEURS})
+    _hydrater(session)
+    with open("data/joueurs.csv", "ab") as f:
+        f.write(b"2,B,5,5,False\n")
+    resultat = _hydrater(session)
+    assert resultat.conserves == ["data/joueurs.csv"] and resultat.ecrits == []
+
+
+def test_ancien_historique_migre_pas_reimporte():
+    session = FausseSession({"data/joueurs.csv": JOUEURS, "data/historique.csv": HISTORIQUE})
+    _hydrater(session)
+    charger_manifeste()
+    assert os.path.exists("data/historique.csv.bak") and not os.path.exists("data/historique.csv")
+    assert len(charger_historique()) == 2
+
+    # redémarrage à chaud : le dépôt a toujours l'ancien fichier, il ne doit pas revenir
+    resultat = _hydrater(session)
+    assert "data/historique.csv" not in resultat.ecrits
+    assert not os.path.exists("data/historique.csv")
+    charger_manifeste()
+    assert len(charger_historique()) == 2
+
+
+def test_ancien_historique_migre_dans_une_ligue():
+    os.makedirs("data/ligues/mardi/historique")
+    with open("data/ligues/mardi/historique/manifest.json", "w") as f:
+        json.dump({"prochain_id": 1, "saisons": {}}, f)
+    session = FausseSession({"data/ligues/mardi/historique.csv": HISTORIQUE, "data/historique.csv": HISTORIQUE})
+    resultat = _hydrater(session)
+    assert resultat.ecrits == ["data/historique.csv"]
+
+
+def test_arbre_tronque_lit_toute_l_archive():
+    fichiers = {"data/joueurs.csv": JOUEURS, "data/a.txt": b"a", "data/b.txt": b"b"}
+    resultat = _hydrater(FausseSession(fichiers, tronque=True))
+    assert sorted(resultat.ecrits) == sorted(fichiers) and not resultat.erreurs
+    for chemin, contenu in fichiers.items():
+        with open(chemin, "rb") as f:
+            assert f.read() == contenu
+
+    # à chaud, l'archive est relue mais rien n'est réécrit
+    resultat = _hydrater(FausseSession(fichiers, tronque=True))
+    assert resultat.ecrits == [] and sorted(resultat.inchanges) == sorted(fichiers)
+    assert resultat.requetes == 2
+
+
+def test_reponse_inattendue():
+    class Vide(FausseSession):
+        def get(self, url, **kwargs):
+            return Reponse(["pas", "un", "arbre"])
+
+    try:
+        _hydrater(Vide({}))
+    except ValueError as e:
+        assert "arbre" in str(e)
+    else:
+        raise AssertionError("ValueError attendue")
@@ -0,0 +1,31 @@
+import pytest
+
+from utils import JOUEURS_PATH, appliquer_changements_joueurs, load_players, verifier_changements_joueurs, version_fichier
+
+
+@pytest.fixture
+def base():
+    with open("data/joueurs.csv", "w", encoding="utf-8") as f:
+        f.write("id,nom,talent_attaque,talent_defense,present\n1,ALICE,5,5,True\n2,BOB,6,4,False\n")
+    return load_players(), version_fichier(JOUEURS_PATH)
+
+
+@pytest.mark.parametrize("avec_version", [True, False])
+def test_doublons_et_noms_liberes(base, avec_version):
+    df, version = base
+    version = version if avec_version else None
+    assert verifier_changements_joueurs(df, {"added_rows": [{"nom": " alice "}]}, version) == ["ALICE"]
+    assert verifier_changements_joueurs(df, {"added_rows": [{"nom": ""}]}, version) == ["(nom vide)"]
+    # ALICE renommée : son nom est libre pour l'ajout
+    changements = {"edited_rows": {0: {"nom": "ALICIA"}}, "added_rows": [{"nom": "Alice"}]}
+    assert verifier_changements_joueurs(df, changements, version) == []
+    assert verifier_changements_joueurs(df, {"deleted_rows": [1], "added_rows": [{"nom": "bob"}]}, version) == []
+
+
+def test_base_perimee_lue_telle_quelle(base):
+    df, version = base
+    appliquer_changements_joueurs(df, {"added_rows": [{"nom": "carl", "talent_attaque": 5, "talent_defense": 5}]}, version)
+    # la base affichée n'a pas CARL : l'index de la nouvelle version ne doit pas servir pour elle
+    assert verifier_changements_joueurs(df, {"added_rows": [{"nom": "carl"}]}, version) == []
+    with pytest.raises(ValueError, match="existe déjà"):
+        appliquer_changements_joueurs(df, {"added_rows": [{"nom": "carl"}]}, version)
@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+
+from formation_utils import generer_equipes_tournoi, ids_des_groupes
+from recherche_parallele import _ecart_equipes, recherche_parallele
+
+
+def _roster(n, graine=2):
+    rng = np.random.default_rng(graine)
+    return pd.DataFrame({
+        "id": range(1, n + 1), "nom": [f"J{i}" for i in range(1, n + 1)],
+        "talent_attaque": rng.uniform(1, 10, n).round(2), "talent_defense": rng.uniform(1, 10, n).round(2),
+    })
+
+
+def _ids(equipes):
+    return [(ids_des_groupes(eq["trios"]), ids_des_groupes(eq["duos"])) for eq in equipes]
+
+
+def test_jamais_pire_que_la_formation_habituelle():
+    players = _roster(40)
+    depart = list(generer_equipes_tournoi(players, graine=7).values())
+    equipes, infos = recherche_parallele(players, budget_s=0.2, seed=7)
+    assert infos["ecart"] <= round(_ecart_equipes(depart), 4)
+    assert abs(_ecart_equipes(equipes) - infos["ecart"]) < 1e-3
+
+
+def test_formation_habituelle_retournee_si_aucun_tirage_ne_la_bat():
+    players = _roster(40)
+    depart = list(generer_equipes_tournoi(players, graine=7).values())
+    # un seul candidat tiré : il ne fait pas mieux que le snake draft
+    equipes, infos = recherche_parallele(players, budget_s=5, seed=7, taille_lot=1, max_lots=1)
+    assert infos["evalues"] == 1
+    assert _ids(equipes) == _ids(depart)
+    assert infos["ecart"] == round(_ecart_equipes(depart), 4)
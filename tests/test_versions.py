@@ -0,0 +1,153 @@
+import glob
+import os
+import zlib
+from datetime import date, datetime, timedelta
+
+import pytest
+
+import versions_utils
+from historique_utils import ajouter_match, saisons_historique, supprimer_saison
+from versions_utils import (
+    annuler_derniere, appliquer_retention, avec_version, contenu_fichier, decouper, enregistrer_version,
+    lister_versions, lire_version, occupation, restaurer_version, version_precedente,
+)
+
+
+def _ecrire_joueurs(lignes, raison):
+    with avec_version("joueurs", raison):
+        with open("data/joueurs.csv", "w", encoding="utf-8") as f:
+            f.write("id,nom,talent_attaque,talent_defense,present\n" + "".join(lignes))
+
+
+def _lire_joueurs():
+    with open("data/joueurs.csv", encoding="utf-8") as f:
+        return f.read().splitlines()[1:]
+
+
+def _ligne(i, present=False):
+    return f"{i},J{i},5,5,{present}\n"
+
+
+# --- Morceaux ---
+def test_decouper_reconstitue_le_contenu():
+    contenu = "".join(f"ligne {i}\n" for i in range(2000)).encode()
+    morceaux = decouper(contenu)
+    assert b"".join(morceaux) == contenu
+    assert all(versions_utils.LIGNES_MIN <= len(m.splitlines()) <= versions_utils.LIGNES_MAX for m in morceaux[:-1])
+    assert decouper(b"") == []
+
+
+def test_modifier_une_ligne_ne_change_qu_un_morceau():
+    lignes = [f"ligne {i}\n".encode() for i in range(2000)]
+    avant = decouper(b"".join(lignes))
+    lignes[1000] = b"ligne modifiee\n"
+    apres = decouper(b"".join(lignes))
+    assert len(set(apres) - set(avant)) <= 2  # le morceau touché (et au plus son voisin)
+
+
+def test_versions_partagent_les_morceaux():
+    _ecrire_joueurs([_ligne(i) for i in range(1, 2001)], "Création")
+    _, _, disque_avant = occupation()
+    _ecrire_joueurs([_ligne(i, i == 7) for i in range(1, 2001)], "Présence")
+    nb, logique, disque = occupation()
+    assert nb == 2 and logique > 2 * 30_000
+    assert disque - disque_avant < disque_avant / 10
+
+
+def test_ajout_d_un_match_ne_recopie_pas_le_manifeste():
+    def match(j):
+        return {"Date": str(date(2025, 1, 1) + timedelta(days=j)), "Saison": "Inconnue",
+                "Équipe_BLANCS": "A, B", "Équipe_NOIRS": "C, D", "Moyenne_BLANCS": 7.0, "Moyenne_NOIRS": 7.2}
+
+    for j in range(300):
+        ajouter_match(match(j))
+    enregistrer_version("historique", "Saison")
+    with open("data/historique/manifest.json", "rb") as f:
+        manifeste = f.read()
+    _, _, disque_avant = occupation()
+    ajouter_match(match(300))
+    enregistrer_version("historique", "Un match de plus")
+    _, _, disque = occupation()
+    # seuls les morceaux touchés (fin des ids, dates, totaux) sont stockés, pas tout le manifeste
+    assert disque - disque_avant < len(zlib.compress(manifeste, 6)) / 2
+
+
+# --- Enregistrement et restauration ---
+def test_version_identique_ignoree():
+    _ecrire_joueurs([_ligne(1)], "Création")
+    assert enregistrer_version("joueurs", "Rien") is None
+    assert len(lister_versions("joueurs")) == 1
+
+
+def test_restaurer_puis_annuler_la_restauration():
+    _ecrire_joueurs([_ligne(1)], "Un")
+    _ecrire_joueurs([_ligne(1), _ligne(2)], "Deux")
+    premiere = int(lister_versions("joueurs")["id"].iloc[-1])
+    assert restaurer_version(premiere) == ["joueurs.csv"]
+    assert _lire_joueurs() == ["1,J1,5,5,False"]
+    assert contenu_fichier(premiere, "joueurs.csv").decode().splitlines()[1:] == _lire_joueurs()
+    annuler_derniere("joueurs")
+    assert _lire_joueurs() == ["1,J1,5,5,False", "2,J2,5,5,False"]
+
+
+def test_annulations_successives_remontent_l_historique():
+    etats = [[_ligne(1)], [_ligne(1), _ligne(2)], [_ligne(1), _ligne(2), _ligne(3)]]
+    for k, lignes in enumerate(etats):
+        _ecrire_joueurs(lignes, f"État {k}")
+    assert annuler_derniere("joueurs") is not None
+    assert len(_lire_joueurs()) == 2
+    assert annuler_derniere("joueurs") is not None
+    assert len(_lire_joueurs()) == 1
+    # plus rien avant le premier état : pas d'aller-retour entre les deux derniers
+    assert version_precedente("joueurs") is None
+    assert annuler_derniere("joueurs") is None
+    assert len(_lire_joueurs()) == 1
+
+
+def test_annuler_apres_une_nouvelle_modification():
+    _ecrire_joueurs([_ligne(1)], "A")
+    _ecrire_joueurs([_ligne(1), _ligne(2)], "B")
+    annuler_derniere("joueurs")                       # retour à A
+    _ecrire_joueurs([_ligne(1), _ligne(9)], "D")
+    annuler_derniere("joueurs")                       # D annulé : retour à A, pas à B
+    assert _lire_joueurs() == ["1,J1,5,5,False"]
+    assert annuler_derniere("joueurs") is None
+
+
+def test_annuler_une_suppression_d_historique():
+    with avec_version("historique", "Match"):
+        ajouter_match({"Date": "2025-11-01", "Saison": "2025-2026", "Équipe_BLANCS": "A", "Équipe_NOIRS": "B",
+                       "Moyenne_BLANCS": 7.0, "Moyenne_NOIRS": 7.0})
+    with avec_version("historique", "Suppression"):
+        supprimer_saison("2025-2026")
+    assert saisons_historique().empty
+    annuler_derniere("historique")
+    assert saisons_historique().to_dict() == {"2025-2026": 1}
+
+
+def test_morceau_corrompu_rien_n_est_ecrit():
+    _ecrire_joueurs([_ligne(1)], "Un")
+    _ecrire_joueurs([_ligne(2)], "Deux")
+    premiere = int(lister_versions("joueurs")["id"].iloc[-1])
+    empreinte = lire_version(premiere)["fichiers"]["joueurs.csv"]["morceaux"][0]
+    with open(versions_utils._chemin_objet(empreinte, versions_utils.VERSIONS_DIR), "wb") as f:
+        f.write(b"abime")
+    with pytest.raises(ValueError):
+        restaurer_version(premiere)
+    assert _lire_joueurs() == ["2,J2,5,5,False"]
+
+
+# --- Rétention ---
+def test_retention_retire_versions_et_morceaux(monkeypatch):
+    monkeypatch.setattr(versions_utils, "VERSIONS_GARDEES", 2)
+    monkeypatch.setattr(versions_utils, "JOURS_GARDES", 0)
+    for k in range(5):
+        _ecrire_joueurs([_ligne(i + 100 * k) for i in range(1, 40)], f"État {k}")
+    # la rétention passe à chaque enregistrement ; un nouvel appel n'a plus rien à retirer
+    assert appliquer_retention(maintenant=datetime.now() + timedelta(days=1)) == 0
+    restantes = lister_versions("joueurs")
+    assert len(restantes) == 2
+    utilises = {e for i in restantes["id"] for e in lire_version(i)["fichiers"]["joueurs.csv"]["morceaux"]}
+    sur_disque = {os.path.basename(os.path.dirname(p)) + os.path.basename(p)
+                  for p in glob.glob("data/versions/objets/*/*")}
+    assert sur_disque == utilises
@@ -0,0 +1,232 @@
+import itertools
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+
+
+# --- Horaire du tournoi ---
+def generer_matchs_equilibres(equipes, start_time, match_duration, demi_duration,
+                              finale_duration, pause, zamboni_pause, format="ronde", jour=None, graine=None):
+    """Construit l'horaire complet : ronde, pauses Zamboni, demi-finales et finale.
+
+    Chaque ligne porte son début réel (« Début », AAAA-MM-JJTHH:MM, le jour du tournoi :
+    aujourd'hui par défaut) et sa durée ; « Heure » en est l'affichage HH:MM.
+
+    format="elimination" : pas de ronde, élimination directe dont les têtes de série
+    suivent l'ordre de `equipes` (4, 8 ou 16 places, exemptions pour les places vides) ;
+    tous les tours avant la finale durent demi_duration.
+
+    L'ordre des matchs de ronde est tiré par un générateur initialisé par `graine` :
+    avec la graine des équipes (generer_equipes_tournoi), tout le tournoi se rejoue.
+    """
+    noms = list(equipes.keys())
+    matchs_possibles = list(itertools.combinations(noms, 2)) if format == "ronde" else []
+    rng = np.random.default_rng(graine)
+    matchs_possibles = [matchs_possibles[k] for k in rng.permutation(len(matchs_possibles))]
+
+    matchs = pd.DataFrame(matchs_possibles, columns=["Équipe A", "Équipe B"])
+    matchs["Phase"] = "Ronde"
+
+    heure = datetime.combine(jour or datetime.today(), start_time)
+    rows = []
+    match_counter = 0
+
+    # --- Matchs de ronde ---
+    for _, row in matchs.iterrows():
+        rows.append({
+            "Heure": heure.strftime("%H:%M"),
+            "Début": heure.isoformat(timespec="minutes"),
+            "Équipe A": row["Équipe A"],
+            "Équipe B": row["Équipe B"],
+            "Durée (min)": match_duration,
+            "Phase": "Ronde",
+            "Type": "Match"
+        })
+        heure += timedelta(minutes=match_duration + pause)
+        match_counter += 1
+        if match_counter % 3 == 0:
+            rows.append({
+                "Heure": heure.strftime("%H:%M"),
+                "Début": heure.isoformat(timespec="minutes"),
+                "Équipe A": "🧊 Pause Zamboni",
+                "Équipe B": "",
+                "Durée (min)": zamboni_pause,
+                "Phase": "",
+                "Type": "Pause"
+            })
+            heure += timedelta(minutes=zamboni_pause)
+
+    # --- Élimination : demi-finales 1er vs 4e / 2e vs 3e, ou tableau complet ---
+    # (bracket_utils importe tournoi_utils : import local pour éviter la boucle)
+    from bracket_utils import noeuds_elimination, libelle_source
+    graines = noms if format == "elimination" else [f"rang:{k}" for k in range(1, 5)]
+    noeuds = noeuds_elimination(graines)
+    for k, noeud in enumerate(noeuds):
+        if noeud["Phase"] == "Finale":
+            # --- Pause avant la finale ---
+            rows.append({
+                "Heure": heure.strftime("%H:%M"),
+                "Début": heure.isoformat(timespec="minutes"),
+                "Équipe A": "🧊 Pause Zamboni (avant la finale)",
+                "Équipe B": "",
+                "Durée (min)": zamboni_pause,
+                "Phase": "",
+                "Type": "Pause"
+            })
+            heure += timedelta(minutes=zamboni_pause)
+        duree = finale_duration if noeud["Phase"] == "Finale" else demi_duration
+        rows.append({
+            "Heure": heure.strftime("%H:%M"),
+            "Début": heure.isoformat(timespec="minutes"),
+            "Équipe A": libelle_source(noeud["Source A"]),
+            "Équipe B": libelle_source(noeud["Source B"]),
+            "Durée (min)": duree,
+            "Phase": noeud["Phase"],
+            "Type": "Match",
+            **{c: noeud[c] for c in ["Noeud", "Source A", "Source B"]},
+        })
+        if noeud["Phase"] == "Finale":
+            break
+        heure += timedelta(minutes=duree + pause)
+        match_counter += 1
+        # la finale a déjà sa propre pause juste avant
+        if match_counter % 3 == 0 and noeuds[k + 1]["Phase"] != "Finale":
+            rows.append({
+                "Heure": heure.strftime("%H:%M"),
+                "Début": heure.isoformat(timespec="minutes"),
+                "Équipe A": "🧊 Pause Zamboni",
+                "Équipe B": "",
+                "Durée (min)": zamboni_pause,
+                "Phase": "",
+                "Type": "Pause"
+            })
+            heure += timedelta(minutes=zamboni_pause)
+
+    return pd.DataFrame(rows).fillna({"Noeud": "", "Source A": "", "Source B": ""})
+
+
+# --- Recalage de l'horaire ---
+FORMAT_DEBUT = "%Y-%m-%dT%H:%M"
+
+
+def completer_debuts(matchs, jour=None):
+    """Ajoute « Début » à un horaire qui n'a que « Heure » (tournoi créé avant les débuts réels).
+
+    Le jour est celui du tournoi (AAAA-MM-JJ) ; une heure plus petite que la précédente
+    passe au lendemain, une heure absente reprend la fin de la ligne précédente.
+    """
+    if "Début" in matchs.columns and matchs["Début"].fillna("").astype(str).str.strip().ne("").all():
+        return matchs
+    base = datetime.strptime(jour, "%Y-%m-%d") if jour else datetime.combine(datetime.today(), datetime.min.time())
+    debuts, precedent, fin = [], None, None
+    for i, row in matchs.iterrows():
+        existant = str(row.get("Début", "") or "").strip()
+        heure = "" if pd.isna(row["Heure"]) else str(row["Heure"]).strip()
+        if existant and existant.lower() != "nan":
+            debut = datetime.strptime(existant, FORMAT_DEBUT)
+        elif heure:
+            debut = datetime.combine(base.date(), datetime.strptime(heure, "%H:%M").time())
+            while precedent is not None and debut < precedent:
+                debut += timedelta(days=1)
+        else:
+            debut = fin or base
+        debuts.append(debut.strftime(FORMAT_DEBUT))
+        precedent, fin = debut, debut + timedelta(minutes=int(row["Durée (min)"]))
+    matchs["Début"] = debuts
+    return matchs
+
+
+def recaler_horaire(matchs, i, moment, fin=False):
+    """La ligne i a commencé (ou s'est terminée, fin=True) à `moment` : décale les lignes suivantes.
+
+    Seules les lignes après i bougent (et i elle-même pour un début), toutes du même écart :
+    les pauses entre les matchs et les pauses Zamboni gardent leur place et leur durée.
+    Une fin enregistre la durée réelle de la ligne i. Modifie `matchs` et retourne les
+    index des lignes modifiées.
+    """
+    moment = moment.replace(second=0, microsecond=0)
+    pos = matchs.index.get_loc(i)
+    debut = datetime.strptime(matchs.at[i, "Début"], FORMAT_DEBUT)
+    modifiees = []
+    if fin:
+        if moment < debut:
+            raise ValueError("La fin d'un match ne peut pas précéder son début.")
+        duree = int((moment - debut).total_seconds() // 60)
+        ecart = moment - (debut + timedelta(minutes=int(matchs.at[i, "Durée (min)"])))
+        if duree != int(matchs.at[i, "Durée (min)"]):
+            matchs.at[i, "Durée (min)"] = duree
+            modifiees.append(i)
+        suivantes = matchs.index[pos + 1:]
+    else:
+        ecart = moment - debut
+        suivantes = matchs.index[pos:]
+    if ecart and len(suivantes):
+        debuts = pd.to_datetime(matchs.loc[suivantes, "Début"], format=FORMAT_DEBUT) + ecart
+        matchs.loc[suivantes, "Début"] = debuts.dt.strftime(FORMAT_DEBUT)
+        matchs.loc[suivantes, "Heure"] = debuts.dt.strftime("%H:%M")
+        modifiees = list(dict.fromkeys(modifiees + suivantes.tolist()))
+    return modifiees
+
+
+def dessiner_horaire(pdf, matchs, titre):
+    """Dessine l'horaire (matchs et pauses, heures à jour) sur un canvas reportlab au format lettre."""
+    largeur, hauteur = 612, 792
+    pdf.setFont("Helvetica-Bold", 18)
+    pdf.drawCentredString(largeur / 2, hauteur - 72, titre)
+    pdf.setLineWidth(1)
+    pdf.line(72, hauteur - 79, largeur - 72, hauteur - 79)
+
+    y = hauteur - 108
+    pdf.setFont("Helvetica", 11)
+    for _, row in matchs.iterrows():
+        heure = "" if pd.isna(row["Heure"]) else str(row["Heure"]).strip()
+        if row["Type"] == "Match":
+            ligne = f"{heure: <6} | {row['Phase']: <15} | {row['Équipe A']} vs {row['Équipe B']}  ({row['Durée (min)']} min)"
+        else:
+            texte_pause = str(row['Équipe A']).strip()
+            if texte_pause.lower() == "nan" or texte_pause == "":
+                texte_pause = "Pause"
+            ligne = f"{heure: <6} | {texte_pause} ({row['Durée (min)']} min)"
+        pdf.drawString(72, y, ligne)
+        y -= 18
+        if y < 72:
+            pdf.showPage()
+            pdf.setFont("Helvetica", 11)
+            y = hauteur - 72
+
+
+# --- Classement de la ronde ---
+POINTS_VICTOIRE = 2
+POINTS_DEFAITE_PROLONGATION = 1
+
+def classement_from_results(df):
+    """Calcule le classement de la ronde (2 pts victoire, 1 pt défaite en prolongation)."""
+    scores = {}
+    for _, row in df.iterrows():
+        if row["Phase"] != "Ronde" or row["Gagnant"] == "":
+            continue
+        a, b = row["Équipe A"], row["Équipe B"]
+        sa, sb = row["Score A"], row["Score B"]
+        prolong = bool(row.get("Prolongation", False))
+        for team in [a, b]:
+            if team not in scores:
+                scores[team] = {"Pts": 0, "BP": 0, "BC": 0}
+        scores[a]["BP"] += sa
+        scores[a]["BC"] += sb
+        scores[b]["BP"] += sb
+        scores[b]["BC"] += sa
+        if sa > sb:
+            scores[a]["Pts"] += POINTS_VICTOIRE
+            if prolong:
+                scores[b]["Pts"] += POINTS_DEFAITE_PROLONGATION
+        elif sb > sa:
+            scores[b]["Pts"] += POINTS_VICTOIRE
+            if prolong:
+                scores[a]["Pts"] += POINTS_DEFAITE_PROLONGATION
+    if not scores:
+        return pd.DataFrame(columns=["Équipe", "Pts", "BP", "BC", "Diff"])
+    clas = pd.DataFrame(scores).T
+    clas["Diff"] = clas["BP"] - clas["BC"]
+    clas = clas.sort_values(["Pts", "Diff", "BP"], ascending=False).reset_index()
+    clas.rename(columns={"index": "Équipe"}, inplace=True)
+    return clas
@@ -1,19 +1,249 @@
 import pandas as pd
 import os
+import functools
+from collections import namedtuple
 from datetime import datetime
+from ligues_utils import CheminLigue, dossier_ligue
+
+# Chemins dans le dossier de la ligue active (data/ pour la ligue principale)
+JOUEURS_PATH = CheminLigue("joueurs.csv")
+COLONNES_JOUEURS = ["nom", "talent_attaque", "talent_defense", "present"]
+HISTORIQUE_PATH = CheminLigue("historique.csv")  # ancien fichier unique, importé dans historique/
 
 def load_players():
-    """Charge la liste des joueurs depuis data/joueurs.csv."""
-    path = "data/joueurs.csv"
-    if os.path.exists(path):
-        return pd.read_csv(path)
-    else:
-        return pd.DataFrame(columns=["nom", "talent_attaque", "talent_defense", "present"])
+    """Charge la liste des joueurs depuis data/joueurs.csv (avec un `id` stable par joueur).
+
+    La lecture est mise en cache par version du fichier (partagée entre les sessions
+    Streamlit et le service HTTP) ; chaque appel reçoit sa propre copie.
+    """
+    migrer_ids_joueurs()
+    return _joueurs_caches(os.path.abspath(JOUEURS_PATH), version_fichier(JOUEURS_PATH)).copy()
+
+@functools.lru_cache(maxsize=8)
+def _joueurs_caches(path, version):
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=["id"] + COLONNES_JOUEURS)
+    df = pd.read_csv(path)
+    if df["id"].isna().any():
+        # lignes ajoutées à la main dans le CSV : on leur donne un id et on le garde
+        df = attribuer_ids(df)
+        ecrire_csv_atomique(df, path)
+    df["id"] = df["id"].astype(int)
+    return df
+
+def migrer_ids_joueurs():
+    """Migration : attribue un identifiant aux joueurs qui n'en ont pas, une seule fois."""
+    path = JOUEURS_PATH
+    if not os.path.exists(path):
+        return
+    with open(path, encoding="utf-8-sig") as f:
+        entete = f.readline().strip().split(",")
+    if "id" in entete:
+        return
+    save_players(attribuer_ids(pd.read_csv(path)), "Attribution des identifiants")
+
+def roster_par_id():
+    """Roster indexé par id, partagé (lecture seule) par toutes les sessions."""
+    migrer_ids_joueurs()
+    return _roster_par_id(os.path.abspath(JOUEURS_PATH), version_fichier(JOUEURS_PATH))
+
+@functools.lru_cache(maxsize=8)
+def _roster_par_id(path, version):
+    return _joueurs_caches(path, version).set_index("id", drop=False)
+
+def attribuer_ids(df):
+    """Donne un `id` entier unique aux lignes qui n'en ont pas (max + 1, max + 2, ...)."""
+    df = df.copy()
+    if "id" not in df.columns:
+        df.insert(0, "id", pd.NA)
+    manquants = df["id"].isna()
+    depart = int(df["id"].max()) + 1 if (~manquants).any() else 1
+    df.loc[manquants, "id"] = range(depart, depart + int(manquants.sum()))
+    df["id"] = df["id"].astype(int)
+    return df
+
+IndexJoueurs = namedtuple("IndexJoueurs", ["id_vers_nom", "nom_vers_id"])
+
+@functools.lru_cache(maxsize=8)
+def _index_joueurs(path, version):
+    players = _joueurs_caches(path, version)
+    ids = players["id"].tolist()
+    noms = players["nom"].tolist()
+    return IndexJoueurs(dict(zip(ids, noms)), dict(zip(noms, ids)))
+
+def index_joueurs():
+    """Index id <-> nom des joueurs, reconstruit seulement quand joueurs.csv change."""
+    migrer_ids_joueurs()
+    return _index_joueurs(os.path.abspath(JOUEURS_PATH), version_fichier(JOUEURS_PATH))
+
+TableTalents = namedtuple("TableTalents", ["position", "attaque", "defense"])
+
+@functools.lru_cache(maxsize=8)
+def _table_talents(path, version):
+    players = _joueurs_caches(path, version)
+    position = {id_: i for i, id_ in enumerate(players["id"].tolist())}
+    return TableTalents(
+        position,
+        players["talent_attaque"].to_numpy(dtype=float),
+        players["talent_defense"].to_numpy(dtype=float),
+    )
+
+def table_talents():
+    """Talents (attaque, défense) en tableaux NumPy, indexés par id via `position`."""
+    migrer_ids_joueurs()
+    return _table_talents(os.path.abspath(JOUEURS_PATH), version_fichier(JOUEURS_PATH))
+
+def ids_vers_texte(ids):
+    return ",".join(str(int(i)) for i in ids)
+
+def texte_vers_ids(texte):
+    if not isinstance(texte, str) or not texte.strip():
+        return []
+    return [int(x) for x in texte.split(",") if x.strip()]
+
+def save_players(df, raison="Modification des joueurs"):
+    """Sauvegarde la liste des joueurs (l'état remplacé reste restaurable, voir versions_utils)."""
+    # versions_utils importe utils : import local pour éviter la boucle
+    from versions_utils import avec_version
+    os.makedirs(dossier_ligue(), exist_ok=True)
+    with avec_version("joueurs", raison):
+        ecrire_csv_atomique(df, JOUEURS_PATH)
+
+def version_fichier(path):
+    """Retourne un jeton de version (date de modification + taille) pour un fichier."""
+    try:
+        st_fichier = os.stat(path)
+    except FileNotFoundError:
+        return "absent"
+    return f"{st_fichier.st_mtime_ns}-{st_fichier.st_size}"
+
+def ecrire_csv_atomique(df, path):
+    """Écrit un CSV dans un fichier temporaire puis le renomme (jamais de fichier à moitié écrit)."""
+    tmp = f"{path}.tmp"
+    df.to_csv(tmp, index=False)
+    os.replace(tmp, path)
+
+def nettoyer_nom(nom):
+    """Nom en majuscules sans espaces superflus."""
+    if nom is None or (isinstance(nom, float) and pd.isna(nom)):
+        return ""
+    return str(nom).strip().upper()
 
-def save_players(df):
-    """Sauvegarde la liste des joueurs."""
-    os.makedirs("data", exist_ok=True)
-    df.to_csv("data/joueurs.csv", index=False)
+def _ligne_joueur(valeurs):
+    ligne = dict(valeurs)
+    if "nom" in ligne:
+        ligne["nom"] = nettoyer_nom(ligne["nom"])
+    for col in ["talent_attaque", "talent_defense"]:
+        if col in ligne and ligne[col] is not None and not pd.isna(ligne[col]):
+            ligne[col] = round(float(ligne[col]), 2)
+    if "present" in ligne:
+        ligne["present"] = bool(ligne["present"]) if ligne["present"] is not None else False
+    return ligne
+
+def _noms_de_base(base, version):
+    # base chargée à la version courante du fichier : index des noms en cache (index_joueurs)
+    if version is not None and version == version_fichier(JOUEURS_PATH):
+        return _index_joueurs(os.path.abspath(JOUEURS_PATH), version).nom_vers_id
+    return set(base["nom"].tolist())
+
+def verifier_changements_joueurs(base, changements, version=None):
+    """
+    Vérifie les changements du data_editor (edited_rows / added_rows / deleted_rows)
+    sans parcourir tout le roster : retourne la liste des noms en double ou vides.
+    `version` est celle du fichier au chargement de `base` : l'index des noms de cette
+    version est alors réutilisé d'un appel à l'autre et seules les lignes touchées sont lues.
+    """
+    index_noms = _noms_de_base(base, version)
+    supprimes = {base["nom"].iloc[i] for i in changements.get("deleted_rows", [])}
+    liberes = set(supprimes)
+    nouveaux = []
+    for i, valeurs in changements.get("edited_rows", {}).items():
+        if "nom" in valeurs:
+            liberes.add(base["nom"].iloc[int(i)])
+            nouveaux.append(nettoyer_nom(valeurs["nom"]))
+    for valeurs in changements.get("added_rows", []):
+        nouveaux.append(nettoyer_nom(valeurs.get("nom")))
+
+    problemes, vus = [], set()
+    for nom in nouveaux:
+        if not nom:
+            problemes.append("(nom vide)")
+        elif nom in vus or (nom in index_noms and nom not in liberes):
+            problemes.append(nom)
+        vus.add(nom)
+    return problemes
+
+def appliquer_changements_joueurs(base, changements, version):
+    """
+    Applique les changements du data_editor au fichier des joueurs, ligne par ligne
+    (index de hachage sur l'`id` du joueur, ce qui rend les renommages sûrs). `base` est le tableau affiché dans l'éditeur et
+    `version` la version du fichier à ce moment. Si un autre entraîneur a modifié
+    entre-temps un des joueurs touchés, lève une ValueError au lieu d'écraser.
+    Retourne (joueurs, nouvelle_version).
+    """
+    problemes = verifier_changements_joueurs(base, changements, version)
+    if problemes:
+        raise ValueError(f"Noms en double ou vides : {', '.join(problemes)}")
+
+    courant = load_players()
+    presents_avant = set(courant.loc[courant["present"].astype(bool), "id"].astype(int))
+    courant["talent_attaque"] = courant["talent_attaque"].astype(float)
+    courant["talent_defense"] = courant["talent_defense"].astype(float)
+    index = {id_: i for i, id_ in enumerate(courant["id"].tolist())}
+    modifie_ailleurs = version_fichier(JOUEURS_PATH) != version
+
+    def ligne_courante(i_base):
+        nom = base["nom"].iloc[int(i_base)]
+        pos = index.get(int(base["id"].iloc[int(i_base)]))
+        if pos is None:
+            raise ValueError(f"{nom} a été supprimé par quelqu'un d'autre. Rechargez la page.")
+        if modifie_ailleurs:
+            avant = _ligne_joueur(base.iloc[int(i_base)][COLONNES_JOUEURS].to_dict())
+            maintenant = _ligne_joueur(courant.iloc[pos][COLONNES_JOUEURS].to_dict())
+            if avant != maintenant:
+                raise ValueError(f"{nom} a été modifié par quelqu'un d'autre. Rechargez la page.")
+        return pos
+
+    a_supprimer = [ligne_courante(i) for i in changements.get("deleted_rows", [])]
+    for i, valeurs in changements.get("edited_rows", {}).items():
+        pos = ligne_courante(i)
+        for col, val in _ligne_joueur(valeurs).items():
+            if col == "id":
+                continue
+            courant.at[courant.index[pos], col] = val
+
+    if modifie_ailleurs:
+        # un nom ajouté ailleurs pourrait entrer en conflit avec nos ajouts
+        noms_courants = index_joueurs().nom_vers_id
+        for valeurs in changements.get("added_rows", []):
+            if nettoyer_nom(valeurs.get("nom")) in noms_courants:
+                raise ValueError(f"{nettoyer_nom(valeurs.get('nom'))} existe déjà. Rechargez la page.")
+
+    ajouts = [{**_ligne_joueur(v), "id": pd.NA} for v in changements.get("added_rows", [])]
+    if a_supprimer:
+        courant = courant.drop(courant.index[a_supprimer])
+    if ajouts:
+        courant = pd.concat([courant, pd.DataFrame(ajouts)], ignore_index=True)
+    courant = attribuer_ids(courant.reset_index(drop=True))
+    courant["present"] = courant["present"].fillna(False).astype(bool)
+
+    save_players(courant)
+    presents = set(courant.loc[courant["present"], "id"].astype(int))
+    if presents != presents_avant:
+        # presences_utils importe utils : import local pour éviter la boucle
+        from presences_utils import journaliser_presences
+        journaliser_presences(presents)
+    return courant, version_fichier(JOUEURS_PATH)
+
+def reinitialiser_presences():
+    """Remet toutes les présences à False à partir du fichier courant (pas de l'éditeur)."""
+    courant = load_players()
+    if courant["present"].any():
+        courant["present"] = False
+        save_players(courant, "Remise à zéro de la présence")
+    from presences_utils import journaliser_remise_a_zero
+    journaliser_remise_a_zero()
+    return courant, version_fichier(JOUEURS_PATH)
 
 def saison_from_date(date_str):
     """Retourne la saison de hockey selon la date (août à avril)."""
@@ -27,14 +257,31 @@ def saison_from_date(date_str):
     except Exception:
         return "Inconnue"
 
-def save_history(equipeB, equipeN, moyB, moyN, date_match, triosB, duosB, triosN, duosN):
-    """Enregistre les équipes, moyennes et trios/duos dans data/historique.csv."""
-    os.makedirs("data", exist_ok=True)
+def save_history(equipeB, equipeN, moyB, moyN, date_match, triosB, duosB, triosN, duosN,
+                 graine=None, version_roster=None):
+    """Enregistre les équipes, moyennes et trios/duos dans data/historique.csv ; retourne l'ID_Match.
+
+    Pour une formation de generate_teams non retouchée, `graine` et `version_roster`
+    (rejeu_utils.archiver_roster) suffisent à la régénérer : les trios / duos ne sont
+    alors pas recopiés en texte (voir rejeu_utils.rejouer_match).
+    """
+    from formation_utils import VERSION_ALGO
+    os.makedirs(dossier_ligue(), exist_ok=True)
     saison = saison_from_date(date_match)
+    rejouable = graine is not None and version_roster is not None
 
     def format_groupes(groupes):
+        if rejouable:
+            return ""
         return "; ".join([", ".join(g["nom"].tolist()) for g in groupes if not g.empty])
 
+    def ids_equipe(groupes, noms):
+        # Les groupes portent la colonne `id` ; sinon on passe par l'index des noms
+        if all("id" in g.columns for g in groupes if not g.empty):
+            return [i for g in groupes if not g.empty for i in g["id"].tolist()]
+        nom_vers_id = index_joueurs().nom_vers_id
+        return [nom_vers_id[n] for n in noms if n in nom_vers_id]
+
     new_data = pd.DataFrame([{
         "Date": date_match,
         "Saison": saison,
@@ -45,14 +292,80 @@ def save_history(equipeB, equipeN, moyB, moyN, date_match, triosB, duosB, triosN
         "Trios_NOIRS": format_groupes(triosN),
         "Duos_NOIRS": format_groupes(duosN),
         "Équipe_BLANCS": ", ".join(equipeB),
-        "Équipe_NOIRS": ", ".join(equipeN)
+        "Équipe_NOIRS": ", ".join(equipeN),
+        "Ids_BLANCS": ids_vers_texte(ids_equipe(triosB + duosB, equipeB)),
+        "Ids_NOIRS": ids_vers_texte(ids_equipe(triosN + duosN, equipeN)),
+        "Seed": int(graine) if rejouable else None,
+        "Version_roster": version_roster if rejouable else "",
+        "Version_algo": VERSION_ALGO if rejouable else None,
     }])
 
-    path = "data/historique.csv"
-    if os.path.exists(path):
-        hist = pd.read_csv(path)
-        hist = pd.concat([hist, new_data], ignore_index=True)
-    else:
-        hist = new_data
+    # Ajout en fin de fichier + mise à jour de l'index des matchs (historique_utils
+    # importe utils : import local pour éviter la boucle)
+    from historique_utils import ajouter_match
+    from versions_utils import avec_version
+    with avec_version("historique", f"Match du {date_match}"):
+        return ajouter_match(new_data.iloc[0].to_dict())
+
+def ids_par_match(hist, couleur):
+    """Liste des ids de joueurs de chaque match pour une équipe (BLANCS / NOIRS).
+
+    Les anciennes lignes sans colonne `Ids_*` sont reliées par le nom, via l'index.
+    """
+    nom_vers_id = None
+    colonne_ids = f"Ids_{couleur}"
+    resultat = []
+    for ids, noms in zip(
+        hist[colonne_ids] if colonne_ids in hist.columns else [None] * len(hist),
+        hist[f"Équipe_{couleur}"],
+    ):
+        if isinstance(ids, str) and ids.strip():
+            resultat.append(texte_vers_ids(ids))
+        elif isinstance(ids, (int, float)) and not pd.isna(ids):
+            resultat.append([int(ids)])
+        else:
+            if nom_vers_id is None:
+                nom_vers_id = index_joueurs().nom_vers_id
+            resultat.append([
+                nom_vers_id.get(n, n)
+                for n in (x.strip() for x in (noms if isinstance(noms, str) else "").split(","))
+                if n
+            ])
+    return resultat
 
-    hist.to_csv(path, index=False)
+def compter_matchs_joueurs(hist):
+    """Nombre de matchs par joueur (clé = id, ou ancien nom si inconnu du roster)."""
+    comptes = {}
+    for couleur in ["BLANCS", "NOIRS"]:
+        for ids in ids_par_match(hist, couleur):
+            for id_ in ids:
+                comptes[id_] = comptes.get(id_, 0) + 1
+    return comptes
+
+def stats_joueurs(hist, players=None):
+    """Compte les matchs joués par joueur (par id) et ajoute nom et talents actuels.
+
+    Un joueur de l'historique absent du roster garde son ancien nom comme clé.
+    """
+    return stats_depuis_comptes(compter_matchs_joueurs(hist), players)
+
+def stats_depuis_comptes(joueurs_stats, players=None):
+    """Tableau des statistiques à partir de {id: nb de matchs} (ex. résumés de saisons)."""
+    stats_df = pd.DataFrame(
+        [{"id": j, "Matchs joués": c} for j, c in joueurs_stats.items()],
+        columns=["id", "Matchs joués"],
+    ).sort_values(by="Matchs joués", ascending=False)
+
+    # --- Fusion avec les talents si disponibles (jointure sur l'id entier) ---
+    if players is not None and not players.empty:
+        stats_df = stats_df.merge(
+            players[["id", "nom", "talent_attaque", "talent_defense"]].astype({"id": object}),
+            on="id", how="left",
+        )
+        stats_df["Joueur"] = stats_df["nom"].where(stats_df["nom"].notna(), stats_df["id"].astype(str))
+        stats_df = stats_df[["Joueur", "Matchs joués", "talent_attaque", "talent_defense"]]
+    else:
+        id_vers_nom = index_joueurs().id_vers_nom
+        stats_df["Joueur"] = [id_vers_nom.get(i, str(i)) for i in stats_df["id"]]
+        stats_df = stats_df[["Joueur", "Matchs joués"]]
+    return stats_df.reset_index(drop=True)
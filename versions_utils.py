@@ -0,0 +1,333 @@
+"""
+Versions des joueurs et de l'historique : chaque enregistrement ou suppression garde une
+copie restaurable, pour presque rien quand le fichier change peu.
+
+    data/versions/
+        versions.jsonl   une ligne par version : cible, raison, fichiers -> morceaux
+        objets/ab/cd...  morceaux compressés (zlib), nommés par leur SHA-256
+
+Un fichier est découpé en morceaux de lignes dont les frontières dépendent du contenu
+(une ligne dont l'empreinte CRC32 tombe sur MASQUE_FRONTIERE termine le morceau) : ajouter
+ou modifier une ligne ne change que son morceau, les autres sont déjà dans objets/ et ne
+coûtent rien. Une version identique à la précédente (même empreinte) n'est pas ajoutée, et
+un fichier dont la version (date + taille) n'a pas bougé depuis la dernière n'est pas relu.
+
+Les cibles sont « joueurs » (joueurs.csv) et « historique » (tout le dossier historique/,
+manifeste compris). La rétention garde les VERSIONS_GARDEES dernières versions de chaque
+cible, plus la dernière de chaque jour pendant JOURS_GARDES jours ; les morceaux qui ne
+servent plus à aucune version sont alors supprimés.
+
+« Annuler » remonte l'historique d'un cran à chaque fois : la version créée par une
+annulation garde l'id de la version remise en place (« retour_a »), et l'annulation
+suivante repart de celle-ci plutôt que de l'état qu'on vient de quitter.
+"""
+import contextlib
+import functools
+import glob
+import hashlib
+import json
+import os
+import threading
+import zlib
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from ligues_utils import CheminLigue, dossier_ligue
+from utils import JOUEURS_PATH, version_fichier
+from historique_utils import HISTORIQUE_DIR, charger_manifeste
+
+VERSIONS_DIR = CheminLigue("versions")
+NOM_JOURNAL = "versions.jsonl"
+CIBLES = {"joueurs": "👥 Joueurs", "historique": "📜 Historique des matchs"}
+
+MASQUE_FRONTIERE = 0x0F  # un morceau fait ~16 lignes en moyenne
+LIGNES_MIN = 4
+LIGNES_MAX = 256
+VERSIONS_GARDEES = 50
+JOURS_GARDES = 60
+
+_verrou = threading.RLock()
+
+
+# --- Morceaux ---
+def decouper(contenu):
+    """Morceaux (bytes) d'un contenu, coupés après une ligne choisie par son contenu."""
+    morceaux, courant, nb = [], [], 0
+    for ligne in contenu.splitlines(keepends=True):
+        courant.append(ligne)
+        nb += 1
+        if nb >= LIGNES_MAX or (nb >= LIGNES_MIN and zlib.crc32(ligne) & MASQUE_FRONTIERE == 0):
+            morceaux.append(b"".join(courant))
+            courant, nb = [], 0
+    if courant:
+        morceaux.append(b"".join(courant))
+    return morceaux
+
+
+def _chemin_objet(empreinte, dossier):
+    return os.path.join(dossier, "objets", empreinte[:2], empreinte[2:])
+
+
+def _ecrire_objet(morceau, dossier):
+    empreinte = hashlib.sha256(morceau).hexdigest()
+    chemin = _chemin_objet(empreinte, dossier)
+    if not os.path.exists(chemin):
+        os.makedirs(os.path.dirname(chemin), exist_ok=True)
+        with open(f"{chemin}.tmp", "wb") as f:
+            f.write(zlib.compress(morceau, 6))
+        os.replace(f"{chemin}.tmp", chemin)
+    return empreinte
+
+
+def _lire_objet(empreinte, dossier):
+    try:
+        with open(_chemin_objet(empreinte, dossier), "rb") as f:
+            morceau = zlib.decompress(f.read())
+    except (FileNotFoundError, zlib.error):
+        raise ValueError(f"Morceau {empreinte[:12]} manquant ou illisible dans les versions.")
+    if hashlib.sha256(morceau).hexdigest() != empreinte:
+        raise ValueError(f"Morceau {empreinte[:12]} corrompu dans les versions.")
+    return morceau
+
+
+# --- Cibles ---
+def _fichiers_cible(cible):
+    """[(chemin relatif au dossier de la ligue, chemin)] des fichiers d'une cible."""
+    base = dossier_ligue()
+    if cible == "joueurs":
+        chemins = [os.fspath(JOUEURS_PATH)] if os.path.exists(JOUEURS_PATH) else []
+    elif cible == "historique":
+        chemins = sorted(p for p in glob.glob(os.path.join(HISTORIQUE_DIR, "*")) if os.path.isfile(p) and not p.endswith(".tmp"))
+    else:
+        raise ValueError(f"Cible de version inconnue : {cible}")
+    return [(os.path.relpath(p, base).replace(os.sep, "/"), p) for p in chemins]
+
+
+# --- Journal ---
+@functools.lru_cache(maxsize=8)
+def _journal(path, version):
+    if not os.path.exists(path):
+        return ()
+    versions = []
+    with open(path, encoding="utf-8") as f:
+        for l in f:
+            try:
+                versions.append(json.loads(l))
+            except json.JSONDecodeError:
+                continue  # ligne tronquée par un arrêt pendant l'écriture
+    return tuple(versions)
+
+
+def _versions(dossier):
+    path = os.path.join(dossier, NOM_JOURNAL)
+    return _journal(os.path.abspath(path), version_fichier(path))
+
+
+def _derniere(cible, dossier):
+    return next((v for v in reversed(_versions(dossier)) if v["cible"] == cible), None)
+
+
+def _empreinte_version(fichiers):
+    recette = {rel: f["morceaux"] for rel, f in fichiers.items()}
+    return hashlib.sha256(json.dumps(recette, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+# --- Enregistrement ---
+def enregistrer_version(cible, raison="", dossier=VERSIONS_DIR, retour_a=None):
+    """Ajoute l'état actuel de la cible aux versions ; retourne la version, ou None si rien n'a changé.
+
+    `retour_a` : id de la version remise en place par une annulation (voir annuler_derniere).
+    """
+    with _verrou:
+        derniere = _derniere(cible, dossier)
+        connus = derniere["fichiers"] if derniere else {}
+        fichiers = {}
+        for rel, chemin in _fichiers_cible(cible):
+            jeton = version_fichier(chemin)
+            if rel in connus and connus[rel]["version"] == jeton:
+                fichiers[rel] = connus[rel]  # inchangé : pas relu
+                continue
+            with open(chemin, "rb") as f:
+                contenu = f.read()
+            fichiers[rel] = {
+                "version": jeton, "taille": len(contenu),
+                "morceaux": [_ecrire_objet(m, dossier) for m in decouper(contenu)],
+            }
+        empreinte = _empreinte_version(fichiers)
+        if (derniere and derniere["empreinte"] == empreinte) or (derniere is None and not fichiers):
+            return None
+        precedentes = _versions(dossier)
+        version = {
+            "id": precedentes[-1]["id"] + 1 if precedentes else 1,
+            "t": datetime.now().isoformat(timespec="seconds"),
+            "cible": cible, "raison": raison, "empreinte": empreinte, "fichiers": fichiers,
+        }
+        if retour_a is not None:
+            version["retour_a"] = retour_a
+        os.makedirs(dossier, exist_ok=True)
+        with open(os.path.join(dossier, NOM_JOURNAL), "a", encoding="utf-8") as f:
+            f.write(json.dumps(version, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        appliquer_retention(dossier)
+        return version
+
+
+@contextlib.contextmanager
+def avec_version(cible, raison, dossier=VERSIONS_DIR):
+    """Entoure une écriture : l'état d'avant est gardé s'il n'était pas déjà une version
+    (fichier modifié hors de l'application, première utilisation), puis l'état d'après."""
+    with _verrou:
+        enregistrer_version(cible, f"Avant : {raison}", dossier)
+        yield
+        enregistrer_version(cible, raison, dossier)
+
+
+# --- Consultation ---
+def lister_versions(cible=None, dossier=VERSIONS_DIR):
+    """Versions (plus récente d'abord) : id, date, cible, raison, nombre de fichiers, taille."""
+    lignes = [
+        {
+            "id": v["id"], "Date": v["t"].replace("T", " "), "Cible": v["cible"], "Raison": v["raison"],
+            "Fichiers": len(v["fichiers"]), "Taille (Ko)": round(sum(f["taille"] for f in v["fichiers"].values()) / 1024, 1),
+        }
+        for v in reversed(_versions(dossier)) if cible is None or v["cible"] == cible
+    ]
+    return pd.DataFrame(lignes, columns=["id", "Date", "Cible", "Raison", "Fichiers", "Taille (Ko)"])
+
+
+def lire_version(id_version, dossier=VERSIONS_DIR):
+    """Version par son id ; ValueError si elle n'existe pas (ou plus)."""
+    version = next((v for v in _versions(dossier) if v["id"] == int(id_version)), None)
+    if version is None:
+        raise ValueError(f"Version {id_version} introuvable (supprimée par la rétention ?).")
+    return version
+
+
+def contenu_fichier(id_version, rel, dossier=VERSIONS_DIR):
+    """Contenu (bytes) d'un fichier tel qu'il était dans une version."""
+    fichier = lire_version(id_version, dossier)["fichiers"].get(rel)
+    if fichier is None:
+        raise ValueError(f"{rel} ne fait pas partie de la version {id_version}.")
+    return b"".join(_lire_objet(e, dossier) for e in fichier["morceaux"])
+
+
+def occupation(dossier=VERSIONS_DIR):
+    """(nombre de versions, octets des versions si elles étaient copiées entières, octets sur disque)."""
+    versions = _versions(dossier)
+    logique = sum(f["taille"] for v in versions for f in v["fichiers"].values())
+    disque = sum(os.path.getsize(p) for p in glob.glob(os.path.join(dossier, "objets", "*", "*")))
+    return len(versions), logique, disque
+
+
+# --- Restauration ---
+def restaurer_version(id_version, dossier=VERSIONS_DIR, annulation=False):
+    """Remet les fichiers de la cible dans l'état d'une version ; retourne les fichiers réécrits.
+
+    L'état remplacé devient lui-même une version : une restauration s'annule comme le reste.
+    Tous les morceaux sont lus et vérifiés avant d'écrire quoi que ce soit.
+    """
+    with _verrou:
+        version = lire_version(id_version, dossier)
+        cible = version["cible"]
+        # lus avant l'enregistrement de l'état actuel, dont la rétention pourrait retirer cette version
+        contenus = {
+            rel: b"".join(_lire_objet(e, dossier) for e in f["morceaux"]) for rel, f in version["fichiers"].items()
+        }
+        enregistrer_version(cible, f"Avant la restauration de la version {version['id']}", dossier)
+        actuelle = _derniere(cible, dossier)["fichiers"]
+        base = dossier_ligue()
+        reecrits = []
+        for rel, f in version["fichiers"].items():
+            if rel in actuelle and actuelle[rel]["morceaux"] == f["morceaux"]:
+                continue  # déjà identique : pas réécrit
+            chemin = os.path.join(base, *rel.split("/"))
+            os.makedirs(os.path.dirname(chemin), exist_ok=True)
+            with open(f"{chemin}.tmp", "wb") as f_tmp:
+                f_tmp.write(contenus[rel])
+            os.replace(f"{chemin}.tmp", chemin)
+            reecrits.append(rel)
+        retires = [rel for rel in actuelle if rel not in version["fichiers"]]
+        for rel in retires:
+            os.remove(os.path.join(base, *rel.split("/")))
+        if cible == "historique":
+            # les partitions réécrites ont une nouvelle version de fichier : le manifeste
+            # les résume de nouveau maintenant plutôt qu'au prochain affichage
+            charger_manifeste()
+        if annulation:
+            enregistrer_version(cible, f"Annulation : retour à la version {version['id']}", dossier,
+                                retour_a=version["id"])
+        else:
+            enregistrer_version(cible, f"Restauration de la version {version['id']}", dossier)
+        return reecrits + retires
+
+
+def version_precedente(cible, dossier=VERSIONS_DIR):
+    """Version que remettrait annuler_derniere (None s'il n'y en a plus).
+
+    Une version créée par une annulation vaut la version qu'elle a remise en place : on
+    repart donc de celle-ci, ce qui fait reculer chaque annulation d'un cran de plus. Les
+    versions identiques à l'état actuel sont sautées.
+    """
+    versions = [v for v in _versions(dossier) if v["cible"] == cible]
+    if not versions:
+        return None
+    position = {v["id"]: k for k, v in enumerate(versions)}
+    actuelle = versions[-1]
+    v = actuelle
+    while v is not None:
+        if "retour_a" in v:
+            # la version remise en place peut avoir été retirée par la rétention
+            k = position.get(v["retour_a"])
+            v = versions[k] if k is not None else None
+            continue
+        k = position[v["id"]]
+        v = versions[k - 1] if k else None
+        if v is not None and v["empreinte"] != actuelle["empreinte"]:
+            return v
+    return None
+
+
+def annuler_derniere(cible, dossier=VERSIONS_DIR):
+    """Revient à la version d'avant la dernière modification de la cible ; retourne son id
+    (None s'il n'y en a plus). Des annulations successives remontent l'historique."""
+    with _verrou:
+        precedente = version_precedente(cible, dossier)
+        if precedente is None:
+            return None
+        restaurer_version(precedente["id"], dossier, annulation=True)
+        return precedente["id"]
+
+
+# --- Rétention ---
+def _gardees(versions, maintenant):
+    gardees = set()
+    for cible in {v["cible"] for v in versions}:
+        propres = [v for v in versions if v["cible"] == cible]
+        gardees |= {v["id"] for v in propres[-VERSIONS_GARDEES:]}
+        limite = (maintenant - timedelta(days=JOURS_GARDES)).isoformat()
+        par_jour = {v["t"][:10]: v["id"] for v in propres if v["t"] >= limite}  # la dernière de chaque jour
+        gardees |= set(par_jour.values())
+    return gardees
+
+
+def appliquer_retention(dossier=VERSIONS_DIR, maintenant=None):
+    """Retire les versions hors rétention puis les morceaux orphelins ; retourne le nombre de versions retirées."""
+    with _verrou:
+        versions = _versions(dossier)
+        gardees = _gardees(versions, maintenant or datetime.now())
+        if len(gardees) == len(versions):
+            return 0
+        restantes = [v for v in versions if v["id"] in gardees]
+        path = os.path.join(dossier, NOM_JOURNAL)
+        with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+            f.write("".join(json.dumps(v, ensure_ascii=False) + "\n" for v in restantes))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(f"{path}.tmp", path)
+        utilises = {e for v in restantes for f in v["fichiers"].values() for e in f["morceaux"]}
+        for chemin in glob.glob(os.path.join(dossier, "objets", "*", "*")):
+            if os.path.basename(os.path.dirname(chemin)) + os.path.basename(chemin) not in utilises:
+                os.remove(chemin)
+        return len(versions) - len(restantes)